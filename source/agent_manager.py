@@ -5,8 +5,11 @@ from pathlib import Path
 
 import sys
 from tools.tools import search_tool, read_file_tool, write_file_tool, list_files_tool, modify_file_tool, create_new_file, read_parquet_file
-from tools.data_handling import calculate_iv_tool, bin_single_feature_tool, process_inputs_and_calculate_iv_tool
+from tools.data_handling import calculate_iv_tool, calculate_iv_grid_tool, bin_single_feature_tool, process_inputs_and_calculate_iv_tool
 from tools.iv_engine import run_iv_from_file_tool
+from tools.screening import screen_features_tool
+from tools.score_analysis import run_score_analysis_tool
+from tools.calibration import run_calibration_tool
 from iv.iv_report import generate_iv_report_tool
 
 # Add the project root to sys.path
@@ -56,9 +59,13 @@ def initialize_agent():
             create_new_file,
             read_parquet_file,
             calculate_iv_tool,
+            calculate_iv_grid_tool,
             bin_single_feature_tool,
             process_inputs_and_calculate_iv_tool,
             run_iv_from_file_tool,
+            screen_features_tool,
+            run_score_analysis_tool,
+            run_calibration_tool,
             generate_iv_report_tool,
         ]
 
@@ -11,7 +11,7 @@ Run locally:
 from pathlib import Path
 from typing import List, Optional
 
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, Query, UploadFile, HTTPException
 import pandas as pd
 
 from source.tools.iv_engine import run_iv_by_segments
@@ -41,26 +41,43 @@ async def calculate_iv_endpoint(
     segment_col: str = "segment",
     segments: Optional[List[str]] = None,
     n_bins: int = 10,
+    include_all: bool = False,
+    time_col: Optional[str] = None,
+    feature_cols: Optional[List[str]] = Query(None),
 ):
-    segs = segments or ["MTB", "YNTB"]
+    """Compute per-segment IV; all segments in ``segment_col`` when none are given.
+
+    With ``time_col`` a single IV_by_period.csv trend table is written.
+    ``feature_cols`` (repeated query parameter) limits the columns read from
+    the upload; by default every column except label / segment is scored.
+    """
     if not file.filename:
         raise HTTPException(status_code=400, detail="No filename provided")
 
     saved_path = _save_upload(file, UPLOAD_DIR)
 
+    load_stats: dict = {}
     try:
         written = run_iv_by_segments(
             input_path=saved_path,
             label_col=label_col,
             segment_col=segment_col,
-            segments=segs,
+            segments=segments or None,
+            feature_cols=feature_cols or None,
             output_dir=OUTPUT_DIR,
             n_bins=n_bins,
+            include_all=include_all,
+            load_stats=load_stats,
+            time_col=time_col,
         )
     except Exception as exc:  # noqa: BLE001
         raise HTTPException(status_code=500, detail=str(exc)) from exc
 
-    return {"input": str(saved_path), "written_files": [str(p) for p in written]}
+    return {
+        "input": str(saved_path),
+        "written_files": [str(p) for p in written],
+        "load_stats": load_stats,
+    }
 
 
 @app.post("/generate_report")
@@ -98,6 +98,36 @@ def test_query_iv_invalid_top_n():
         assert "top_n must be positive" in body.get("detail", "")
 
 
+def test_calculate_iv_projects_feature_cols():
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        api.OUTPUT_DIR = tmp_path / "output"
+        api.UPLOAD_DIR = tmp_path / "uploads"
+        print(_line("test_feature_cols"))
+        data_path = tmp_path / "data.parquet"
+        pd.DataFrame(
+            {
+                "x1": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+                "x2": [6.0, 5.0, 4.0, 3.0, 2.0, 1.0],
+                "label": [1, 0, 1, 0, 1, 0],
+                "segment": ["MTB"] * 6,
+            }
+        ).to_parquet(data_path)
+
+        client = TestClient(api.app)
+        with data_path.open("rb") as f:
+            resp = client.post(
+                "/calculate_iv",
+                params={"feature_cols": ["x1"], "n_bins": 2},
+                files={"file": ("data.parquet", f)},
+            )
+
+        print(_kv("Response status", resp.status_code))
+        print(_kv("Response JSON", resp.json()))
+        assert resp.status_code == 200
+        assert sorted(resp.json()["load_stats"]["columns"]) == ["label", "segment", "x1"]
+
+
 def main():
     print(_line("MAIN START", "="))
     print("[main] Running test_query_iv_success...")
@@ -108,6 +138,9 @@ def main():
     print(_line())
     print("[main] Running test_query_iv_invalid_top_n...")
     test_query_iv_invalid_top_n()
+    print(_line())
+    print("[main] Running test_calculate_iv_projects_feature_cols...")
+    test_calculate_iv_projects_feature_cols()
     print(_line("MAIN END", "="))
     print("[main] All tests completed.")
 
@@ -0,0 +1,504 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from source.tools.data_handling import (
+    MISSING_CODE,
+    OTHER_LABEL,
+    BinningSpec,
+    bin_feature_codes,
+    calculate_discrimination,
+    calculate_iv,
+    calculate_iv_by_period,
+    calculate_iv_by_segment,
+    calculate_iv_grid,
+    optimize_dtypes,
+    process_inputs_and_calculate_iv,
+)
+
+
+@pytest.fixture()
+def iv_df():
+    rng = np.random.default_rng(7)
+    n = 2000
+    x1 = rng.normal(size=n)
+    x2 = rng.uniform(0, 100, size=n)
+    logit = 1.5 * x1 - 0.02 * x2
+    label = (rng.uniform(size=n) < 1 / (1 + np.exp(-logit))).astype(int)
+    x2[rng.uniform(size=n) < 0.1] = np.nan
+    return pd.DataFrame(
+        {
+            "x1": x1,
+            "x2": x2,
+            "x3": rng.integers(0, 4, size=n),
+            "label": label,
+        }
+    )
+
+
+@pytest.mark.parametrize("method", ["quantile", "width", "tree"])
+def test_vectorized_engine_matches_groupby(iv_df: pd.DataFrame, method: str):
+    kwargs = dict(df=iv_df, label_col="label", binning_method=method, n_bins=5)
+    ref = calculate_iv(engine="groupby", **kwargs)
+    vec = calculate_iv(engine="vectorized", **kwargs)
+
+    pd.testing.assert_frame_equal(
+        ref["per_bin"].sort_index(), vec["per_bin"].sort_index(), check_dtype=False
+    )
+    pd.testing.assert_series_equal(
+        ref["per_feature"].sort_index(), vec["per_feature"].sort_index()
+    )
+
+
+def test_iv_independent_of_feature_set(iv_df: pd.DataFrame):
+    both = calculate_iv(iv_df, "label", ["x1", "x2"], return_type="feature")["per_feature"]
+    single = calculate_iv(iv_df, "label", ["x1"], return_type="feature")["per_feature"]
+    assert both["x1"] == pytest.approx(single["x1"])
+
+
+def test_unknown_engine_rejected(iv_df: pd.DataFrame):
+    with pytest.raises(ValueError):
+        calculate_iv(iv_df, "label", engine="spark")
+
+
+def test_bin_feature_codes_compact_result():
+    s = pd.Series([1.0, 2.0, np.nan, 3.0, 4.0, 5.0, 6.0, np.nan])
+    result = bin_feature_codes(s, method="quantile", n_bins=3)
+
+    assert result.codes.dtype == np.uint8
+    assert result.labels[MISSING_CODE] == "MISSING"
+    assert (result.codes[s.isna().to_numpy()] == MISSING_CODE).all()
+    assert len(result.edges) == result.n_codes
+
+    expected = pd.qcut(s.dropna(), q=3).astype(str)
+    pd.testing.assert_series_equal(result.to_labels()[s.notna()], expected, check_dtype=False)
+
+
+def test_bin_feature_codes_constant_feature():
+    result = bin_feature_codes(pd.Series([3.0, 3.0, 3.0, np.nan]), method="quantile", n_bins=4)
+    assert list(result.to_labels()) == ["ALL", "ALL", "ALL", "MISSING"]
+
+
+def test_histogram_tree_matches_sklearn_splits():
+    rng = np.random.default_rng(3)
+    x = rng.integers(0, 200, size=5000).astype(float)
+    y = (rng.uniform(size=5000) < np.where(x < 60, 0.5, np.where(x < 140, 0.2, 0.05))).astype(int)
+
+    hist = bin_feature_codes(pd.Series(x), pd.Series(y), method="tree", n_bins=4)
+    skl = bin_feature_codes(pd.Series(x), pd.Series(y), method="tree", n_bins=4, tree_engine="sklearn")
+
+    # same partition of rows, up to bin numbering
+    pairs = pd.crosstab(hist.codes, skl.codes)
+    assert ((pairs > 0).sum(axis=1) == 1).all()
+    assert ((pairs > 0).sum(axis=0) == 1).all()
+    assert np.isinf(hist.edges[[0, -1]]).all()
+
+
+@pytest.mark.parametrize("method", ["quantile", "width", "tree"])
+def test_binning_spec_transform_matches_fit(iv_df: pd.DataFrame, method: str):
+    spec = BinningSpec.fit(iv_df, ["x1", "x2", "x3"], label_col="label", method=method, n_bins=5)
+    for feature in spec.features:
+        fitted = bin_feature_codes(iv_df[feature], iv_df["label"], method=method, n_bins=5)
+        np.testing.assert_array_equal(spec.transform_feature(feature, iv_df[feature]).codes, fitted.codes)
+
+    ref = calculate_iv(iv_df, "label", binning_method=method, n_bins=5, engine="vectorized")
+    prefit = calculate_iv(iv_df, "label", binning_spec=spec)
+    pd.testing.assert_series_equal(ref["per_feature"], prefit["per_feature"])
+
+
+@pytest.mark.parametrize("suffix", [".json", ".parquet"])
+def test_binning_spec_round_trip(tmp_path, iv_df: pd.DataFrame, suffix: str):
+    spec = BinningSpec.fit(iv_df, ["x1", "x2"], method="quantile", n_bins=4)
+    loaded = BinningSpec.load(spec.save(tmp_path / f"spec{suffix}"))
+
+    assert loaded.features == spec.features
+    assert loaded.n_bins == 4
+    pd.testing.assert_frame_equal(loaded.transform(iv_df), spec.transform(iv_df))
+    for feature in spec.features:
+        np.testing.assert_array_equal(loaded.edges[feature], spec.edges[feature])
+
+
+def test_binning_spec_clips_out_of_range_values(iv_df: pd.DataFrame):
+    spec = BinningSpec.fit(iv_df, ["x1"], method="width", n_bins=4)
+    codes = spec.transform(pd.DataFrame({"x1": [-1e9, 1e9, np.nan]}))["x1"].tolist()
+    assert codes == [1, 4, MISSING_CODE]
+
+
+@pytest.mark.parametrize("method", ["quantile", "width", "tree"])
+def test_binning_spec_all_missing_feature(iv_df: pd.DataFrame, method: str):
+    df = iv_df.assign(empty=np.nan)
+    spec = BinningSpec.fit(df, ["x1", "empty"], label_col="label", method=method, n_bins=4)
+    np.testing.assert_array_equal(spec.edges["empty"], [-np.inf, np.inf])
+    assert len(spec.labels["empty"]) == 2
+    assert (spec.transform_feature("empty", df["empty"]).codes == MISSING_CODE).all()
+
+    prefit = calculate_iv(df, "label", binning_spec=spec)["per_feature"]
+    assert prefit["empty"] == 0
+    assert prefit["x1"] == calculate_iv(df, "label", binning_method=method, n_bins=4)["per_feature"]["x1"]
+
+
+@pytest.mark.parametrize("method", ["quantile", "tree"])
+def test_parallel_matches_serial(iv_df: pd.DataFrame, method: str):
+    serial = calculate_iv(iv_df, "label", binning_method=method, n_bins=5, engine="vectorized")
+    parallel = calculate_iv(iv_df, "label", binning_method=method, n_bins=5, n_jobs=2)
+
+    pd.testing.assert_frame_equal(serial["per_bin"], parallel["per_bin"])
+    pd.testing.assert_series_equal(serial["per_feature"], parallel["per_feature"])
+
+
+def test_parallel_with_prefit_spec(iv_df: pd.DataFrame):
+    spec = BinningSpec.fit(iv_df, ["x1", "x2", "x3"], n_bins=4)
+    serial = calculate_iv(iv_df, "label", binning_spec=spec)
+    parallel = calculate_iv(iv_df, "label", binning_spec=spec, n_jobs=2)
+    pd.testing.assert_frame_equal(serial["per_bin"], parallel["per_bin"])
+
+
+def test_parallel_falls_back_to_serial_without_main_guard(tmp_path):
+    # forkserver workers re-import __main__; an unguarded script breaks the pool
+    script = tmp_path / "unguarded.py"
+    script.write_text(
+        "import sys\n"
+        f"sys.path.insert(0, {str(Path(__file__).resolve().parents[2])!r})\n"
+        "import numpy as np, pandas as pd\n"
+        "from source.tools.data_handling import calculate_iv\n"
+        "rng = np.random.default_rng(0)\n"
+        "df = pd.DataFrame({'a': rng.normal(size=500), 'b': rng.normal(size=500), 'label': rng.integers(0, 2, 500)})\n"
+        "iv = calculate_iv(df, 'label', n_jobs=2, engine='vectorized')['per_feature']\n"
+        "print('IV', iv['a'], iv['b'])\n"
+    )
+    proc = subprocess.run([sys.executable, str(script)], capture_output=True, text=True, timeout=300)
+    assert proc.returncode == 0, proc.stderr
+    assert "counting serially" in proc.stderr
+    assert proc.stdout.count("IV ") == 1
+
+
+def test_single_pass_segments_match_per_segment_runs(iv_df: pd.DataFrame):
+    df = iv_df.assign(segment=np.random.default_rng(1).choice(["A", "B", "C", None], size=len(iv_df)))
+    features = ["x1", "x2", "x3"]
+    results = calculate_iv_by_segment(df, "label", "segment", feature_cols=features, n_bins=5, include_all=True)
+
+    assert list(results) == ["A", "B", "C", "ALL"]
+    for seg in ["A", "B", "C"]:
+        expected = calculate_iv(df[df["segment"] == seg], "label", features, n_bins=5, engine="vectorized")
+        pd.testing.assert_frame_equal(results[seg]["per_bin"], expected["per_bin"])
+    expected_all = calculate_iv(df, "label", features, n_bins=5, engine="vectorized")
+    pd.testing.assert_series_equal(results["ALL"]["per_feature"], expected_all["per_feature"])
+
+
+def test_exact_discrimination_matches_sklearn(iv_df: pd.DataFrame):
+    from sklearn.metrics import roc_auc_score, roc_curve
+
+    table = calculate_discrimination(iv_df, "label", ["x1", "x2"], mode="exact")
+    valid = iv_df["x2"].notna()
+    y, x = iv_df.loc[valid, "label"], iv_df.loc[valid, "x2"]
+    auc = roc_auc_score(y, x)
+    fpr, tpr, _ = roc_curve(y, x)
+
+    assert table.loc["x2", "AUC"] == pytest.approx(max(auc, 1 - auc))
+    assert table.loc["x2", "KS"] == pytest.approx(np.max(np.abs(tpr - fpr)))
+    assert table.loc["x1", "Gini"] == pytest.approx(2 * roc_auc_score(iv_df["label"], iv_df["x1"]) - 1)
+
+
+def test_binned_discrimination_close_to_exact(iv_df: pd.DataFrame):
+    binned = calculate_discrimination(iv_df, "label", ["x1"], n_bins=20, engine="vectorized")
+    exact = calculate_discrimination(iv_df, "label", ["x1"], mode="exact")
+    result = calculate_iv(iv_df, "label", ["x1", "x2", "x3"], n_bins=20, discrimination=True)
+
+    assert list(binned.columns) == ["IV", "KS", "AUC", "Gini", "Divergence"]
+    assert list(result["discrimination"].index) == list(result["per_feature"].index)
+    assert binned.loc["x1", "AUC"] == pytest.approx(exact.loc["x1", "AUC"], abs=0.01)
+    assert binned.loc["x1", "KS"] == pytest.approx(exact.loc["x1", "KS"], abs=0.03)
+    assert binned.loc["x1", "IV"] == pytest.approx(result["per_feature"]["x1"])
+
+
+@pytest.fixture()
+def cat_df():
+    rng = np.random.default_rng(3)
+    n = 3000
+    region = rng.choice(["north", "south", "east", "west"], size=n, p=[0.4, 0.3, 0.2, 0.1])
+    account = np.array([f"acc_{i}" for i in rng.integers(0, 20_000, size=n)], dtype=object)
+    region = region.astype(object)
+    region[rng.uniform(size=n) < 0.05] = None
+    label = (rng.uniform(size=n) < np.where(region == "north", 0.4, 0.15)).astype(int)
+    return pd.DataFrame({"region": region, "account": account, "x1": rng.normal(size=n), "label": label})
+
+
+def test_exact_discrimination_with_string_and_empty_columns(cat_df: pd.DataFrame):
+    from sklearn.metrics import roc_auc_score
+
+    df = cat_df.drop(columns="account").assign(empty=np.nan)
+    table = calculate_discrimination(df, "label", mode="exact")
+    assert set(table.index) == {"region", "x1", "empty"}
+
+    # levels ranked by bad rate: the AUC of the level bad rate used as a score
+    valid = df["region"].notna()
+    rate = df[valid].groupby("region")["label"].transform("mean")
+    assert table.loc["region", "AUC"] == pytest.approx(roc_auc_score(df.loc[valid, "label"], rate))
+    assert np.isnan(table.loc["region", "Divergence"])
+    assert table.loc[["empty"], ["KS", "AUC", "Gini", "Divergence"]].isna().all(axis=None)
+
+
+def test_categorical_iv_matches_groupby_on_levels(cat_df: pd.DataFrame):
+    result = calculate_iv(cat_df, "label", ["region"], engine="vectorized")
+    per_bin = result["per_bin"].loc["region"]
+
+    expected = cat_df.fillna({"region": "MISSING"}).groupby("region")["label"].agg(["count", "sum"])
+    assert sorted(per_bin.index) == sorted(expected.index)
+    assert (per_bin["count"] == expected.loc[per_bin.index, "count"]).all()
+    assert (per_bin["bads"] == expected.loc[per_bin.index, "sum"]).all()
+
+
+def test_high_cardinality_folds_into_other(cat_df: pd.DataFrame):
+    codes = bin_feature_codes(cat_df["account"], max_categories=10)
+    assert codes.n_codes == 12
+    assert codes.labels[-1] == OTHER_LABEL
+    assert np.bincount(codes.codes, minlength=codes.n_codes)[-1] > 0
+
+    frequent = bin_feature_codes(cat_df["region"], min_category_frac=0.15)
+    assert list(frequent.labels) == ["MISSING", "north", "south", "east", OTHER_LABEL]
+
+
+@pytest.mark.parametrize("engine", ["groupby", "vectorized"])
+def test_mixed_feature_types_across_engines(cat_df: pd.DataFrame, engine: str):
+    serial = calculate_iv(cat_df, "label", ["region", "x1", "account"], engine=engine, max_categories=5)
+    parallel = calculate_iv(cat_df, "label", ["region", "x1", "account"], n_jobs=2, max_categories=5)
+    pd.testing.assert_series_equal(serial["per_feature"].sort_index(), parallel["per_feature"].sort_index())
+
+
+@pytest.mark.parametrize("suffix", [".json", ".parquet"])
+def test_categorical_binning_spec(tmp_path, cat_df: pd.DataFrame, suffix: str):
+    spec = BinningSpec.fit(cat_df, ["region", "x1"])
+    assert spec.is_categorical("region") and not spec.is_categorical("x1")
+    spec = BinningSpec.load(spec.save(tmp_path / f"spec{suffix}"))
+
+    new = pd.Series(["south", "unseen", None, "north"])
+    codes = spec.transform_feature("region", new).codes
+    labels = spec.labels["region"]
+    assert list(labels[codes]) == ["south", OTHER_LABEL, "MISSING", "north"]
+
+
+def test_monotonic_merge_gives_monotonic_bad_rate(iv_df: pd.DataFrame):
+    result = calculate_iv(iv_df, "label", ["x1", "x2"], n_bins=6, merge_method="monotonic")
+    spec = result["binning_spec"]
+
+    for feature in ["x1", "x2"]:
+        rates = result["per_bin"].loc[feature].drop("MISSING", errors="ignore")["bad_rate"].to_numpy()
+        assert 1 < len(rates) <= 6
+        steps = np.diff(rates)
+        assert (steps >= 0).all() or (steps <= 0).all()
+        assert len(spec.edges[feature]) == len(rates) + 1
+
+    # the merged spec reproduces the merged counts in a plain run
+    rerun = calculate_iv(iv_df, "label", ["x1", "x2"], binning_spec=spec)
+    pd.testing.assert_frame_equal(rerun["per_bin"], result["per_bin"])
+
+
+def test_chimerge_respects_max_bins_and_threshold(iv_df: pd.DataFrame):
+    capped = calculate_iv(iv_df, "label", ["x1"], n_bins=4, merge_method="chimerge", chi_threshold=None)
+    assert len(capped["per_bin"].loc["x1"]) == 4
+
+    merged = calculate_iv(iv_df, "label", ["x3"], n_bins=10, merge_method="chimerge")
+    # x3 carries no signal, so every adjacent pair is merged away
+    assert len(merged["per_bin"].loc["x3"]) == 1
+
+
+@pytest.mark.parametrize("method", ["multinomial", "poisson"])
+def test_bootstrap_iv_interval(iv_df: pd.DataFrame, method: str):
+    result = calculate_iv(
+        iv_df, "label", n_bins=5, engine="vectorized",
+        n_bootstrap=500, bootstrap_method=method, random_state=0,
+    )
+    ci = result["iv_ci"]
+
+    assert list(ci.index) == list(result["per_feature"].index)
+    np.testing.assert_allclose(ci["IV"], result["per_feature"])
+    assert (ci["ci_lower"] <= ci["IV"]).all() and (ci["IV"] <= ci["ci_upper"]).all()
+    # the strong feature is clearly separated from the noise feature
+    assert ci.loc["x1", "ci_lower"] > ci.loc["x3", "ci_upper"]
+
+
+def test_bootstrap_matches_row_resampling(iv_df: pd.DataFrame):
+    spec = BinningSpec.fit(iv_df, ["x1"], n_bins=5)
+    ci = calculate_iv(iv_df, "label", binning_spec=spec, n_bootstrap=400, random_state=1)["iv_ci"]
+
+    rng = np.random.default_rng(2)
+    row_ivs = [
+        calculate_iv(iv_df.iloc[rng.integers(0, len(iv_df), len(iv_df))], "label", binning_spec=spec)["per_feature"]["x1"]
+        for _ in range(100)
+    ]
+    assert ci.loc["x1", "iv_std"] == pytest.approx(np.std(row_ivs, ddof=1), rel=0.3)
+
+
+def test_period_iv_matches_per_period_runs(iv_df: pd.DataFrame):
+    rng = np.random.default_rng(5)
+    df = iv_df.assign(
+        month=rng.choice(["2024-01", "2024-02", "2024-03"], size=len(iv_df)),
+        segment=rng.choice(["A", "B"], size=len(iv_df)),
+    )
+    spec = BinningSpec.fit(df, ["x1", "x2"], n_bins=5)
+    table = calculate_iv_by_period(df, "label", "month", "segment", binning_spec=spec, include_all=True)
+
+    assert list(table.columns) == ["Period", "Segment", "Feature", "count", "bads", "bad_rate", "IV"]
+    assert list(table["Segment"].iloc[:6]) == ["A", "A", "B", "B", "ALL", "ALL"]
+    assert list(table["Feature"].iloc[:2]) == ["x1", "x2"]
+    assert len(table) == 3 * 3 * 2
+
+    row = table[(table["Period"] == "2024-02") & (table["Segment"] == "B")].set_index("Feature")
+    subset = df[(df["month"] == "2024-02") & (df["segment"] == "B")]
+    expected = calculate_iv(subset, "label", ["x1", "x2"], binning_spec=spec)["per_feature"]
+    np.testing.assert_allclose(row.loc[["x1", "x2"], "IV"], expected.loc[["x1", "x2"]])
+    assert row.loc["x1", "count"] == len(subset)
+    assert row.loc["x1", "bad_rate"] == pytest.approx(subset["label"].mean())
+
+
+def test_optimize_dtypes_shrinks_frame_and_keeps_iv(cat_df: pd.DataFrame):
+    df = cat_df.assign(count=np.arange(len(cat_df)) % 7, label=cat_df["label"].map({0: "good", 1: "bad"}))
+    optimized, memory = optimize_dtypes(df, label_col="label", positive_label="bad")
+
+    assert memory["memory_after"] < memory["memory_before"] / 2
+    assert optimized["label"].dtype == np.uint8
+    assert optimized["x1"].dtype == np.float32
+    assert optimized["count"].dtype == np.uint8
+    assert isinstance(optimized["region"].dtype, pd.CategoricalDtype)
+
+    features = ["region", "account", "count"]
+    before = calculate_iv(df, "label", features, positive_label="bad", engine="vectorized")
+    after = calculate_iv(optimized, "label", features, engine="vectorized")
+    pd.testing.assert_series_equal(before["per_feature"], after["per_feature"])
+
+
+def test_optimize_memory_recodes_every_label_column(cat_df: pd.DataFrame):
+    df = cat_df.assign(
+        label=cat_df["label"].map({0: "good", 1: "bad"}),
+        label_2=np.where(cat_df["x1"] > 0, "Y", "N"),
+    )
+    optimized, _ = optimize_dtypes(df, label_col=["label", "label_2"], positive_label={"label": "bad", "label_2": "Y"})
+    assert optimized["label"].dtype == optimized["label_2"].dtype == np.uint8
+    assert optimized["label_2"].sum() == (df["label_2"] == "Y").sum()
+
+    inputs = dict(
+        data=df, label_col=["label", "label_2"], feature_cols=["region", "x1"],
+        positive_label={"label": "bad", "label_2": "Y"}, engine="vectorized", return_type="feature",
+    )
+    plain = process_inputs_and_calculate_iv(inputs)
+    lean = process_inputs_and_calculate_iv(dict(inputs, optimize_memory=True))
+    pd.testing.assert_frame_equal(pd.DataFrame(plain["per_feature_iv"]), pd.DataFrame(lean["per_feature_iv"]))
+
+
+def test_arrow_table_input_matches_dataframe(iv_df: pd.DataFrame):
+    pa = pytest.importorskip("pyarrow")
+    table = pa.Table.from_pandas(iv_df, preserve_index=False)
+
+    expected = calculate_iv(iv_df, "label", n_bins=5, engine="vectorized")
+    result = calculate_iv(table, "label", n_bins=5, engine="vectorized")
+    pd.testing.assert_frame_equal(result["per_bin"], expected["per_bin"])
+
+    # prefit bins: a RecordBatchReader is counted batch by batch
+    spec = BinningSpec.fit(iv_df, ["x1", "x2", "x3"], n_bins=5)
+    reader = pa.RecordBatchReader.from_batches(table.schema, table.to_batches(max_chunksize=300))
+    streamed = calculate_iv(reader, "label", binning_spec=spec)
+    pd.testing.assert_frame_equal(streamed["per_bin"], calculate_iv(iv_df, "label", binning_spec=spec)["per_bin"])
+
+
+def test_arrow_numeric_columns_are_views(iv_df: pd.DataFrame):
+    pa = pytest.importorskip("pyarrow")
+    from source.tools.data_handling import _as_frame
+
+    table = pa.Table.from_pandas(iv_df, preserve_index=False)
+    frame = _as_frame(table)
+    assert np.shares_memory(frame["x1"].to_numpy(), table["x1"].chunk(0).to_numpy())
+    assert frame["x2"].isna().sum() == iv_df["x2"].isna().sum()
+
+
+@pytest.fixture()
+def weighted_df(iv_df: pd.DataFrame):
+    rng = np.random.default_rng(20)
+    return iv_df.assign(w=rng.integers(1, 4, size=len(iv_df)))
+
+
+def test_integer_weights_match_replicated_rows(weighted_df: pd.DataFrame):
+    spec = BinningSpec.fit(weighted_df, ["x1", "x2", "x3"], n_bins=5)
+    weighted = calculate_iv(weighted_df, "label", binning_spec=spec, weight_col="w")
+    replicated = weighted_df.loc[weighted_df.index.repeat(weighted_df["w"])]
+    ref = calculate_iv(replicated, "label", binning_spec=spec)
+    pd.testing.assert_series_equal(weighted["per_feature"], ref["per_feature"])
+    np.testing.assert_allclose(weighted["per_bin"]["count"], ref["per_bin"]["count"])
+    np.testing.assert_allclose(weighted["per_bin"]["bads"], ref["per_bin"]["bads"])
+
+
+def test_weighted_quantiles_split_weight_evenly(weighted_df: pd.DataFrame):
+    result = calculate_iv(weighted_df, "label", ["x1"], n_bins=4, weight_col="w", return_type="bin")
+    shares = result["per_bin"]["count_pct"]
+    np.testing.assert_allclose(shares, 0.25, atol=0.01)
+
+
+@pytest.mark.parametrize("method", ["quantile", "tree"])
+def test_weighted_parallel_matches_serial(weighted_df: pd.DataFrame, method: str):
+    kwargs = dict(df=weighted_df, label_col="label", binning_method=method, n_bins=5, weight_col="w")
+    serial = calculate_iv(**kwargs)
+    parallel = calculate_iv(n_jobs=2, **kwargs)
+    pd.testing.assert_series_equal(serial["per_feature"], parallel["per_feature"])
+
+
+def test_invalid_weights_raise(weighted_df: pd.DataFrame):
+    with pytest.raises(ValueError, match="non-negative"):
+        calculate_iv(weighted_df.assign(w=-weighted_df["w"]), "label", weight_col="w")
+    with pytest.raises(ValueError, match="Bootstrap"):
+        calculate_iv(weighted_df, "label", weight_col="w", n_bootstrap=10)
+
+
+@pytest.mark.parametrize("method", ["quantile", "tree"])
+def test_multi_label_matches_single_label_runs(iv_df: pd.DataFrame, method: str):
+    rng = np.random.default_rng(21)
+    df = iv_df.assign(label_b=np.where(rng.uniform(size=len(iv_df)) < 0.3, "B", "G"))
+    kwargs = dict(binning_method=method, n_bins=5, feature_cols=["x1", "x2", "x3"], discrimination=True)
+    multi = calculate_iv(df, ["label", "label_b"], positive_label={"label_b": "B"}, **kwargs)
+    assert multi["per_feature"].index.names == ["Label", "Feature"]
+
+    first = calculate_iv(df, "label", engine="vectorized", **kwargs)
+    pd.testing.assert_series_equal(multi["per_feature"].loc["label"], first["per_feature"])
+    pd.testing.assert_frame_equal(multi["discrimination"].loc["label"], first["discrimination"])
+    if method == "quantile":
+        second = calculate_iv(df, "label_b", positive_label="B", engine="vectorized", **kwargs)
+        pd.testing.assert_series_equal(multi["per_feature"].loc["label_b"], second["per_feature"])
+        pd.testing.assert_frame_equal(multi["per_bin"].loc["label_b"], second["per_bin"])
+
+
+def test_multi_label_positive_label_list_length(iv_df: pd.DataFrame):
+    with pytest.raises(ValueError, match="positive labels"):
+        calculate_iv(iv_df, ["label", "x3"], feature_cols=["x1"], positive_label=[1])
+
+
+def test_iv_grid_matches_individual_runs(cat_df: pd.DataFrame, iv_df: pd.DataFrame):
+    df = iv_df.assign(region=cat_df["region"].to_numpy()[: len(iv_df)])
+    configs = [
+        {"method": "quantile", "n_bins": 5},
+        {"method": "quantile", "n_bins": 20},
+        {"method": "width", "n_bins": 8},
+        {"method": "tree", "n_bins": 6, "min_leaf_frac": 0.02, "name": "tree_small_leaf"},
+    ]
+    grid = calculate_iv_grid(df, "label", configs)
+    assert list(grid.index.get_level_values("Config").unique()) == [
+        "quantile_5", "quantile_20", "width_8", "tree_small_leaf",
+    ]
+    for config, name in zip(configs, grid.index.get_level_values("Config").unique()):
+        ref = calculate_iv(
+            df, "label", binning_method=config["method"], n_bins=config["n_bins"],
+            min_leaf_frac=config.get("min_leaf_frac", 0.05), engine="vectorized", return_type="bin",
+        )["per_bin"]
+        ref_iv = ref.groupby(level=0, sort=False)["iv"].sum()
+        np.testing.assert_allclose(grid.loc[name, "IV"].loc[ref_iv.index], ref_iv, rtol=1e-9)
+        valid_bins = (ref.index.get_level_values("Bin") != "MISSING").astype(int)
+        n_bins = pd.Series(valid_bins, index=ref.index).groupby(level=0, sort=False).sum()
+        np.testing.assert_array_equal(grid.loc[name, "n_bins"].loc[n_bins.index], n_bins)
+
+
+def test_iv_grid_rejects_unknown_config(iv_df: pd.DataFrame):
+    with pytest.raises(ValueError, match="configuration keys"):
+        calculate_iv_grid(iv_df, "label", [{"method": "quantile", "bins": 5}])
+    with pytest.raises(ValueError, match="Unsupported binning method"):
+        calculate_iv_grid(iv_df, "label", [{"method": "kmeans"}])
@@ -0,0 +1,89 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from source.tools.calibration import calculate_calibration, run_calibration
+
+
+@pytest.fixture()
+def pd_df():
+    rng = np.random.default_rng(25)
+    n = 6000
+    pd_values = rng.beta(1, 8, size=n)
+    pd_values[rng.uniform(size=n) < 0.02] = np.nan
+    label = (rng.uniform(size=n) < np.nan_to_num(pd_values, nan=0.1) * 1.2).astype(int)
+    return pd.DataFrame({
+        "pd": pd_values,
+        "label": label,
+        "segment": rng.choice(["MTB", "YNTB", "NTB"], size=n),
+        "month": rng.choice(["2024-01", "2024-02"], size=n),
+    })
+
+
+def test_summary_matches_groupby(pd_df: pd.DataFrame):
+    tables = calculate_calibration(
+        pd_df, "label", "pd", segment_col="segment", time_col="month", pd_bands=[0.05, 0.1, 0.2]
+    )
+    summary = tables["summary"].set_index(["Segment", "Period"])
+    ref = pd_df.dropna(subset=["pd"])
+    assert len(summary) == 6
+
+    for (seg, month), group in ref.groupby(["segment", "month"]):
+        row = summary.loc[(seg, month)]
+        assert row["n"] == len(group)
+        assert row["defaults"] == group["label"].sum()
+        assert row["mean_pd"] == pytest.approx(group["pd"].mean())
+        assert row["brier"] == pytest.approx(((group["pd"] - group["label"]) ** 2).mean())
+
+        band = pd.cut(group["pd"], [-np.inf, 0.05, 0.1, 0.2, np.inf])
+        by_band = group.groupby(band, observed=True).agg(n=("label", "size"), d=("label", "sum"), e=("pd", "sum"))
+        hl = ((by_band["d"] - by_band["e"]) ** 2 / (by_band["e"] * (1 - by_band["e"] / by_band["n"]))).sum()
+        assert row["hl_stat"] == pytest.approx(hl)
+        assert row["hl_dof"] == len(by_band) - 2
+        assert row["hl_p_value"] == pytest.approx(stats.chi2.sf(hl, len(by_band) - 2))
+        p_value = stats.binomtest(int(group["label"].sum()), len(group), group["pd"].mean(), alternative="greater").pvalue
+        assert row["binomial_p_value"] == pytest.approx(p_value)
+
+
+def test_bands_and_totals(pd_df: pd.DataFrame):
+    tables = calculate_calibration(
+        pd_df, "label", "pd", segment_col="segment", time_col="month",
+        segments=["MTB"], include_all=True, n_bands=5,
+    )
+    bands = tables["bands"]
+    assert set(bands["Segment"]) == {"MTB", "ALL"}
+    assert set(bands["Period"]) == {"2024-01", "2024-02", "ALL"}
+
+    ref = pd_df.dropna(subset=["pd"])
+    total = bands[(bands["Segment"] == "ALL") & (bands["Period"] == "ALL")]
+    np.testing.assert_array_equal(total["n"], pd.qcut(ref["pd"], 5).value_counts().sort_index())
+    assert total["defaults"].sum() == ref["label"].sum()
+    np.testing.assert_allclose(total["expected_defaults"].sum(), ref["pd"].sum())
+    np.testing.assert_allclose(total["observed_rate"], total["defaults"] / total["n"])
+
+
+def test_streaming_matches_in_memory(tmp_path: Path, pd_df: pd.DataFrame):
+    pytest.importorskip("pyarrow")
+    input_path = tmp_path / "scored.parquet"
+    pd_df.to_parquet(input_path, row_group_size=1000)
+    kwargs = dict(
+        label_col="label", pd_col="pd", segment_col="segment", time_col="month",
+        include_all=True, pd_bands=[0.05, 0.1, 0.2],
+    )
+    run_calibration(input_path, output_dir=tmp_path / "exact", **kwargs)
+    paths = run_calibration(input_path, output_dir=tmp_path / "stream", streaming=True, batch_size=700, **kwargs)
+    assert [p.name for p in paths] == ["calibration_bands.csv", "calibration_summary.csv"]
+
+    for name in ("calibration_bands.csv", "calibration_summary.csv"):
+        pd.testing.assert_frame_equal(
+            pd.read_csv(tmp_path / "exact" / name), pd.read_csv(tmp_path / "stream" / name)
+        )
+
+
+def test_rejects_pd_outside_unit_interval(pd_df: pd.DataFrame):
+    pd_df.loc[0, "pd"] = 1.5
+    with pytest.raises(ValueError, match="probabilities"):
+        calculate_calibration(pd_df, "label", "pd")
@@ -0,0 +1,81 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from source.tools.data_handling import BinningSpec, calculate_iv
+from source.tools.iv_accumulator import IVAccumulator
+from source.tools.iv_engine import run_iv_by_segments
+
+
+@pytest.fixture()
+def history():
+    rng = np.random.default_rng(31)
+    n = 4000
+    x1 = rng.normal(size=n)
+    return pd.DataFrame(
+        {
+            "x1": x1,
+            "x2": np.where(rng.uniform(size=n) < 0.1, np.nan, rng.uniform(size=n)),
+            "label": (rng.uniform(size=n) < 1 / (1 + np.exp(-x1))).astype(int),
+            "segment": rng.choice(["MTB", "YNTB"], size=n),
+        }
+    )
+
+
+def test_updates_and_merge_match_full_run(tmp_path: Path, history: pd.DataFrame):
+    spec = BinningSpec.fit(history, ["x1", "x2"], n_bins=5)
+    first, second = history.iloc[:1500], history.iloc[1500:]
+
+    state = IVAccumulator(spec).update(first, "label", "segment", include_all=True)
+    state.update(second, "label", "segment", include_all=True)
+    other = IVAccumulator(spec).update(first, "label", "segment", include_all=True)
+    other.merge(IVAccumulator(spec).update(second, "label", "segment", include_all=True))
+
+    expected = calculate_iv(history, "label", binning_spec=spec)
+    for acc in (state, other, IVAccumulator.load(state.save(tmp_path / "state.json"))):
+        pd.testing.assert_frame_equal(acc.result("ALL")["per_bin"], expected["per_bin"])
+    mtb = calculate_iv(history[history["segment"] == "MTB"], "label", binning_spec=spec)
+    pd.testing.assert_series_equal(state.result("MTB")["per_feature"], mtb["per_feature"])
+
+
+def test_merge_rejects_different_bins(history: pd.DataFrame):
+    a = IVAccumulator(BinningSpec.fit(history, ["x1"], n_bins=5))
+    b = IVAccumulator(BinningSpec.fit(history, ["x1"], n_bins=4))
+    with pytest.raises(ValueError):
+        a.merge(b)
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_append_mode_matches_full_history(tmp_path: Path, history: pd.DataFrame, streaming: bool):
+    month1, month2 = tmp_path / "m1.parquet", tmp_path / "m2.parquet"
+    history.iloc[:2000].to_parquet(month1)
+    history.iloc[2000:].to_parquet(month2)
+    kwargs = dict(label_col="label", segment_col="segment", n_bins=5, include_all=True, streaming=streaming)
+
+    out = tmp_path / "out"
+    run_iv_by_segments(input_path=month1, output_dir=out, append=True, **kwargs)
+    appended = run_iv_by_segments(input_path=month2, output_dir=out, append=True, **kwargs)
+
+    spec = IVAccumulator.load(out / "iv_state.json").binning_spec
+    full_path = tmp_path / "full.parquet"
+    history.to_parquet(full_path)
+    full = run_iv_by_segments(input_path=full_path, output_dir=tmp_path / "full", binning_spec=spec, **kwargs)
+
+    assert [p.name for p in appended] == [p.name for p in full]
+    for a, f in zip(appended, full):
+        pd.testing.assert_frame_equal(pd.read_csv(a), pd.read_csv(f))
+
+
+def test_append_rejects_different_positive_label(tmp_path: Path, history: pd.DataFrame):
+    month1, month2 = tmp_path / "m1.parquet", tmp_path / "m2.parquet"
+    history.iloc[:2000].to_parquet(month1)
+    history.iloc[2000:].to_parquet(month2)
+    kwargs = dict(label_col="label", segment_col="segment", n_bins=5, output_dir=tmp_path / "out", append=True)
+
+    run_iv_by_segments(input_path=month1, positive_label=0, **kwargs)
+    with pytest.raises(ValueError, match="positive_label"):
+        run_iv_by_segments(input_path=month2, positive_label=1, **kwargs)
+    run_iv_by_segments(input_path=month2, positive_label=0, **kwargs)
+    assert IVAccumulator.load(tmp_path / "out" / "iv_state.json").positive_label == 0
@@ -1,9 +1,11 @@
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 import pytest
 
-from source.tools.iv_engine import run_iv_by_segments
+from source.tools.data_handling import BinningSpec
+from source.tools.iv_engine import load_input, run_iv_by_segments
 
 
 @pytest.fixture()
@@ -42,7 +44,310 @@ def test_run_iv_by_segments_creates_outputs(tmp_path: Path, sample_df: pd.DataFr
         loaded = pd.read_csv(path)
         print(f"[test] preview {path.name}:\n{loaded.head()}\n")
         assert not loaded.empty
-    
+
+
+def test_run_iv_by_segments_with_prefit_spec(tmp_path: Path, sample_df: pd.DataFrame):
+    data_path = tmp_path / "test_data.csv"
+    sample_df.to_csv(data_path, index=False)
+    spec = BinningSpec.fit(sample_df, ["feature1", "feature2"], n_bins=3)
+
+    written = run_iv_by_segments(
+        input_path=data_path,
+        label_col="label",
+        segment_col="segment",
+        segments=["MTB", "YNTB"],
+        output_dir=tmp_path,
+        binning_spec=spec,
+    )
+
+    assert [p.name for p in written] == ["MTB_features_IV.csv", "YNTB_features_IV.csv"]
+    assert set(pd.read_csv(written[0], index_col=0).index) == {"feature1", "feature2"}
+
+
+def test_run_iv_by_segments_streaming_matches_in_memory(tmp_path: Path):
+    rng = np.random.default_rng(11)
+    n = 3000
+    df = pd.DataFrame(
+        {
+            "x1": rng.normal(size=n),
+            "x2": np.where(rng.uniform(size=n) < 0.1, np.nan, rng.uniform(size=n)),
+            "label": rng.integers(0, 2, size=n),
+            "segment": rng.choice(["MTB", "YNTB"], size=n),
+        }
+    )
+    data_path = tmp_path / "data.parquet"
+    df.to_parquet(data_path, row_group_size=500)
+
+    kwargs = dict(
+        input_path=data_path,
+        label_col="label",
+        segment_col="segment",
+        feature_cols=["x1", "x2"],
+        n_bins=5,
+        include_all=True,
+    )
+    in_memory = run_iv_by_segments(output_dir=tmp_path / "mem", **kwargs)
+    streamed = run_iv_by_segments(output_dir=tmp_path / "stream", streaming=True, batch_size=256, **kwargs)
+
+    assert [p.name for p in streamed] == [p.name for p in in_memory]
+    assert len(streamed) == 3
+    for mem_path, stream_path in zip(in_memory, streamed):
+        pd.testing.assert_frame_equal(pd.read_csv(mem_path), pd.read_csv(stream_path))
+
+
+@pytest.mark.parametrize("method", ["quantile", "tree"])
+def test_streaming_feature_missing_in_one_segment(tmp_path: Path, method: str):
+    rng = np.random.default_rng(13)
+    n = 2000
+    segment = rng.choice(["MTB", "YNTB"], size=n)
+    df = pd.DataFrame(
+        {
+            "x1": rng.normal(size=n),
+            "x2": np.where(segment == "YNTB", np.nan, rng.uniform(size=n)),
+            "label": rng.integers(0, 2, size=n),
+            "segment": segment,
+        }
+    )
+    data_path = tmp_path / "data.parquet"
+    df.to_parquet(data_path, row_group_size=500)
+
+    kwargs = dict(
+        input_path=data_path,
+        label_col="label",
+        segment_col="segment",
+        feature_cols=["x1", "x2"],
+        binning_method=method,
+        n_bins=4,
+    )
+    in_memory = run_iv_by_segments(output_dir=tmp_path / "mem", **kwargs)
+    streamed = run_iv_by_segments(output_dir=tmp_path / "stream", streaming=True, batch_size=256, **kwargs)
+
+    for mem_path, stream_path in zip(in_memory, streamed):
+        pd.testing.assert_frame_equal(pd.read_csv(mem_path), pd.read_csv(stream_path))
+    yntb = pd.read_csv(tmp_path / "stream" / "YNTB_features_IV.csv", index_col=0)
+    assert yntb.loc["x2"].iloc[0] == 0
+
+
+def test_streaming_quantile_sketch_close_to_exact(tmp_path: Path):
+    rng = np.random.default_rng(12)
+    n = 20000
+    x = rng.normal(size=n)
+    df = pd.DataFrame(
+        {
+            "x1": x,
+            "label": (rng.uniform(size=n) < 1 / (1 + np.exp(-x))).astype(int),
+            "segment": rng.choice(["MTB", "YNTB"], size=n),
+        }
+    )
+    data_path = tmp_path / "data.parquet"
+    df.to_parquet(data_path, row_group_size=4000)
+
+    kwargs = dict(input_path=data_path, label_col="label", segment_col="segment", segments=["MTB", "YNTB"])
+    exact = run_iv_by_segments(output_dir=tmp_path / "exact", **kwargs)
+    approx = run_iv_by_segments(
+        output_dir=tmp_path / "sketch", streaming=True, batch_size=1000, quantile_engine="sketch", **kwargs
+    )
+
+    for exact_path, approx_path in zip(exact, approx):
+        iv_exact = pd.read_csv(exact_path, index_col=0)["IV"]["x1"]
+        iv_approx = pd.read_csv(approx_path, index_col=0)["IV"]["x1"]
+        assert iv_approx == pytest.approx(iv_exact, rel=0.05)
+
+
+def test_streaming_quantile_sketch_bins_string_feature(tmp_path: Path):
+    rng = np.random.default_rng(14)
+    n = 6000
+    region = rng.choice(["north", "south", "east", None], size=n, p=[0.4, 0.3, 0.2, 0.1])
+    bad_rate = pd.Series(region).map({"north": 0.1, "south": 0.3, "east": 0.5}).fillna(0.2).to_numpy()
+    df = pd.DataFrame(
+        {
+            "x1": rng.normal(size=n),
+            "region": region,
+            "label": (rng.uniform(size=n) < bad_rate).astype(int),
+            "segment": rng.choice(["MTB", "YNTB"], size=n),
+        }
+    )
+    data_path = tmp_path / "data.parquet"
+    df.to_parquet(data_path, row_group_size=1500)
+
+    kwargs = dict(input_path=data_path, label_col="label", segment_col="segment", segments=["MTB", "YNTB"])
+    exact = run_iv_by_segments(output_dir=tmp_path / "exact", **kwargs)
+    approx = run_iv_by_segments(
+        output_dir=tmp_path / "sketch", streaming=True, batch_size=1000, quantile_engine="sketch", **kwargs
+    )
+
+    for exact_path, approx_path in zip(exact, approx):
+        iv_exact = pd.read_csv(exact_path, index_col=0)["IV"]["region"]
+        iv_approx = pd.read_csv(approx_path, index_col=0)["IV"]["region"]
+        assert iv_exact > 0.1
+        assert iv_approx == pytest.approx(iv_exact)
+
+
+def test_run_iv_by_segments_discovers_segments(tmp_path: Path, sample_df: pd.DataFrame):
+    data_path = tmp_path / "test_data.csv"
+    sample_df.to_csv(data_path, index=False)
+
+    written = run_iv_by_segments(
+        input_path=data_path,
+        label_col="label",
+        segment_col="segment",
+        output_dir=tmp_path,
+        n_bins=3,
+        include_all=True,
+    )
+
+    assert [p.name for p in written] == ["MTB_features_IV.csv", "YNTB_features_IV.csv", "ALL_features_IV.csv"]
+    assert set(pd.read_csv(written[0], index_col=0).index) == {"feature1", "feature2"}
+
+
+def test_load_input_pushes_down_columns_and_segments(tmp_path: Path):
+    n = 4000
+    df = pd.DataFrame(
+        {
+            "segment": np.repeat(["A", "B", "C", "D"], n // 4),
+            "label": np.tile([0, 1], n // 2),
+            **{f"f{i}": np.arange(n, dtype=float) for i in range(10)},
+        }
+    )
+    data_path = tmp_path / "data.parquet"
+    df.to_parquet(data_path, row_group_size=500)
+
+    loaded, stats = load_input(data_path, columns=["segment", "label", "f0"], segment_col="segment", segments=["B"])
+
+    assert list(loaded.columns) == ["segment", "label", "f0"]
+    assert set(loaded["segment"]) == {"B"} and len(loaded) == n // 4
+    assert stats["row_groups_read"] == 2 and stats["row_groups_total"] == 8
+    assert stats["rows_read"] == n // 4
+    assert stats["bytes_read"] < stats["bytes_total"] / 10
+
+
+def test_run_iv_by_segments_reports_load_stats(tmp_path: Path, sample_df: pd.DataFrame):
+    data_path = tmp_path / "data.parquet"
+    sample_df.assign(unused=1.0).to_parquet(data_path)
+    load_stats = {}
+
+    run_iv_by_segments(
+        input_path=data_path,
+        label_col="label",
+        segment_col="segment",
+        segments=["MTB"],
+        feature_cols=["feature1"],
+        output_dir=tmp_path,
+        n_bins=2,
+        load_stats=load_stats,
+    )
+
+    assert load_stats["columns"] == ["feature1", "label", "segment"]
+    assert load_stats["rows_loaded"] == 3
+
+
+def test_run_iv_by_segments_period_table_streaming_matches_in_memory(tmp_path: Path):
+    rng = np.random.default_rng(21)
+    n = 3000
+    df = pd.DataFrame(
+        {
+            "x1": rng.normal(size=n),
+            "label": rng.integers(0, 2, size=n),
+            "segment": rng.choice(["MTB", "YNTB"], size=n),
+            "month": rng.choice(["2024-01", "2024-02", "2024-03"], size=n),
+        }
+    )
+    data_path = tmp_path / "data.parquet"
+    df.to_parquet(data_path, row_group_size=500)
+    kwargs = dict(
+        input_path=data_path,
+        label_col="label",
+        segment_col="segment",
+        time_col="month",
+        n_bins=5,
+        include_all=True,
+    )
+    in_memory = run_iv_by_segments(output_dir=tmp_path / "mem", **kwargs)
+    streamed = run_iv_by_segments(output_dir=tmp_path / "stream", streaming=True, batch_size=256, **kwargs)
+
+    assert [p.name for p in in_memory] == ["IV_by_period.csv"]
+    mem_table, stream_table = pd.read_csv(in_memory[0]), pd.read_csv(streamed[0])
+    pd.testing.assert_frame_equal(mem_table, stream_table)
+    assert len(mem_table) == 3 * 3
+
+
+def test_load_input_optimize_memory(tmp_path: Path):
+    rng = np.random.default_rng(8)
+    n = 5000
+    df = pd.DataFrame(
+        {
+            "x1": rng.normal(size=n),
+            "term": rng.integers(0, 60, size=n),
+            "product": rng.choice(["card", "loan", "mortgage"], size=n),
+            "label": rng.choice(["good", "bad"], size=n),
+            "segment": rng.choice(["MTB", "YNTB"], size=n),
+        }
+    )
+    data_path = tmp_path / "data.parquet"
+    df.to_parquet(data_path)
+
+    loaded, stats = load_input(data_path, optimize_memory=True, label_col="label", positive_label="bad")
+    assert stats["memory_after"] < stats["memory_before"]
+    assert isinstance(loaded["product"].dtype, pd.CategoricalDtype)
+    assert loaded["label"].dtype == np.uint8
+    assert loaded["label"].sum() == (df["label"] == "bad").sum()
+
+    kwargs = dict(input_path=data_path, label_col="label", segment_col="segment", positive_label="bad",
+                  feature_cols=["term", "product"], n_bins=5)
+    plain = run_iv_by_segments(output_dir=tmp_path / "plain", **kwargs)
+    lean = run_iv_by_segments(output_dir=tmp_path / "lean", optimize_memory=True, **kwargs)
+    for a, b in zip(plain, lean):
+        pd.testing.assert_frame_equal(pd.read_csv(a), pd.read_csv(b))
+
+
+def test_arrow_table_optimize_memory_keeps_string_label(tmp_path: Path):
+    pa = pytest.importorskip("pyarrow")
+    rng = np.random.default_rng(14)
+    n = 2000
+    df = pd.DataFrame(
+        {
+            "x1": rng.normal(size=n),
+            "label": rng.choice(["GOOD", "BAD"], size=n),
+            "segment": rng.choice(["MTB", "YNTB"], size=n),
+        }
+    )
+    kwargs = dict(label_col="label", segment_col="segment", positive_label="BAD", n_bins=5)
+
+    plain = run_iv_by_segments(input_path=pa.Table.from_pandas(df), output_dir=tmp_path / "plain", **kwargs)
+    load_stats = {}
+    lean = run_iv_by_segments(
+        input_path=pa.Table.from_pandas(df), output_dir=tmp_path / "lean",
+        optimize_memory=True, load_stats=load_stats, **kwargs
+    )
+    assert not load_stats.get("label_recoded")
+    for a, b in zip(plain, lean):
+        pd.testing.assert_frame_equal(pd.read_csv(a), pd.read_csv(b))
+
+
+def test_run_iv_by_segments_accepts_arrow_table(tmp_path: Path):
+    pa = pytest.importorskip("pyarrow")
+    rng = np.random.default_rng(13)
+    n = 2000
+    df = pd.DataFrame(
+        {
+            "x1": rng.normal(size=n),
+            "label": rng.integers(0, 2, size=n),
+            "segment": rng.choice(["MTB", "YNTB", "OTHER"], size=n),
+        }
+    )
+    data_path = tmp_path / "data.parquet"
+    df.to_parquet(data_path)
+    kwargs = dict(label_col="label", segment_col="segment", segments=["MTB", "YNTB"], n_bins=5)
+
+    from_file = run_iv_by_segments(input_path=data_path, output_dir=tmp_path / "file", **kwargs)
+    load_stats = {}
+    from_table = run_iv_by_segments(
+        input_path=pa.Table.from_pandas(df), output_dir=tmp_path / "table", load_stats=load_stats, **kwargs
+    )
+    assert load_stats["rows_loaded"] < load_stats["rows_total"]
+    for a, b in zip(from_file, from_table):
+        pd.testing.assert_frame_equal(pd.read_csv(a), pd.read_csv(b))
+
 
 # run with below:
-# python -m pytest source/test/test_iv_engine.py -s
\ No newline at end of file
+# python -m pytest source/test/test_iv_engine.py -s
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from source.tools.data_handling import bin_feature_codes
+from source.tools.quantile_sketch import UPDATE_CHUNK_FACTOR, KLLSketch
+
+
+def _max_rank_error(sketch: KLLSketch, values: np.ndarray, qs: np.ndarray) -> float:
+    ordered = np.sort(values)
+    ranks = np.searchsorted(ordered, sketch.quantiles(qs), side="right") / len(values)
+    return float(np.abs(ranks - qs).max())
+
+
+@pytest.mark.parametrize("eps", [0.05, 0.01])
+def test_sketch_respects_rank_error(eps: float):
+    values = np.random.default_rng(5).lognormal(size=200_000)
+    sketch = KLLSketch(eps, seed=0).update(values)
+    qs = np.linspace(0.05, 0.95, 19)
+    assert _max_rank_error(sketch, values, qs) <= eps
+
+
+def test_update_compacts_in_bounded_chunks():
+    class RecordingSketch(KLLSketch):
+        largest = 0
+
+        def _compress(self):
+            self.largest = max(self.largest, len(self._levels[0]))
+            super()._compress()
+
+    values = np.random.default_rng(4).normal(size=500_000)
+    sketch = RecordingSketch(0.01, seed=0).update(values)
+    assert sketch.n == len(values)
+    assert sketch.largest <= (UPDATE_CHUNK_FACTOR + 1) * sketch.k
+    assert _max_rank_error(sketch, values, np.linspace(0.05, 0.95, 19)) <= 0.01
+
+
+def test_merged_sketches_cover_all_chunks():
+    values = np.random.default_rng(6).normal(size=100_000)
+    merged = KLLSketch(0.01, seed=0)
+    for i, chunk in enumerate(np.array_split(values, 7)):
+        merged.merge(KLLSketch(0.01, seed=i).update(chunk))
+
+    assert merged.n == len(values)
+    assert merged.min == values.min() and merged.max == values.max()
+    assert _max_rank_error(merged, values, np.linspace(0.1, 0.9, 9)) <= 0.01
+
+    restored = KLLSketch.from_dict(merged.to_dict())
+    np.testing.assert_array_equal(restored.quantiles([0.25, 0.5]), merged.quantiles([0.25, 0.5]))
+
+
+def test_sketch_binning_close_to_qcut():
+    rng = np.random.default_rng(8)
+    s = pd.Series(np.where(rng.uniform(size=50_000) < 0.05, np.nan, rng.exponential(size=50_000)))
+    exact = bin_feature_codes(s, method="quantile", n_bins=10)
+    approx = bin_feature_codes(s, method="quantile", n_bins=10, quantile_engine="sketch")
+
+    assert approx.n_codes == exact.n_codes
+    np.testing.assert_array_equal(approx.codes == 0, exact.codes == 0)
+    # bin shares stay within the rank error bound of 10% each
+    shares = np.bincount(approx.codes)[1:] / np.count_nonzero(approx.codes)
+    assert np.abs(shares - 0.1).max() < 0.02
@@ -0,0 +1,89 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from source.tools.score_analysis import analyze_score, run_score_analysis, score_tables_from_histograms
+
+
+@pytest.fixture()
+def scored_df():
+    rng = np.random.default_rng(24)
+    n = 5000
+    score = rng.uniform(size=n)
+    score[rng.uniform(size=n) < 0.02] = np.nan
+    label = (rng.uniform(size=n) < np.nan_to_num(score, nan=0.5) * 0.4).astype(int)
+    return pd.DataFrame({
+        "pd": score,
+        "label": label,
+        "segment": rng.choice(["MTB", "YNTB"], size=n),
+    })
+
+
+def test_gains_table_matches_pandas(scored_df: pd.DataFrame):
+    tables = analyze_score(scored_df, "label", "pd", segment_col="segment", include_all=True)
+    gains = tables["gains"]
+    assert set(gains["Segment"]) == {"MTB", "YNTB", "ALL"}
+
+    for seg, seg_gains in gains.groupby("Segment"):
+        ref = scored_df if seg == "ALL" else scored_df[scored_df["segment"] == seg]
+        ref = ref.dropna(subset=["pd"]).sort_values("pd", ascending=False)
+        group = np.arange(len(ref)) * 10 // len(ref)
+        by_group = ref.groupby(group)["label"].agg(["count", "sum"])
+        np.testing.assert_array_equal(seg_gains["count"], by_group["count"])
+        np.testing.assert_array_equal(seg_gains["bads"], by_group["sum"])
+        capture = by_group["sum"].cumsum() / by_group["sum"].sum()
+        np.testing.assert_allclose(seg_gains["cum_bad_capture"], capture)
+        lift = (by_group["sum"] / by_group["count"]) / ref["label"].mean()
+        np.testing.assert_allclose(seg_gains["lift"], lift)
+        assert seg_gains["bad_rate"].iloc[0] > seg_gains["bad_rate"].iloc[-1]
+
+
+def test_bands_and_cutoffs(scored_df: pd.DataFrame):
+    tables = analyze_score(scored_df, "label", "pd", score_bands=[0.2, 0.5, 0.8], n_cutoffs=None)
+    bands = tables["bands"]
+    ref = scored_df.dropna(subset=["pd"])
+    ref_counts = pd.cut(ref["pd"], [-np.inf, 0.2, 0.5, 0.8, np.inf]).value_counts().sort_index(ascending=False)
+    assert list(bands["band"]) == [str(i) for i in ref_counts.index]
+    np.testing.assert_array_equal(bands["count"], ref_counts.to_numpy())
+
+    cutoffs = tables["cutoffs"]
+    assert len(cutoffs) == ref["pd"].nunique()
+    row = cutoffs.iloc[len(cutoffs) // 2]
+    rejected = ref["pd"] >= row["cutoff"]
+    assert row["reject_rate"] == pytest.approx(rejected.mean())
+    assert row["approved_bad_rate"] == pytest.approx(ref.loc[~rejected, "label"].mean())
+    assert row["bad_capture"] == pytest.approx(ref.loc[rejected, "label"].sum() / ref["label"].sum())
+
+
+def test_empty_histograms_give_empty_tables(scored_df: pd.DataFrame):
+    full = analyze_score(scored_df, "label", "pd", score_bands=[0.5])
+    for tables in (
+        score_tables_from_histograms({}, score_bands=[0.5]),
+        analyze_score(scored_df, "label", "pd", segment_col="segment", segments=["NTB"], score_bands=[0.5]),
+    ):
+        assert set(tables) == set(full)
+        for kind, table in tables.items():
+            assert table.empty
+            assert list(table.columns) == list(full[kind].columns)
+
+
+def test_streaming_close_to_in_memory(tmp_path: Path, scored_df: pd.DataFrame):
+    pytest.importorskip("pyarrow")
+    input_path = tmp_path / "scored.parquet"
+    scored_df.to_parquet(input_path, row_group_size=1000)
+    kwargs = dict(label_col="label", score_col="pd", segment_col="segment", include_all=True)
+    exact_paths = run_score_analysis(input_path, output_dir=tmp_path / "exact", **kwargs)
+    stream_paths = run_score_analysis(
+        input_path, output_dir=tmp_path / "stream", streaming=True, batch_size=700, **kwargs
+    )
+    assert [p.name for p in exact_paths] == [p.name for p in stream_paths]
+
+    exact = pd.read_csv(tmp_path / "exact" / "score_gains.csv")
+    stream = pd.read_csv(tmp_path / "stream" / "score_gains.csv")
+    for seg in ("MTB", "YNTB", "ALL"):
+        e, s = exact[exact["Segment"] == seg], stream[stream["Segment"] == seg]
+        assert e["count"].sum() == s["count"].sum()
+        assert e["bads"].sum() == s["bads"].sum()
+        np.testing.assert_allclose(s["cum_bad_capture"], e["cum_bad_capture"], atol=0.02)
@@ -0,0 +1,104 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from source.tools.screening import correlation_matrix, screen_features, screen_features_tool, vif_from_correlation
+
+
+@pytest.fixture()
+def wide_df():
+    rng = np.random.default_rng(19)
+    n = 3000
+    x1 = rng.normal(size=n)
+    x3 = rng.normal(size=n)
+    df = pd.DataFrame(
+        {
+            "x1": x1 + 1000.0,
+            "x1_copy": 2 * x1 + 0.05 * rng.normal(size=n),
+            "x2": rng.uniform(size=n),
+            "x3": x3,
+            "x4": x3 + x1 + 0.8 * rng.normal(size=n),
+            "label": (rng.uniform(size=n) < 1 / (1 + np.exp(-x1))).astype(int),
+        }
+    )
+    df.loc[rng.choice(n, 300, replace=False), "x2"] = np.nan
+    return df
+
+
+def test_blocked_correlation_matches_pandas(wide_df: pd.DataFrame):
+    features = ["x1", "x1_copy", "x2", "x3", "x4"]
+    corr = correlation_matrix(wide_df, features, chunk_rows=700, block_size=2)
+    expected = wide_df[features].corr()  # pairwise-complete, like the blocked kernel
+    np.testing.assert_allclose(corr.to_numpy(), expected.to_numpy(), atol=1e-4)
+
+
+def test_arrow_and_nullable_columns_match_pandas(wide_df: pd.DataFrame):
+    pa = pytest.importorskip("pyarrow")
+    features = ["x1", "x2", "x3", "n_int"]
+    df = wide_df.assign(n_int=pd.array(np.arange(len(wide_df)) % 7, dtype="Int64"))
+    df.loc[::11, "n_int"] = pd.NA
+    expected = df[features].astype(float).corr()
+
+    corr = correlation_matrix(df, features, chunk_rows=700)
+    np.testing.assert_allclose(corr.to_numpy(), expected.to_numpy(), atol=1e-4)
+    arrow_corr = correlation_matrix(pa.Table.from_pandas(df), features, chunk_rows=700)
+    np.testing.assert_allclose(arrow_corr.to_numpy(), expected.to_numpy(), atol=1e-4)
+
+
+def test_multi_chunk_arrow_is_converted_per_chunk(monkeypatch, wide_df: pd.DataFrame):
+    pa = pytest.importorskip("pyarrow")
+    from source.tools import screening
+
+    features = ["x1", "x1_copy", "x2", "x4"]
+    table = pa.Table.from_pandas(wide_df[features], preserve_index=False)
+    table = pa.Table.from_batches(table.to_batches(max_chunksize=1000))
+    assert table.column("x1").num_chunks == 3
+
+    converted = []
+    column_values = screening._column_values
+    monkeypatch.setattr(screening, "_column_values", lambda s: converted.append(len(s)) or column_values(s))
+    corr = correlation_matrix(table, features, chunk_rows=700)
+    assert max(converted) == 700
+    np.testing.assert_allclose(corr.to_numpy(), wide_df[features].corr().to_numpy(), atol=1e-4)
+
+
+def test_vif_matches_regression(wide_df: pd.DataFrame):
+    features = ["x1", "x3", "x4"]
+    vif = vif_from_correlation(correlation_matrix(wide_df, features))
+    X = wide_df[features].to_numpy()
+    for j, feature in enumerate(features):
+        others = np.column_stack([np.ones(len(X)), np.delete(X, j, axis=1)])
+        beta, *_ = np.linalg.lstsq(others, X[:, j], rcond=None)
+        resid = X[:, j] - others @ beta
+        r2 = 1 - resid.var() / X[:, j].var()
+        assert vif[feature] == pytest.approx(1 / (1 - r2), rel=1e-3)
+
+
+def test_screen_keeps_higher_iv_feature(wide_df: pd.DataFrame):
+    iv = pd.Series({"x1": 0.1, "x1_copy": 0.5, "x2": 0.01, "x3": 0.02, "x4": 0.2})
+    result = screen_features(wide_df, feature_cols=list(iv.index), iv=iv, vif_threshold=None)
+    assert result["selected"] == ["x1_copy", "x4", "x3", "x2"]
+    dropped = result["dropped"].set_index("Feature")
+    assert dropped.loc["x1", "reason"] == "correlation"
+    assert dropped.loc["x1", "related_to"] == "x1_copy"
+
+    strict = screen_features(wide_df, feature_cols=list(iv.index), iv=iv, vif_threshold=1.5)
+    assert strict["vif"].max() <= 1.5
+    assert "vif" in set(strict["dropped"]["reason"])
+
+
+def test_screen_features_tool(tmp_path: Path, wide_df: pd.DataFrame):
+    input_path = tmp_path / "wide.parquet"
+    wide_df.to_parquet(input_path)
+    payload = json.loads(screen_features_tool.invoke({
+        "input_path": str(input_path),
+        "label_col": "label",
+        "output_dir": str(tmp_path / "out"),
+    }))
+    assert "x1" in payload["selected"] or "x1_copy" in payload["selected"]
+    assert not {"x1", "x1_copy"} <= set(payload["selected"])
+    for path in payload["written_files"]:
+        assert Path(path).exists()
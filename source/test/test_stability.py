@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from source.tools.data_handling import BinningSpec
+from source.tools.stability import analyze_feature_stability
+
+
+@pytest.fixture()
+def monitoring_frames():
+    rng = np.random.default_rng(21)
+    train = pd.DataFrame({"x1": rng.normal(size=5000), "x2": rng.uniform(size=5000), "score": rng.uniform(size=5000)})
+    months = []
+    for shift, month in zip([0.0, 0.5, 1.0], ["2024-01", "2024-02", "2024-03"]):
+        months.append(
+            pd.DataFrame(
+                {
+                    "x1": rng.normal(loc=shift, size=3000),
+                    "x2": rng.uniform(size=3000),
+                    "score": rng.uniform(size=3000),
+                    "month": month,
+                }
+            )
+        )
+    return train, pd.concat(months, ignore_index=True)
+
+
+def _reference_psi(expected: pd.Series, actual: pd.Series, edges: np.ndarray) -> float:
+    inner = edges[1:-1]
+    e = np.bincount(np.searchsorted(inner, expected, side="left"), minlength=len(edges) - 1) / len(expected)
+    a = np.bincount(np.searchsorted(inner, actual, side="left"), minlength=len(edges) - 1) / len(actual)
+    e, a = np.clip(e, 1e-6, None), np.clip(a, 1e-6, None)
+    return float(((a - e) * np.log(a / e)).sum())
+
+
+def test_stability_matrix_per_period(monitoring_frames):
+    train, test = monitoring_frames
+    result = analyze_feature_stability(train, test, feature_cols=["x1", "x2"], score_col="score", period_col="month")
+
+    csi = result["csi"]
+    assert list(csi.columns) == ["2024-01", "2024-02", "2024-03"]
+    assert list(csi.index) == ["x1", "x2"]
+    # drifting feature grows, stable feature stays small
+    assert csi.loc["x1"].is_monotonic_increasing and csi.loc["x1", "2024-03"] > 0.25
+    assert (csi.loc["x2"] < 0.05).all()
+    assert (result["psi"] < 0.05).all()
+
+    spec = BinningSpec.fit(train, ["x1"], n_bins=10)
+    march = test[test["month"] == "2024-03"]
+    assert csi.loc["x1", "2024-03"] == pytest.approx(_reference_psi(train["x1"], march["x1"], spec.edges["x1"]))
+
+
+def test_stability_with_frames_mapping_and_prefit_spec(monitoring_frames):
+    train, test = monitoring_frames
+    spec = BinningSpec.fit(train, ["x1", "x2"], n_bins=5)
+    frames = {month: frame for month, frame in test.groupby("month")}
+
+    result = analyze_feature_stability(train, frames, binning_spec=spec)
+    by_period = analyze_feature_stability(train, test, binning_spec=spec, period_col="month")
+
+    pd.testing.assert_frame_equal(result["csi"], by_period["csi"])
+    assert "psi" not in result
+    shares = result["per_bin"]["actual_pct"].groupby(level=["Period", "Feature"]).sum()
+    np.testing.assert_allclose(shares, 1.0)
+
+
+def test_empty_period_is_nan(monitoring_frames):
+    train, test = monitoring_frames
+    frames = {month: frame for month, frame in test.groupby("month")}
+    frames["2024-04"] = test.iloc[:0]
+
+    result = analyze_feature_stability(train, frames, feature_cols=["x1"], score_col="score")
+    assert result["csi"]["2024-04"].isna().all()
+    assert np.isnan(result["psi"]["2024-04"])
+    assert result["csi"].loc["x1"].idxmax() == "2024-03"
+    per_bin = result["per_bin"].xs("2024-04", level="Period")
+    assert (per_bin["actual_count"] == 0).all() and per_bin["psi"].isna().all()
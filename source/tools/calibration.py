@@ -0,0 +1,401 @@
+"""PD calibration diagnostics per segment and period.
+
+Rows are coded once into (segment, period, PD band) cells and four
+additive sums are taken with one ``np.bincount`` each over the flat cell
+index: rows, defaults, expected defaults (sum of PD) and squared errors.
+Expected-vs-observed rates, Hosmer-Lemeshow, Brier score and binomial
+p-values are all derived from those (segment x period x band) arrays; ALL
+segment / period totals are sums over an axis, not extra passes. Batches
+of a streamed Parquet file only add to the same arrays.
+"""
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from langchain.tools import tool
+from scipy import stats
+
+from .data_handling import ALL_SEGMENT, _as_frame, _interval_labels, _is_arrow, _sketch_edges, _to_float_array
+from .iv_engine import (
+    STREAM_BATCH_SIZE,
+    _discover_segments,
+    _ensure_output_dir,
+    _open_parquet,
+    _prune_row_groups,
+    load_input,
+)
+from .quantile_sketch import DEFAULT_RANK_EPS, KLLSketch
+
+ALL_PERIOD = "ALL"
+
+
+def _pd_band_edges(pd_values: np.ndarray, n_bands: int, pd_bands: Optional[Sequence[float]]) -> np.ndarray:
+    """Inner PD band edges: the given master scale, or PD quantiles of the sample."""
+    if pd_bands is not None:
+        return np.unique(np.asarray(pd_bands, dtype=np.float64))
+    valid = pd_values[~np.isnan(pd_values)]
+    if len(valid) == 0:
+        return np.empty(0)
+    return np.unique(np.quantile(valid, np.linspace(0, 1, n_bands + 1)))[1:-1]
+
+
+def _check_pd(pd_values: np.ndarray, pd_col: str) -> None:
+    if ((pd_values < 0) | (pd_values > 1)).any():
+        raise ValueError(f"PD column '{pd_col}' must hold probabilities in [0, 1].")
+
+
+def _calibration_sums(
+    pd_values: np.ndarray,
+    y: np.ndarray,
+    seg_codes: np.ndarray,
+    period_codes: np.ndarray,
+    inner_edges: np.ndarray,
+    shape: Tuple[int, int],
+) -> np.ndarray:
+    """(4, segments, periods, bands) sums of rows, defaults, PD and squared error.
+
+    Rows with a missing PD or a code of -1 are left out.
+    """
+    n_bands = len(inner_edges) + 1
+    n_cells = shape[0] * shape[1] * n_bands
+    keep = ~np.isnan(pd_values) & (seg_codes >= 0) & (period_codes >= 0)
+    p, d = pd_values[keep], y[keep]
+    band = np.searchsorted(inner_edges, p, side="left")
+    flat = (seg_codes[keep] * shape[1] + period_codes[keep]) * n_bands + band
+    sums = np.stack([
+        np.bincount(flat, minlength=n_cells),
+        np.bincount(flat, weights=d, minlength=n_cells),
+        np.bincount(flat, weights=p, minlength=n_cells),
+        np.bincount(flat, weights=(p - d) ** 2, minlength=n_cells),
+    ]).astype(np.float64)
+    return sums.reshape(4, shape[0], shape[1], n_bands)
+
+
+def _add_totals(
+    sums: np.ndarray,
+    segments: List[Any],
+    periods: List[Any],
+    segment_col: Optional[str],
+    time_col: Optional[str],
+) -> Tuple[np.ndarray, List[Any], List[Any]]:
+    """Append the ALL segment and ALL period as sums over the cell axes.
+
+    ``sums`` carries one extra trailing segment slot for rows outside
+    ``segments``: it counts towards ALL and is then dropped. An axis without
+    a column already is ALL and gets no total.
+    """
+    if segment_col is not None:
+        sums = np.concatenate([sums[:, :len(segments)], sums.sum(axis=1, keepdims=True)], axis=1)
+        segments = [*segments, ALL_SEGMENT]
+    else:
+        sums = sums[:, :len(segments)]
+    if time_col is not None:
+        sums = np.concatenate([sums, sums.sum(axis=2, keepdims=True)], axis=2)
+        periods = [*periods, ALL_PERIOD]
+    return sums, segments, periods
+
+
+def calibration_from_sums(
+    sums: np.ndarray,
+    segments: List[Any],
+    periods: List[Any],
+    band_labels: List[str],
+) -> Dict[str, pd.DataFrame]:
+    """
+    Calibration tables from (4, segments, periods, bands) sums.
+
+    Returns
+    -------
+    Dict[str, pd.DataFrame]
+        - 'bands' : one row per non-empty (Segment, Period, Band) with n,
+          defaults, expected_defaults, observed_rate, mean_pd and the
+          one-sided binomial p-value of observing at least that many
+          defaults under the band's mean PD.
+        - 'summary' : one row per non-empty (Segment, Period) with n,
+          defaults, observed_rate, mean_pd, brier, the Hosmer-Lemeshow
+          statistic over the bands (hl_stat, hl_dof = bands - 2, hl_p_value)
+          and the overall binomial p-value.
+    """
+    n, d, e, sq = sums
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_pd = e / n
+        band_p = stats.binom.sf(d - 1, n, np.clip(mean_pd, 0, 1))
+        variance = e * (1 - mean_pd)
+        hl_terms = np.where(variance > 0, (d - e) ** 2 / variance, 0.0)
+
+        n_cell, d_cell, e_cell = n.sum(-1), d.sum(-1), e.sum(-1)
+        cell_pd = e_cell / n_cell
+        hl_dof = np.maximum((n > 0).sum(-1) - 2, 1)
+        hl_stat = hl_terms.sum(-1)
+        summary = pd.DataFrame({
+            "Segment": np.repeat(np.asarray(segments, dtype=object), len(periods)),
+            "Period": np.tile(np.asarray(periods, dtype=object), len(segments)),
+            "n": n_cell.ravel(),
+            "defaults": d_cell.ravel(),
+            "observed_rate": (d_cell / n_cell).ravel(),
+            "mean_pd": cell_pd.ravel(),
+            "brier": (sq.sum(-1) / n_cell).ravel(),
+            "hl_stat": hl_stat.ravel(),
+            "hl_dof": hl_dof.ravel(),
+            "hl_p_value": stats.chi2.sf(hl_stat, hl_dof).ravel(),
+            "binomial_p_value": stats.binom.sf(d_cell - 1, n_cell, np.clip(cell_pd, 0, 1)).ravel(),
+        })
+
+    n_seg, n_per, n_bands = n.shape
+    bands = pd.DataFrame({
+        "Segment": np.repeat(np.asarray(segments, dtype=object), n_per * n_bands),
+        "Period": np.tile(np.repeat(np.asarray(periods, dtype=object), n_bands), n_seg),
+        "Band": np.tile(np.asarray(band_labels, dtype=object), n_seg * n_per),
+        "n": n.ravel(),
+        "defaults": d.ravel(),
+        "expected_defaults": e.ravel(),
+        "observed_rate": (d / np.where(n > 0, n, 1)).ravel(),
+        "mean_pd": (e / np.where(n > 0, n, 1)).ravel(),
+        "binomial_p_value": band_p.ravel(),
+    })
+    return {
+        "bands": bands[bands["n"] > 0].reset_index(drop=True),
+        "summary": summary[summary["n"] > 0].reset_index(drop=True),
+    }
+
+
+def calculate_calibration(
+    df: pd.DataFrame,
+    label_col: str,
+    pd_col: str,
+    segment_col: Optional[str] = None,
+    time_col: Optional[str] = None,
+    segments: Optional[Sequence[Any]] = None,
+    include_all: bool = False,
+    n_bands: int = 10,
+    pd_bands: Optional[Sequence[float]] = None,
+    positive_label: Any = 1,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Expected-vs-observed calibration per (segment, period, PD band) in one pass.
+
+    Parameters
+    ----------
+    df : pd.DataFrame or pyarrow.Table
+        Input data with label, PD and optional segment / period columns.
+    label_col, pd_col : str
+        Default flag and predicted PD (probabilities in [0, 1]).
+    segment_col, time_col : str, optional
+        Segment and period (e.g. observation month) columns; without them
+        all rows form one 'ALL' segment / period.
+    segments : sequence, optional
+        Segments to report (default: every value of ``segment_col``).
+    include_all : bool
+        Also report ALL segment and ALL period totals.
+    n_bands : int
+        Number of PD quantile bands (fitted once on all rows, so every
+        segment and period shares them) when no ``pd_bands`` is given.
+    pd_bands : sequence of float, optional
+        Inner edges of a PD master scale; bands are right-closed.
+    positive_label : Any
+        The value in label_col that represents a default.
+
+    Returns
+    -------
+    Dict[str, pd.DataFrame]
+        'bands' and 'summary' tables, see ``calibration_from_sums``. Rows
+        with a missing PD or period are left out.
+    """
+    df = _as_frame(df)
+    for col in (label_col, pd_col, segment_col, time_col):
+        if col is not None and col not in df.columns:
+            raise ValueError(f"Column '{col}' not found in DataFrame.")
+    pd_values = _to_float_array(df[pd_col])
+    _check_pd(pd_values[~np.isnan(pd_values)], pd_col)
+    y = (df[label_col] == positive_label).to_numpy(dtype=np.float64)
+    inner_edges = _pd_band_edges(pd_values, n_bands, pd_bands)
+
+    def axis_codes(col: Optional[str], wanted: Optional[Sequence[Any]], all_label: str):
+        if col is None:
+            return np.zeros(len(df), dtype=np.int64), [all_label]
+        codes, values = pd.factorize(df[col], sort=True)
+        names = list(values) if wanted is None else list(wanted)
+        # map factorized values onto the requested names (-1 = dropped)
+        lookup = np.append(pd.Index(names).get_indexer(values), -1)
+        return lookup[codes], names
+
+    seg_codes, segment_names = axis_codes(segment_col, segments, ALL_SEGMENT)
+    period_codes, period_names = axis_codes(time_col, None, ALL_PERIOD)
+    n_slots = len(segment_names)
+    if include_all:
+        # rows of unlisted segments go to a spare slot that only feeds ALL
+        seg_codes = np.where(seg_codes < 0, n_slots, seg_codes)
+        n_slots += 1
+    sums = _calibration_sums(
+        pd_values, y, seg_codes, period_codes, inner_edges, (n_slots, len(period_names))
+    )
+    if include_all:
+        sums, segment_names, period_names = _add_totals(sums, segment_names, period_names, segment_col, time_col)
+    band_labels = _interval_labels(np.r_[-np.inf, inner_edges, np.inf], include_lowest=False)
+    return calibration_from_sums(sums, segment_names, period_names, band_labels)
+
+
+def _calibration_streaming(
+    input_path: Path,
+    label_col: str,
+    pd_col: str,
+    segment_col: Optional[str],
+    time_col: Optional[str],
+    segments: Optional[Sequence[Any]],
+    include_all: bool,
+    n_bands: int,
+    pd_bands: Optional[Sequence[float]],
+    positive_label: Any,
+    batch_size: int,
+    sketch_eps: float,
+) -> Dict[str, pd.DataFrame]:
+    """Calibration tables of a Parquet file, summed over record batches.
+
+    Without ``pd_bands`` a first batch pass fits the PD quantile bands from a
+    KLL sketch.
+    """
+    parquet_file = _open_parquet(input_path)
+    columns = parquet_file.schema_arrow.names
+    for col in (label_col, pd_col, segment_col, time_col):
+        if col is not None and col not in columns:
+            raise ValueError(f"Column '{col}' not found in input data")
+    segment_names = [ALL_SEGMENT]
+    if segment_col is not None:
+        segment_names = list(segments) if segments is not None else _discover_segments(parquet_file, segment_col)
+    period_names = [ALL_PERIOD] if time_col is None else _discover_segments(parquet_file, time_col)
+    row_groups = _prune_row_groups(parquet_file, segment_col, None if include_all else segments)
+
+    if pd_bands is None:
+        sketch = KLLSketch(sketch_eps, seed=0)
+        for batch in parquet_file.iter_batches(batch_size=batch_size, row_groups=row_groups, columns=[pd_col]):
+            sketch.update(_to_float_array(batch.column(0).to_pandas()))
+        inner_edges = _sketch_edges(sketch, n_bands)[1:-1]
+    else:
+        inner_edges = _pd_band_edges(np.empty(0), n_bands, pd_bands)
+
+    n_slots = len(segment_names) + int(include_all)
+    shape = (n_slots, len(period_names))
+    sums = np.zeros((4, *shape, len(inner_edges) + 1))
+    read_cols = [c for c in (label_col, pd_col, segment_col, time_col) if c is not None]
+    for batch in parquet_file.iter_batches(batch_size=batch_size, row_groups=row_groups, columns=read_cols):
+        chunk = batch.to_pandas()
+        pd_values = _to_float_array(chunk[pd_col])
+        _check_pd(pd_values[~np.isnan(pd_values)], pd_col)
+        y = (chunk[label_col] == positive_label).to_numpy(dtype=np.float64)
+        zeros = np.zeros(len(chunk), dtype=np.int64)
+        seg_codes = zeros if segment_col is None else pd.Index(segment_names).get_indexer(chunk[segment_col])
+        if include_all:
+            seg_codes = np.where(seg_codes < 0, len(segment_names), seg_codes)
+        period_codes = zeros if time_col is None else pd.Index(period_names).get_indexer(chunk[time_col])
+        sums += _calibration_sums(pd_values, y, seg_codes, period_codes, inner_edges, shape)
+
+    if include_all:
+        sums, segment_names, period_names = _add_totals(sums, segment_names, period_names, segment_col, time_col)
+    band_labels = _interval_labels(np.r_[-np.inf, inner_edges, np.inf], include_lowest=False)
+    return calibration_from_sums(sums, segment_names, period_names, band_labels)
+
+
+def run_calibration(
+    input_path: Path,
+    label_col: str,
+    pd_col: str,
+    segment_col: Optional[str] = None,
+    time_col: Optional[str] = None,
+    segments: Optional[Sequence[Any]] = None,
+    include_all: bool = False,
+    n_bands: int = 10,
+    pd_bands: Optional[Sequence[float]] = None,
+    positive_label=1,
+    output_dir: Path = Path("output"),
+    streaming: bool = False,
+    batch_size: int = STREAM_BATCH_SIZE,
+    sketch_eps: float = DEFAULT_RANK_EPS,
+    load_stats: Optional[Dict[str, Any]] = None,
+) -> List[Path]:
+    """Calibration tables from a CSV/Parquet file (or Arrow data), written as CSVs.
+
+    Reads only the label, PD, segment and period columns (segment filter
+    pushed down as in ``run_iv_by_segments``) and writes
+    ``calibration_bands.csv`` and ``calibration_summary.csv`` to
+    ``output_dir``. ``streaming=True`` (Parquet only) sums record batches
+    instead of loading the file.
+    """
+    if _is_arrow(input_path):
+        streaming = False
+    else:
+        input_path = Path(input_path)
+
+    if streaming:
+        tables = _calibration_streaming(
+            input_path, label_col, pd_col, segment_col, time_col, segments, include_all,
+            n_bands, pd_bands, positive_label, batch_size, sketch_eps,
+        )
+    else:
+        columns = [c for c in (label_col, pd_col, segment_col, time_col) if c is not None]
+        df, load = load_input(
+            input_path,
+            columns=columns,
+            segment_col=segment_col,
+            segments=None if include_all else segments,
+        )
+        if load_stats is not None:
+            load_stats.update(load)
+        tables = calculate_calibration(
+            df, label_col, pd_col, segment_col, time_col, segments, include_all,
+            n_bands, pd_bands, positive_label,
+        )
+
+    _ensure_output_dir(output_dir)
+    written_paths: List[Path] = []
+    for kind, table in tables.items():
+        out_path = output_dir / f"calibration_{kind}.csv"
+        table.to_csv(out_path, index=False)
+        written_paths.append(out_path)
+    return written_paths
+
+
+@tool
+def run_calibration_tool(
+    input_path: str,
+    label_col: str,
+    pd_col: str,
+    segment_col: Optional[str] = None,
+    time_col: Optional[str] = None,
+    segments: Optional[List[str]] = None,
+    include_all: bool = False,
+    n_bands: int = 10,
+    pd_bands: Optional[List[float]] = None,
+    positive_label=1,
+    output_dir: str = "output",
+    streaming: bool = False,
+) -> str:
+    """PD calibration diagnostics per segment and period from a CSV/Parquet file.
+
+    Bands the PD column (n_bands quantile bands, or the pd_bands master-scale
+    edges) and writes calibration_bands.csv (expected vs observed defaults
+    and binomial p-value per segment / period / band) and
+    calibration_summary.csv (observed rate, mean PD, Brier score,
+    Hosmer-Lemeshow statistic and p-value, binomial p-value per segment /
+    period) to output_dir. time_col is e.g. an observation-month column;
+    include_all=True adds ALL segment / period totals. streaming=True
+    processes a Parquet input in record batches.
+
+    Returns a JSON string with the written file paths.
+    """
+    paths = run_calibration(
+        input_path=Path(input_path),
+        label_col=label_col,
+        pd_col=pd_col,
+        segment_col=segment_col,
+        time_col=time_col,
+        segments=segments,
+        include_all=include_all,
+        n_bands=n_bands,
+        pd_bands=pd_bands,
+        positive_label=positive_label,
+        output_dir=Path(output_dir),
+        streaming=streaming,
+    )
+    return json.dumps({"written_files": [str(p) for p in paths]})
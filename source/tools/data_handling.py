@@ -1,262 +1,2535 @@
 import pandas as pd
+import heapq
+import json
+import os
 import numpy as np
-from typing import List, Optional, Dict, Any
+import warnings
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+import multiprocessing
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import List, Optional, Dict, Any, Sequence, Tuple, Union
 from sklearn.tree import DecisionTreeClassifier
 from langchain.tools import tool
 
+from .quantile_sketch import DEFAULT_RANK_EPS, KLLSketch
+
+# ============== 0. Memory-lean frames =================
+def optimize_dtypes(
+    df: pd.DataFrame,
+    label_col: Optional[Union[str, List[str]]] = None,
+    positive_label: Any = 1,
+    downcast_floats: bool = True,
+    exclude: Optional[List[str]] = None,
+) -> Tuple[pd.DataFrame, Dict[str, int]]:
+    """
+    Shrink a frame for binning: narrow numerics, dictionary-encode strings.
+
+    Floats become float32 (``downcast_floats``), integers the smallest
+    signed/unsigned type holding their range, and string/object columns
+    with repeated values become ``category`` (integer codes plus one copy
+    of each level). If
+    ``label_col`` is given it is replaced by a uint8 mask of
+    ``positive_label``, so downstream calls must use ``positive_label=1``.
+    A list of label columns is recoded column by column, with
+    ``positive_label`` as a scalar, a list or a {label: value} mapping (as
+    in ``calculate_iv``). Columns in ``exclude`` are left untouched.
+
+    Returns
+    -------
+    Tuple[pd.DataFrame, Dict[str, int]]
+        The optimized frame and ``memory_before`` / ``memory_after`` in bytes.
+    """
+    memory_before = int(df.memory_usage(deep=True).sum())
+    exclude = set(exclude or [])
+    label_cols = [] if label_col is None else [label_col] if isinstance(label_col, str) else list(label_col)
+    positives = dict(zip(label_cols, _label_positives(label_cols, positive_label)))
+    columns: Dict[str, Any] = {}
+    for col in df.columns:
+        series = df[col]
+        if col in exclude:
+            columns[col] = series
+        elif col in positives:
+            columns[col] = (series == positives[col]).astype(np.uint8)
+        elif pd.api.types.is_bool_dtype(series.dtype):
+            columns[col] = series
+        elif pd.api.types.is_integer_dtype(series.dtype):
+            unsigned = len(series) and series.min() >= 0
+            columns[col] = pd.to_numeric(series, downcast="unsigned" if unsigned else "integer")
+        elif pd.api.types.is_float_dtype(series.dtype):
+            columns[col] = series.astype(np.float32) if downcast_floats else series
+        elif (
+            _is_categorical(series)
+            and not isinstance(series.dtype, pd.CategoricalDtype)
+            # near-unique columns (ids) gain nothing from a dictionary
+            and series.nunique() < 0.5 * len(series)
+        ):
+            columns[col] = series.astype("category")
+        else:
+            columns[col] = series
+    optimized = pd.DataFrame(columns, index=df.index)
+    return optimized, {
+        "memory_before": memory_before,
+        "memory_after": int(optimized.memory_usage(deep=True).sum()),
+    }
+
+
+def _narrow_arrow_schema(table, exclude: Optional[Sequence[str]] = None):
+    """
+    Target schema of ``optimize_dtypes`` for an Arrow table, to cast before ``to_pandas``.
+
+    Floats become float32; integers become the smallest signed/unsigned type
+    holding their range, or float32 if they hold nulls (pandas would make
+    them float64). Strings are dictionary-encoded. Columns in ``exclude``
+    keep their type.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    exclude = set(exclude or [])
+    fields = []
+    for field, column in zip(table.schema, table.columns):
+        typ = field.type
+        if field.name in exclude:
+            pass
+        elif pa.types.is_floating(typ) and typ.bit_width > 32:
+            typ = pa.float32()
+        elif pa.types.is_integer(typ) and column.null_count:
+            typ = pa.float32()
+        elif pa.types.is_integer(typ):
+            bounds = pc.min_max(column)
+            lo, hi = bounds["min"].as_py() or 0, bounds["max"].as_py() or 0
+            candidates = (
+                (pa.uint8(), pa.uint16(), pa.uint32(), pa.uint64())
+                if lo >= 0 else (pa.int8(), pa.int16(), pa.int32(), pa.int64())
+            )
+            for candidate in candidates:
+                info = np.iinfo(candidate.to_pandas_dtype())
+                if info.min <= lo and hi <= info.max:
+                    typ = candidate
+                    break
+        elif pa.types.is_string(typ) or pa.types.is_large_string(typ):
+            typ = pa.dictionary(pa.int32(), typ)
+        fields.append(field.with_type(typ))
+    return pa.schema(fields, metadata=table.schema.metadata)
+
+
+def _is_arrow(data: Any) -> bool:
+    """Whether ``data`` is a pyarrow Table or RecordBatchReader (pyarrow is optional)."""
+    module = type(data).__module__ or ""
+    return module.startswith("pyarrow") and hasattr(data, "schema")
+
+
+def _arrow_series(column, index: pd.Index) -> pd.Series:
+    """One Arrow column as a Series, as a NumPy view whenever the buffer allows it."""
+    import pyarrow as pa
+
+    typ = column.type
+    numeric = pa.types.is_integer(typ) or pa.types.is_floating(typ)
+    if numeric and column.num_chunks == 1 and column.null_count == 0:
+        values = column.chunk(0).to_numpy(zero_copy_only=True)
+    elif numeric:
+        # nulls / several chunks: one conversion of this column only (nulls -> NaN)
+        values = column.to_numpy()
+    else:
+        # strings arrive as object, dictionary columns as category
+        return column.to_pandas().set_axis(index)
+    return pd.Series(values, index=index, copy=False)
+
+
+class _ArrowFrame:
+    """
+    Read-only, column-at-a-time view of a pyarrow Table.
+
+    Implements the small DataFrame surface the IV code uses (``columns``,
+    ``len``, ``df[col]``, boolean-mask row selection). Columns are converted
+    only when accessed, and fixed-width numeric columns without nulls are
+    NumPy views of the Arrow buffers, so no copy of the table is made.
+    """
+
+    def __init__(self, table):
+        self._table = table
+        self.columns = pd.Index(table.column_names)
+        self.index = pd.RangeIndex(table.num_rows)
+
+    def __len__(self) -> int:
+        return self._table.num_rows
+
+    @property
+    def empty(self) -> bool:
+        return self._table.num_rows == 0
+
+    def slice(self, start: int, stop: int) -> "_ArrowFrame":
+        """Rows ``start:stop`` as a zero-copy view."""
+        return _ArrowFrame(self._table.slice(start, stop - start))
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if key not in self.columns:
+                raise KeyError(key)
+            return _arrow_series(self._table.column(key), self.index)
+        # boolean row mask
+        import pyarrow as pa
+
+        return _ArrowFrame(self._table.filter(pa.array(np.asarray(key, dtype=bool))))
+
+
+def _as_frame(data: Any, columns: Optional[List[str]] = None):
+    """DataFrame as is; Arrow Table / RecordBatchReader as a zero-copy ``_ArrowFrame``."""
+    if not _is_arrow(data):
+        return data
+    table = data.read_all() if hasattr(data, "read_next_batch") else data
+    if columns is not None:
+        table = table.select([c for c in columns if c in table.column_names])
+    return _ArrowFrame(table)
+
+
 # ============== 1. Binning helper =====================
+MISSING_CODE = 0
+MISSING_LABEL = "MISSING"
+OTHER_LABEL = "OTHER"
+MAX_CATEGORIES = 50
+TREE_FINE_BINS = 1024
+ALL_SEGMENT = "ALL"
+IV_EPS = 1e-6
+
+
+@dataclass
+class BinResult:
+    """
+    Compact binning of one feature.
+
+    Attributes
+    ----------
+    codes : np.ndarray
+        Smallest unsigned integer code per row. ``MISSING_CODE`` (0) is
+        reserved for missing values; real bins are numbered from 1.
+    labels : np.ndarray
+        Object array of bin labels, ``labels[code]``; ``labels[0]`` is
+        ``MISSING_LABEL``.
+    edges : np.ndarray, optional
+        Monotonic numeric bin edges (right-closed intervals) for
+        'quantile' / 'width' binning, empty for categorical bins (the labels
+        are the levels, the last one ``OTHER_LABEL``), ``None`` when bins are
+        neither.
+    index : pd.Index
+        Index of the series that was binned.
+    """
+
+    codes: np.ndarray
+    labels: np.ndarray
+    edges: Optional[np.ndarray]
+    index: pd.Index
+
+    @property
+    def n_codes(self) -> int:
+        return len(self.labels)
+
+    def to_labels(self) -> pd.Series:
+        """Render the per-row string labels (only needed for human-facing output)."""
+        return pd.Series(self.labels[self.codes], index=self.index, dtype="object")
+
+
+def _code_dtype(n_codes: int) -> np.dtype:
+    return np.min_scalar_type(max(n_codes - 1, 0))
+
+
+def _to_float_array(series: pd.Series) -> np.ndarray:
+    """Numeric view of a feature; invalid entries are coerced to NaN."""
+    return pd.to_numeric(series, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _weight_array(df: pd.DataFrame, weight_col: str) -> np.ndarray:
+    """Row weights of ``weight_col`` as float64 (must be non-negative and non-missing)."""
+    if weight_col not in df.columns:
+        raise ValueError(f"Weight column '{weight_col}' not found in DataFrame.")
+    weights = _to_float_array(df[weight_col])
+    if np.isnan(weights).any() or (weights < 0).any():
+        raise ValueError(f"Weight column '{weight_col}' must be non-negative and non-missing.")
+    return weights
+
+
+def _is_categorical(series: pd.Series) -> bool:
+    """Whether a feature is binned by level instead of by numeric value."""
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return True
+    if pd.api.types.is_object_dtype(dtype):
+        # object columns holding only numbers keep the numeric path
+        return pd.api.types.infer_dtype(series, skipna=True) not in (
+            "integer", "floating", "mixed-integer-float", "decimal", "boolean", "empty",
+        )
+    return pd.api.types.is_string_dtype(dtype)
+
+
+def _level_codes(
+    raw_codes: np.ndarray,
+    uniques: np.ndarray,
+    levels: np.ndarray,
+) -> np.ndarray:
+    """Map factorized codes onto ``[MISSING, *levels, OTHER]`` bin codes.
+
+    ``uniques`` (as strings) are looked up once in ``levels``; anything not
+    found goes to the trailing OTHER bin, factorize's -1 to ``MISSING_CODE``.
+    """
+    other_code = len(levels) + 1
+    position = pd.Index(levels).get_indexer(uniques)
+    lookup = np.where(position >= 0, position + 1, other_code)
+    # raw code -1 (missing) picks the appended MISSING_CODE
+    lookup = np.append(lookup, MISSING_CODE).astype(_code_dtype(other_code + 1))
+    return lookup[raw_codes]
+
+
+def _fold_levels(
+    uniques: np.ndarray,
+    freq: np.ndarray,
+    max_categories: Optional[int],
+    min_category_frac: float,
+) -> np.ndarray:
+    """Levels kept as their own bin, from level frequencies in order of first appearance."""
+    keep = np.flatnonzero(freq >= min_category_frac * freq.sum())
+    if max_categories is not None and len(keep) > max_categories:
+        keep = keep[np.argpartition(-freq[keep], max_categories - 1)[:max_categories]]
+        keep.sort()
+    # most frequent first, ties in order of appearance
+    return uniques[keep[np.argsort(-freq[keep], kind="stable")]]
+
+
+def bin_categorical_codes(
+    series: pd.Series,
+    max_categories: Optional[int] = MAX_CATEGORIES,
+    min_category_frac: float = 0.0,
+    weights: Optional[np.ndarray] = None,
+) -> BinResult:
+    """
+    Bin a categorical feature: one bin per frequent level plus OTHER.
+
+    The column is factorized once and level frequencies are taken with
+    ``np.bincount``; levels rarer than ``min_category_frac`` of the non-missing
+    rows, and all but the ``max_categories`` most frequent ones, are folded
+    into ``OTHER_LABEL``. Cost is O(n) in rows and the number of bins stays
+    bounded however many distinct values the column has. With ``weights``,
+    frequencies are weighted sums instead of row counts.
+
+    Returns
+    -------
+    BinResult
+        Labels ``[MISSING, *levels (most frequent first), OTHER]`` and empty
+        edges.
+    """
+    raw_codes, uniques = pd.factorize(series, sort=False)
+    uniques = np.asarray(uniques).astype(str)
+    valid = raw_codes >= 0
+    level_weights = None if weights is None else weights[valid]
+    freq = np.bincount(raw_codes[valid], weights=level_weights, minlength=len(uniques))
+    levels = _fold_levels(uniques, freq, max_categories, min_category_frac)
+
+    return BinResult(
+        codes=_level_codes(raw_codes, uniques, levels),
+        labels=np.asarray([MISSING_LABEL, *levels, OTHER_LABEL], dtype=object),
+        edges=np.empty(0, dtype=np.float64),
+        index=series.index,
+    )
+
+
+def _interval_labels(edges: np.ndarray, include_lowest: bool) -> List[str]:
+    """Render interval labels exactly as pd.cut / pd.qcut would for these edges."""
+    categories = pd.cut(
+        edges[:1], bins=edges, include_lowest=include_lowest
+    ).categories
+    return [str(interval) for interval in categories]
+
+
+def _impurity(bads: np.ndarray, counts: np.ndarray, criterion: str) -> np.ndarray:
+    """Node impurity of a binary target from bad/total counts."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = np.where(counts > 0, bads / counts, 0.0)
+    if criterion == "gini":
+        return 2.0 * p * (1.0 - p)
+    if criterion == "entropy":
+        q = 1.0 - p
+        with np.errstate(divide="ignore", invalid="ignore"):
+            h = -(np.where(p > 0, p * np.log2(p), 0.0) + np.where(q > 0, q * np.log2(q), 0.0))
+        return h
+    raise ValueError(f"Unsupported split criterion: {criterion}")
+
+
+def _best_histogram_split(
+    counts: np.ndarray,
+    bads: np.ndarray,
+    lo: int,
+    hi: int,
+    min_samples_leaf: int,
+    criterion: str,
+) -> Tuple[float, int]:
+    """Best split of fine bins ``lo:hi``; returns (gain, last fine bin of left child)."""
+    if hi - lo < 2:
+        return 0.0, -1
+    c = np.cumsum(counts[lo:hi])
+    b = np.cumsum(bads[lo:hi])
+    c_left, b_left = c[:-1], b[:-1]
+    c_right, b_right = c[-1] - c_left, b[-1] - b_left
+
+    gain = (
+        c[-1] * _impurity(b[-1:], c[-1:], criterion)[0]
+        - c_left * _impurity(b_left, c_left, criterion)
+        - c_right * _impurity(b_right, c_right, criterion)
+    )
+    gain[(c_left < min_samples_leaf) | (c_right < min_samples_leaf)] = -np.inf
+    j = int(np.argmax(gain))
+    return float(gain[j]), lo + j
+
+
+def _histogram_tree_thresholds(
+    x: np.ndarray,
+    y: np.ndarray,
+    max_leaf_nodes: int,
+    min_samples_leaf: int,
+    criterion: str = "gini",
+    max_fine_bins: int = TREE_FINE_BINS,
+    weights: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    1-D best-first decision-tree split points from a good/bad histogram.
+
+    The values are sorted once and reduced to at most ``max_fine_bins``
+    equal-frequency fine bins (exact distinct values when there are fewer).
+    Leaves are then grown best-first, like ``DecisionTreeClassifier`` with
+    ``max_leaf_nodes``, but every split search is a cumulative sum over the
+    small fine-bin count arrays instead of a pass over the rows. With
+    ``weights`` the histogram (and ``min_samples_leaf``) is in weight units.
+
+    Returns
+    -------
+    np.ndarray
+        Sorted thresholds; rows with ``x <= t`` fall left of ``t``.
+    """
+    uniq, inverse = np.unique(x, return_inverse=True)
+    counts = np.bincount(inverse, weights=weights, minlength=len(uniq)).astype(np.float64)
+    bads = np.bincount(inverse, weights=y if weights is None else y * weights, minlength=len(uniq))
+    return _tree_thresholds_from_histogram(
+        uniq, counts, bads, max_leaf_nodes, min_samples_leaf, criterion, max_fine_bins
+    )
+
+
+def _tree_thresholds_from_histogram(
+    uniq: np.ndarray,
+    counts: np.ndarray,
+    bads: np.ndarray,
+    max_leaf_nodes: int,
+    min_samples_leaf: float,
+    criterion: str = "gini",
+    max_fine_bins: int = TREE_FINE_BINS,
+) -> np.ndarray:
+    """Split points of ``_histogram_tree_thresholds`` from a distinct-value histogram."""
+    # index of the first distinct value in every fine bin
+    starts = np.arange(len(uniq))
+    if len(uniq) > max_fine_bins:
+        targets = np.linspace(0, counts.sum(), max_fine_bins + 1)[1:-1]
+        starts = np.unique(np.searchsorted(np.cumsum(counts), targets, side="right"))
+        starts = np.concatenate([[0], starts[(starts > 0) & (starts < len(uniq))]])
+        counts = np.add.reduceat(counts, starts)
+        bads = np.add.reduceat(bads, starts)
+
+    # candidate threshold between fine bins j and j + 1 (midpoint, as sklearn)
+    cut_points = (uniq[starts[1:] - 1] + uniq[starts[1:]]) / 2.0
+
+    heap: List[Tuple[float, int, int, int]] = []
+
+    def push(lo: int, hi: int) -> None:
+        gain, j = _best_histogram_split(counts, bads, lo, hi, min_samples_leaf, criterion)
+        if gain > 1e-12:
+            heapq.heappush(heap, (-gain, lo, hi, j))
+
+    push(0, len(counts))
+    splits: List[int] = []
+    while heap and len(splits) + 1 < max_leaf_nodes:
+        _, lo, hi, j = heapq.heappop(heap)
+        splits.append(j)
+        push(lo, j + 1)
+        push(j + 1, hi)
+
+    return np.sort(cut_points[splits])
+
+
+def _sketch_edges(sketch: KLLSketch, n_bins: int) -> np.ndarray:
+    """Equal-frequency edges read off a quantile sketch (duplicates dropped)."""
+    return np.unique(sketch.quantiles(np.linspace(0, 1, n_bins + 1)))
+
+
+def _weighted_quantile_edges(x: np.ndarray, weights: np.ndarray, n_bins: int) -> np.ndarray:
+    """Equal-weight edges: the smallest values whose cumulative weight reaches k / n_bins."""
+    # tied values share their edge, so the sort need not be stable
+    order = np.argsort(x)
+    x_sorted = x[order]
+    cum = np.cumsum(weights[order])
+    targets = np.linspace(0, cum[-1], n_bins + 1)[1:-1]
+    inner = x_sorted[np.clip(np.searchsorted(cum, targets, side="left"), 0, len(x) - 1)]
+    return np.unique(np.r_[x_sorted[0], inner, x_sorted[-1]])
+
+
+def _edge_labels(edges: np.ndarray, include_lowest: bool) -> Tuple[np.ndarray, List[str]]:
+    """Edges and labels of the valid bins; fewer than two edges collapse to 'ALL'."""
+    if len(edges) < 2:
+        # e.g. all values are identical
+        return np.array([-np.inf, np.inf]), ["ALL"]
+    edges = np.asarray(edges, dtype=np.float64)
+    return edges, _interval_labels(edges, include_lowest=include_lowest)
+
+
+def bin_feature_codes(
+    series: pd.Series,
+    y: Optional[pd.Series] = None,
+    method: str = "quantile",   # 'quantile' | 'width' | 'tree'
+    n_bins: int = 10,
+    min_leaf_frac: float = 0.05,
+    tree_engine: str = "histogram",  # 'histogram' | 'sklearn'
+    criterion: str = "gini",         # 'gini' | 'entropy' (histogram tree only)
+    quantile_engine: str = "exact",  # 'exact' | 'sketch'
+    sketch_eps: float = DEFAULT_RANK_EPS,
+    max_categories: Optional[int] = MAX_CATEGORIES,
+    min_category_frac: float = 0.0,
+    weights: Optional[np.ndarray] = None,
+) -> BinResult:
+    """
+    Bin a single feature into integer codes plus a label/edge table.
+
+    Same binning rules as ``bin_single_feature`` but without any per-row
+    string work: rows get a small-int code and the labels are kept once per
+    bin in ``BinResult.labels``.
+
+    For method='tree', ``tree_engine='histogram'`` finds the split points on
+    a pre-aggregated good/bad histogram and assigns bins with
+    ``np.searchsorted``; ``tree_engine='sklearn'`` fits a full
+    ``DecisionTreeClassifier`` and labels bins by leaf id.
+
+    For method='quantile', ``quantile_engine='exact'`` uses ``pd.qcut``;
+    ``quantile_engine='sketch'`` reads the edges off a ``KLLSketch`` with
+    normalized rank error ``sketch_eps`` and assigns bins with
+    ``np.searchsorted``.
+
+    Categorical features (string, categorical or non-numeric object dtype)
+    are detected per column and binned by level with
+    ``bin_categorical_codes`` whatever the method.
+
+    ``weights`` (one non-negative weight per row) makes the binning
+    weighted: quantile edges split the total weight evenly (exact weighted
+    quantiles, whatever the quantile engine), tree splits and
+    ``min_leaf_frac`` use weighted good/bad histograms, and categorical
+    level frequencies are weighted. Equal-width edges do not depend on it.
+
+    Returns
+    -------
+    BinResult
+        Codes (``MISSING_CODE`` for missing values), labels and edges.
+    """
+    if _is_categorical(series):
+        return bin_categorical_codes(series, max_categories, min_category_frac, weights)
+
+    values = _to_float_array(series)
+
+    # handle missing values as a separate bin
+    valid_mask = ~np.isnan(values)
+    x_valid = values[valid_mask]
+    w_valid = None if weights is None else np.asarray(weights, dtype=np.float64)[valid_mask]
+
+    edges: Optional[np.ndarray] = None
+    labels: List[str] = [MISSING_LABEL]
+
+    # ================== quantile / width ==================
+    if method in ("quantile", "width"):
+        valid_codes = np.zeros(len(x_valid), dtype=np.int64)
+        # no valid values: one empty 'ALL' bin keeps the edges numeric
+        cut_edges = np.empty(0)
+        if len(x_valid):
+            if method == "quantile" and w_valid is not None:
+                # equal weight binning
+                cut_edges = _weighted_quantile_edges(x_valid, w_valid, n_bins)
+                cut_codes = np.searchsorted(cut_edges[1:-1], x_valid, side="left")
+            elif method == "quantile" and quantile_engine == "sketch":
+                # one-pass approximate equal frequency binning
+                cut_edges = _sketch_edges(KLLSketch(sketch_eps, seed=0).update(x_valid), n_bins)
+                cut_codes = np.searchsorted(cut_edges[1:-1], x_valid, side="left")
+            elif method == "quantile" and quantile_engine == "exact":
+                # equal frequency binning
+                cut_codes, cut_edges = pd.qcut(
+                    x_valid, q=n_bins, labels=False, retbins=True, duplicates="drop"
+                )
+            elif method == "quantile":
+                raise ValueError(f"Unsupported quantile engine: {quantile_engine}")
+            else:
+                # equal width binning
+                cut_codes, cut_edges = pd.cut(
+                    x_valid, bins=n_bins, labels=False, retbins=True, duplicates="drop"
+                )
+            if len(cut_edges) >= 2:
+                valid_codes = np.asarray(cut_codes, dtype=np.int64)
+
+        edges, bin_labels = _edge_labels(cut_edges, include_lowest=(method == "quantile"))
+        labels.extend(bin_labels)
+
+    # ================== tree-based binning ==================
+    elif method == "tree":
+        if y is None:
+            raise ValueError("y must be provided when method='tree'.")
+
+        valid_codes = np.zeros(len(x_valid), dtype=np.int64)
+        y_vec = np.asarray(y)[valid_mask]
+        # ensure minimum samples (or weight) per leaf
+        if w_valid is None:
+            min_samples_leaf = max(int(len(x_valid) * min_leaf_frac), 1)
+        else:
+            min_samples_leaf = w_valid.sum() * min_leaf_frac
+
+        if tree_engine == "histogram":
+            thresholds = (
+                _histogram_tree_thresholds(
+                    x_valid,
+                    y_vec.astype(np.float64),
+                    max_leaf_nodes=n_bins,
+                    min_samples_leaf=min_samples_leaf,
+                    criterion=criterion,
+                    weights=w_valid,
+                )
+                if len(x_valid) else np.array([])
+            )
+            edges = np.concatenate([[-np.inf], thresholds, [np.inf]])
+            labels.extend(_interval_labels(edges, include_lowest=False))
+            valid_codes = np.searchsorted(thresholds, x_valid, side="left")
+
+        elif tree_engine == "sklearn":
+            if len(x_valid):
+                X = x_valid.reshape(-1, 1)
+                if w_valid is None:
+                    clf = DecisionTreeClassifier(
+                        max_leaf_nodes=n_bins,
+                        min_samples_leaf=min_samples_leaf,
+                    )
+                else:
+                    clf = DecisionTreeClassifier(
+                        max_leaf_nodes=n_bins,
+                        min_weight_fraction_leaf=min_leaf_frac,
+                    )
+                clf.fit(X, y_vec, sample_weight=w_valid)
+                leaf_ids, valid_codes = np.unique(clf.apply(X), return_inverse=True)
+                labels.extend(f"leaf_{int(v)}" for v in leaf_ids)
+
+        else:
+            raise ValueError(f"Unsupported tree engine: {tree_engine}")
+
+    else:
+        raise ValueError(f"Unsupported binning method: {method}")
+
+    codes = np.full(len(values), MISSING_CODE, dtype=_code_dtype(len(labels)))
+    codes[valid_mask] = valid_codes + 1
+    return BinResult(
+        codes=codes,
+        labels=np.asarray(labels, dtype=object),
+        edges=edges,
+        index=series.index,
+    )
+
+
 def bin_single_feature(
     series: pd.Series,
     y: Optional[pd.Series] = None,
     method: str = "quantile",   # 'quantile' | 'width' | 'tree'
     n_bins: int = 10,
     min_leaf_frac: float = 0.05,
+    tree_engine: str = "histogram",  # 'histogram' | 'sklearn'
+    quantile_engine: str = "exact",  # 'exact' | 'sketch'
+    max_categories: Optional[int] = MAX_CATEGORIES,
+    min_category_frac: float = 0.0,
 ) -> pd.Series:
     """
-    Bin a single numeric feature according to the specified method.
+    Bin a single feature according to the specified method.
+
+    Parameters
+    ----------
+    series : pd.Series
+        Raw feature values.
+    y : pd.Series, optional
+        Target labels (only needed when method='tree').
+    method : str
+        'quantile' (equal frequency), 'width' (equal width),
+        or 'tree' (decision-tree-based optimal binning).
+    n_bins : int
+        Number of bins or max leaf nodes (for tree).
+    min_leaf_frac : float
+        Minimum fraction of samples per leaf for tree binning.
+    tree_engine : str
+        'histogram' (histogram-based split search, interval labels) or
+        'sklearn' (DecisionTreeClassifier, 'leaf_<id>' labels).
+    quantile_engine : str
+        'exact' (pd.qcut) or 'sketch' (approximate KLL quantile edges).
+    max_categories, min_category_frac :
+        Categorical features only: keep at most ``max_categories`` levels
+        occurring in at least ``min_category_frac`` of the rows, fold the
+        rest into 'OTHER'.
+
+    Returns
+    -------
+    pd.Series
+        Series of bin labels (string), same index as input series.
+        Missing values are grouped into 'MISSING'.
+        Use ``bin_feature_codes`` to get integer codes without labels.
+    """
+    return bin_feature_codes(
+        series, y, method, n_bins, min_leaf_frac,
+        tree_engine=tree_engine, quantile_engine=quantile_engine,
+        max_categories=max_categories, min_category_frac=min_category_frac,
+    ).to_labels()
+
+
+# ============== 2. Binning spec (fit / transform) ==============
+class BinningSpec:
+    """
+    Per-feature bin edges fitted on one DataFrame and applied to any other.
+
+    ``fit`` runs ``bin_feature_codes`` once per feature and keeps only the
+    numeric edges and labels; ``transform`` maps new values onto those bins
+    with ``np.searchsorted`` so development bins can be reused on OOT or
+    monitoring samples. Values outside the fitted range fall into the first
+    or last bin. Categorical features are stored with empty edges and their
+    levels as labels; unseen levels fall into the OTHER bin.
+
+    Specs round-trip through JSON (``.json``) or Parquet (``.parquet``/``.pq``)
+    with ``save`` / ``load``.
+    """
+
+    def __init__(
+        self,
+        edges: Dict[str, np.ndarray],
+        labels: Dict[str, List[str]],
+        method: str = "quantile",
+        n_bins: int = 10,
+    ):
+        self.edges = {f: np.asarray(e, dtype=np.float64) for f, e in edges.items()}
+        self.labels = {f: np.asarray(l, dtype=object) for f, l in labels.items()}
+        self.method = method
+        self.n_bins = n_bins
+
+    @property
+    def features(self) -> List[str]:
+        return list(self.edges)
+
+    def is_categorical(self, feature: str) -> bool:
+        return len(self.edges[feature]) == 0
+
+    @classmethod
+    def fit(
+        cls,
+        df: pd.DataFrame,
+        feature_cols: List[str],
+        label_col: Optional[str] = None,
+        method: str = "quantile",
+        n_bins: int = 10,
+        min_leaf_frac: float = 0.05,
+        positive_label: Any = 1,
+        tree_engine: str = "histogram",
+        quantile_engine: str = "exact",
+        max_categories: Optional[int] = MAX_CATEGORIES,
+        min_category_frac: float = 0.0,
+        weight_col: Optional[str] = None,
+    ) -> "BinningSpec":
+        """Fit bin edges for ``feature_cols`` on ``df`` (``label_col`` needed for 'tree').
+
+        With ``weight_col`` the edges are fitted on the weighted sample
+        (see ``bin_feature_codes``).
+        """
+        y = None
+        if method == "tree":
+            if label_col is None:
+                raise ValueError("label_col must be provided when method='tree'.")
+            y = (df[label_col] == positive_label).astype(int)
+        weights = None if weight_col is None else _weight_array(df, weight_col)
+
+        edges: Dict[str, np.ndarray] = {}
+        labels: Dict[str, List[str]] = {}
+        for feature in feature_cols:
+            if feature not in df.columns:
+                raise ValueError(f"Feature column '{feature}' not found in DataFrame.")
+            binned = bin_feature_codes(
+                df[feature], y, method, n_bins, min_leaf_frac,
+                tree_engine=tree_engine, quantile_engine=quantile_engine,
+                max_categories=max_categories, min_category_frac=min_category_frac,
+                weights=weights,
+            )
+            if binned.edges is None:
+                raise ValueError(
+                    f"Bins of '{feature}' have no numeric edges "
+                    f"(method='{method}', tree_engine='{tree_engine}')."
+                )
+            edges[feature] = binned.edges
+            labels[feature] = list(binned.labels)
+        return cls(edges, labels, method=method, n_bins=n_bins)
+
+    @classmethod
+    def from_sketches(cls, sketches: Dict[str, KLLSketch], n_bins: int = 10) -> "BinningSpec":
+        """Equal-frequency spec from per-feature quantile sketches (no data pass)."""
+        edges: Dict[str, np.ndarray] = {}
+        labels: Dict[str, List[str]] = {}
+        for feature, sketch in sketches.items():
+            edges[feature], bin_labels = _edge_labels(
+                _sketch_edges(sketch, n_bins), include_lowest=True
+            )
+            labels[feature] = [MISSING_LABEL, *bin_labels]
+        return cls(edges, labels, method="quantile", n_bins=n_bins)
+
+    def transform_feature(self, feature: str, series: pd.Series) -> BinResult:
+        """Bin one feature with the fitted edges."""
+        if feature not in self.edges:
+            raise ValueError(f"Feature '{feature}' is not part of the binning spec.")
+        edges = self.edges[feature]
+        labels = self.labels[feature]
+        if self.is_categorical(feature):
+            raw_codes, uniques = pd.factorize(series, sort=False)
+            codes = _level_codes(raw_codes, np.asarray(uniques).astype(str), labels[1:-1])
+            return BinResult(codes=codes, labels=labels, edges=edges, index=series.index)
+
+        values = _to_float_array(series)
+        valid_mask = ~np.isnan(values)
+        codes = np.full(len(values), MISSING_CODE, dtype=_code_dtype(len(labels)))
+        codes[valid_mask] = np.searchsorted(edges[1:-1], values[valid_mask], side="left") + 1
+        return BinResult(codes=codes, labels=labels, edges=edges, index=series.index)
+
+    def transform(
+        self, df: pd.DataFrame, feature_cols: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """Return a DataFrame of integer bin codes, one column per feature."""
+        feature_cols = self.features if feature_cols is None else list(feature_cols)
+        return pd.DataFrame(
+            {f: self.transform_feature(f, df[f]).codes for f in feature_cols},
+            index=df.index,
+        )
+
+    # ---------- persistence ----------
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "method": self.method,
+            "n_bins": self.n_bins,
+            "features": {
+                f: {"edges": self.edges[f].tolist(), "labels": self.labels[f].tolist()}
+                for f in self.features
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "BinningSpec":
+        features = payload["features"]
+        return cls(
+            edges={f: v["edges"] for f, v in features.items()},
+            labels={f: v["labels"] for f, v in features.items()},
+            method=payload.get("method", "quantile"),
+            n_bins=payload.get("n_bins", 10),
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        """Long table: one row per (feature, bin code) with label and edges."""
+        frames = []
+        for f in self.features:
+            edges, labels = self.edges[f], self.labels[f]
+            if self.is_categorical(f):
+                lower = upper = np.full(len(labels), np.nan)
+            else:
+                lower = np.concatenate([[np.nan], edges[:-1]])
+                upper = np.concatenate([[np.nan], edges[1:]])
+            frames.append(pd.DataFrame({
+                "feature": f,
+                "code": np.arange(len(labels)),
+                "label": labels,
+                "lower": lower,
+                "upper": upper,
+            }))
+        return pd.concat(frames, ignore_index=True)
+
+    @classmethod
+    def from_frame(
+        cls, table: pd.DataFrame, method: str = "quantile", n_bins: int = 10
+    ) -> "BinningSpec":
+        edges: Dict[str, np.ndarray] = {}
+        labels: Dict[str, List[str]] = {}
+        for f, rows in table.groupby("feature", sort=False):
+            rows = rows.sort_values("code")
+            bins = rows[rows["code"] != MISSING_CODE]
+            if bins["upper"].isna().all():
+                edges[f] = np.empty(0)
+            else:
+                edges[f] = np.concatenate([bins["lower"].to_numpy()[:1], bins["upper"].to_numpy()])
+            labels[f] = rows["label"].tolist()
+        return cls(edges, labels, method=method, n_bins=n_bins)
+
+    def save(self, path: Path) -> Path:
+        """Write the spec to ``.json`` or ``.parquet``/``.pq``."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        suffix = path.suffix.lower()
+        if suffix == ".json":
+            path.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+        elif suffix in {".parquet", ".pq"}:
+            table = self.to_frame()
+            table.attrs["binning_spec"] = {"method": self.method, "n_bins": self.n_bins}
+            table.to_parquet(path, index=False)
+        else:
+            raise ValueError(f"Unsupported binning spec file type: {path.suffix}")
+        return path
+
+    @classmethod
+    def load(cls, path: Path) -> "BinningSpec":
+        """Read a spec written by ``save``."""
+        path = Path(path)
+        if not path.exists():
+            raise FileNotFoundError(f"Binning spec not found: {path}")
+        suffix = path.suffix.lower()
+        if suffix == ".json":
+            return cls.from_dict(json.loads(path.read_text(encoding="utf-8")))
+        if suffix in {".parquet", ".pq"}:
+            table = pd.read_parquet(path)
+            meta = table.attrs.get("binning_spec", {})
+            return cls.from_frame(
+                table,
+                method=meta.get("method", "quantile"),
+                n_bins=meta.get("n_bins", 10),
+            )
+        raise ValueError(f"Unsupported binning spec file type: {path.suffix}")
+
+
+# ============== 3. IV calculator (main) =================
+def _count_bins_groupby(
+    df: pd.DataFrame,
+    y: pd.Series,
+    feature_cols: List[str],
+    bin_kwargs: Dict[str, Any],
+) -> pd.DataFrame:
+    """Per-feature pandas groupby counting (reference engine)."""
+    all_summary_tables = []
+
+    #  loop over features and bin each one
+    for feature in feature_cols:
+        # tree method requires y, others ignore it
+        bins = bin_single_feature(
+            series=df[feature],
+            y=y if bin_kwargs["method"] == "tree" else None,
+            **bin_kwargs,
+        )
+
+        temp_df = pd.DataFrame({
+            "Feature": feature,
+            "Bin": bins,
+            "Bad": y,
+        })
+
+        # group by feature and bin
+        summary = temp_df.groupby(["Feature", "Bin"])["Bad"].agg(["count", "sum"]).astype(np.int64)
+        summary.rename(columns={"sum": "bads"}, inplace=True)
+        all_summary_tables.append(summary)
+
+    return pd.concat(all_summary_tables)
+
+
+def _count_bins_vectorized(
+    df: pd.DataFrame,
+    y: pd.Series,
+    feature_cols: List[str],
+    bin_kwargs: Dict[str, Any],
+    weights: Optional[np.ndarray] = None,
+) -> pd.DataFrame:
+    """Count rows/bads for all features over one flat (feature, bin) index.
+
+    Every feature is reduced to integer bin codes; feature ``i`` owns the
+    slice ``offsets[i]:offsets[i + 1]`` of the flat count arrays, which are
+    filled with ``np.bincount`` instead of a per-feature groupby.
+    """
+    y_arr = np.asarray(y, dtype=np.float64)
+
+    binned = [
+        bin_feature_codes(
+            series=df[feature],
+            y=y if bin_kwargs["method"] == "tree" else None,
+            weights=weights,
+            **bin_kwargs,
+        )
+        for feature in feature_cols
+    ]
+    return _count_codes(feature_cols, binned, y_arr, weights)
+
+
+def _bincount_codes(
+    binned: List[BinResult],
+    y_arr: np.ndarray,
+    weights: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Flat row and bad counts over the (feature, bin) index of ``binned``.
+
+    Feature ``i`` owns ``offsets[i]:offsets[i + 1]`` with sizes ``n_codes``;
+    the arrays are additive, so counts from separate chunks can be summed.
+    With ``weights`` both arrays are float weight sums instead of row counts.
+    """
+    sizes = np.array([b.n_codes for b in binned], dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum(sizes)])
+    counts = np.zeros(offsets[-1], dtype=np.int64 if weights is None else np.float64)
+    bads = np.zeros(offsets[-1], dtype=np.float64)
+    bad_weights = y_arr if weights is None else y_arr * weights
+
+    for i, b in enumerate(binned):
+        lo, hi = offsets[i], offsets[i + 1]
+        counts[lo:hi] = np.bincount(b.codes, weights=weights, minlength=sizes[i])
+        bads[lo:hi] = np.bincount(b.codes, weights=bad_weights, minlength=sizes[i])
+    return counts, bads
+
+
+def _counts_to_table(
+    feature_cols: List[str],
+    labels: List[np.ndarray],
+    counts: np.ndarray,
+    bads: np.ndarray,
+) -> pd.DataFrame:
+    """(Feature, Bin) count table from flat count arrays (observed bins only).
+
+    Integer row counts give integer ``bads``; weighted (float) counts keep
+    float weight sums in both columns.
+    """
+    sizes = np.array([len(l) for l in labels], dtype=np.int64)
+
+    # only observed bins are reported, as with a groupby
+    observed = counts > 0
+    index = pd.MultiIndex.from_arrays(
+        [
+            np.repeat(np.asarray(feature_cols, dtype=object), sizes)[observed],
+            np.concatenate(labels)[observed],
+        ],
+        names=["Feature", "Bin"],
+    )
+    if np.issubdtype(counts.dtype, np.integer):
+        bads = bads.astype(np.int64)
+    return pd.DataFrame({"count": counts[observed], "bads": bads[observed]}, index=index)
+
+
+def _count_codes(
+    feature_cols: List[str],
+    binned: List[BinResult],
+    y_arr: np.ndarray,
+    weights: Optional[np.ndarray] = None,
+) -> pd.DataFrame:
+    """Aggregate bin codes of many features into one (Feature, Bin) count table."""
+    counts, bads = _bincount_codes(binned, y_arr, weights)
+    return _counts_to_table(feature_cols, [b.labels for b in binned], counts, bads)
+
+
+def _resolve_n_jobs(n_jobs: Optional[int]) -> int:
+    """joblib-style worker count: None/1 -> serial, -1 -> all cores."""
+    if not n_jobs:
+        return 1
+    if n_jobs < 0:
+        return max((os.cpu_count() or 1) + 1 + n_jobs, 1)
+    return n_jobs
+
+
+def _count_feature_block(task: Dict[str, Any]) -> Tuple[List[np.ndarray], np.ndarray, np.ndarray]:
+    """Worker: bin and count one block of feature columns held in shared memory."""
+    x_shm = shared_memory.SharedMemory(name=task["x_name"])
+    y_shm = shared_memory.SharedMemory(name=task["y_name"])
+    w_shm = shared_memory.SharedMemory(name=task["w_name"]) if task.get("w_name") else None
+    try:
+        features = task["features"]
+        n_rows = task["n_rows"]
+        X = np.ndarray((len(features), n_rows), dtype=np.float64, buffer=x_shm.buf)
+        y_arr = np.ndarray((n_rows,), dtype=np.float64, buffer=y_shm.buf)
+        w_arr = None if w_shm is None else np.ndarray((n_rows,), dtype=np.float64, buffer=w_shm.buf)
+        spec: Optional[BinningSpec] = task["binning_spec"]
+        bin_kwargs = task["bin_kwargs"]
+        y = pd.Series(y_arr) if bin_kwargs.get("method") == "tree" else None
+
+        binned = []
+        for i, feature in enumerate(features):
+            column = pd.Series(X[i])
+            if spec is not None:
+                binned.append(spec.transform_feature(feature, column))
+            else:
+                binned.append(bin_feature_codes(column, y, weights=w_arr, **bin_kwargs))
+        counts, bads = _bincount_codes(binned, y_arr, w_arr)
+        labels = [b.labels for b in binned]
+        # drop every view on the shared buffers before closing them
+        del X, y_arr, w_arr, y, column, binned
+        return labels, counts, bads
+    finally:
+        x_shm.close()
+        y_shm.close()
+        if w_shm is not None:
+            w_shm.close()
+
+
+def _count_bins_parallel(
+    df: pd.DataFrame,
+    y: pd.Series,
+    feature_cols: List[str],
+    bin_kwargs: Dict[str, Any],
+    binning_spec: Optional[BinningSpec],
+    n_jobs: int,
+    weights: Optional[np.ndarray] = None,
+) -> pd.DataFrame:
+    """Vectorized counting with feature blocks spread over a process pool.
+
+    The label (and weight) vector and each block's numeric columns are copied once into
+    ``multiprocessing.shared_memory`` and read by the workers as NumPy views,
+    so no DataFrame is pickled. At most ``2 * n_jobs`` blocks are resident at
+    a time; workers return small per-block count arrays that are reduced here.
+
+    Workers start through ``forkserver``, which re-imports the caller's
+    ``__main__`` module: a script without an ``if __name__ == "__main__":``
+    guard breaks the pool, and the counts are then computed serially with a
+    ``RuntimeWarning``.
+    """
+    n_rows = len(df)
+    y_arr = y.to_numpy(dtype=np.float64)
+
+    # categorical columns have no float buffer: code and count them here
+    if binning_spec is not None:
+        categorical = [f for f in feature_cols if binning_spec.is_categorical(f)]
+        parent_binned = [binning_spec.transform_feature(f, df[f]) for f in categorical]
+    else:
+        categorical = [f for f in feature_cols if _is_categorical(df[f])]
+        parent_binned = [bin_feature_codes(df[f], weights=weights, **bin_kwargs) for f in categorical]
+    numeric = [f for f in feature_cols if f not in set(categorical)]
+    if not numeric:
+        return _count_codes(feature_cols, parent_binned, y_arr, weights)
+
+    blocks = [
+        list(block)
+        for block in np.array_split(np.asarray(numeric, dtype=object), min(len(numeric), n_jobs * 4))
+    ]
+    results: List[Optional[Tuple[List[np.ndarray], np.ndarray, np.ndarray]]] = [None] * len(blocks)
+
+    y_shm = shared_memory.SharedMemory(create=True, size=max(y_arr.nbytes, 1))
+    np.ndarray(y_arr.shape, dtype=np.float64, buffer=y_shm.buf)[:] = y_arr
+    w_shm = None
+    if weights is not None:
+        w_shm = shared_memory.SharedMemory(create=True, size=max(weights.nbytes, 1))
+        np.ndarray(weights.shape, dtype=np.float64, buffer=w_shm.buf)[:] = weights
+    pending: Dict[Any, Tuple[int, shared_memory.SharedMemory]] = {}
+    pool_broken = False
+
+    def collect(done) -> None:
+        for future in done:
+            i, x_shm = pending.pop(future)
+            try:
+                results[i] = future.result()
+            finally:
+                x_shm.close()
+                x_shm.unlink()
+
+    try:
+        # forkserver: forking a multi-threaded parent (BLAS, pyarrow) can deadlock
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload([__name__])
+        with ProcessPoolExecutor(max_workers=n_jobs, mp_context=context) as pool:
+            for i, block in enumerate(blocks):
+                while len(pending) >= 2 * n_jobs:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+
+                x_shm = shared_memory.SharedMemory(create=True, size=max(8 * n_rows * len(block), 1))
+                X = np.ndarray((len(block), n_rows), dtype=np.float64, buffer=x_shm.buf)
+                for j, feature in enumerate(block):
+                    X[j] = _to_float_array(df[feature])
+                del X
+
+                block_spec = None
+                if binning_spec is not None:
+                    block_spec = BinningSpec(
+                        {f: binning_spec.edges[f] for f in block},
+                        {f: binning_spec.labels[f] for f in block},
+                        method=binning_spec.method,
+                        n_bins=binning_spec.n_bins,
+                    )
+                task = {
+                    "x_name": x_shm.name,
+                    "y_name": y_shm.name,
+                    "w_name": None if w_shm is None else w_shm.name,
+                    "n_rows": n_rows,
+                    "features": block,
+                    "bin_kwargs": bin_kwargs,
+                    "binning_spec": block_spec,
+                }
+                pending[pool.submit(_count_feature_block, task)] = (i, x_shm)
+
+            collect(list(pending))
+    except BrokenProcessPool:
+        pool_broken = True
+    finally:
+        for _, x_shm in pending.values():
+            x_shm.close()
+            x_shm.unlink()
+        y_shm.close()
+        y_shm.unlink()
+        if w_shm is not None:
+            w_shm.close()
+            w_shm.unlink()
+
+    if pool_broken:
+        warnings.warn(
+            "Worker processes for n_jobs > 1 could not start (is the calling script "
+            "missing an `if __name__ == \"__main__\":` guard?); counting serially.",
+            RuntimeWarning,
+        )
+        if binning_spec is not None:
+            binned = [binning_spec.transform_feature(f, df[f]) for f in feature_cols]
+            return _count_codes(feature_cols, binned, y_arr, weights)
+        return _count_bins_vectorized(df, y, feature_cols, bin_kwargs, weights)
+
+    labels = [l for block_labels, _, _ in results for l in block_labels]
+    counts = np.concatenate([c for _, c, _ in results])
+    bads = np.concatenate([b for _, _, b in results])
+    if categorical:
+        parent_counts, parent_bads = _bincount_codes(parent_binned, y_arr, weights)
+        labels += [b.labels for b in parent_binned]
+        counts = np.concatenate([counts, parent_counts])
+        bads = np.concatenate([bads, parent_bads])
+        return _counts_to_table(numeric + categorical, labels, counts, bads).loc[feature_cols]
+    return _counts_to_table(feature_cols, labels, counts, bads)
+
+
+def _summarize_bin_counts(summary_table: pd.DataFrame) -> pd.DataFrame:
+    """Derive goods, distributions, WoE and IV from a (Feature, Bin) count table.
+
+    The input needs ``count`` and ``bads`` columns; distributions are taken
+    within each feature so that IV does not depend on how many features are
+    evaluated together.
+    """
+    summary_table = summary_table.copy()
+
+    #  add good counts
+    summary_table["goods"] = summary_table["count"] - summary_table["bads"]
+
+    #  percentage of the feature's total goods/bads per bin
+    by_feature = summary_table.groupby(level=0, sort=False)
+    total_goods = by_feature["goods"].transform("sum")
+    total_bads = by_feature["bads"].transform("sum")
+    summary_table["pct_goods"] = summary_table["goods"] / total_goods
+    summary_table["pct_bads"] = summary_table["bads"] / total_bads
+
+    # avoid zero proportion for log
+    summary_table["pct_goods"] = summary_table["pct_goods"].clip(lower=IV_EPS)
+    summary_table["pct_bads"] = summary_table["pct_bads"].clip(lower=IV_EPS)
+
+    #  within-feature statistics
+    summary_table["count_pct"] = (
+        summary_table["count"] / by_feature["count"].transform("sum")
+    )
+    summary_table["bad_rate"] = summary_table["bads"] / summary_table["count"]
+
+    # WoE & IV
+    summary_table["woe"] = np.log(summary_table["pct_goods"] / summary_table["pct_bads"])
+    summary_table["iv"] = (
+        (summary_table["pct_goods"] - summary_table["pct_bads"])
+        * summary_table["woe"]
+    )
+    return summary_table
+
+
+# ---------- supervised bin merging (ChiMerge / monotonic WoE) ----------
+MERGE_FINE_BINS = 50
+CHI2_95 = 3.841
+
+
+def _pair_chi2(counts_a, bads_a, counts_b, bads_b):
+    """Chi-square statistic of the 2x2 good/bad table of two adjacent bins."""
+    observed = np.array([
+        [counts_a - bads_a, bads_a],
+        [counts_b - bads_b, bads_b],
+    ], dtype=np.float64)
+    rows = observed.sum(axis=1, keepdims=True)
+    cols = observed.sum(axis=0, keepdims=True)
+    total = rows.sum(axis=0, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        expected = rows * cols / total
+        terms = np.where(expected > 0, (observed - expected) ** 2 / expected, 0.0)
+    return terms.sum(axis=(0, 1))
+
+
+def _chimerge_groups(
+    starts: np.ndarray,
+    counts: np.ndarray,
+    bads: np.ndarray,
+    max_bins: int,
+    chi_threshold: Optional[float],
+) -> np.ndarray:
+    """ChiMerge over adjacent groups (given by their start bins).
+
+    The most similar adjacent pair (lowest chi-square) is merged first, using
+    a heap with lazily invalidated entries, until at most ``max_bins`` groups
+    remain and every adjacent pair differs by at least ``chi_threshold``.
+    """
+    n = len(starts)
+    group_counts = np.add.reduceat(counts, starts).astype(np.float64)
+    group_bads = np.add.reduceat(bads, starts).astype(np.float64)
+    right = list(range(1, n)) + [-1]
+    left = [-1] + list(range(n - 1))
+    alive = np.ones(n, dtype=bool)
+    version = [0] * n
+
+    chi = _pair_chi2(group_counts[:-1], group_bads[:-1], group_counts[1:], group_bads[1:])
+    heap = [(chi[i], i, 0) for i in range(n - 1)]
+    heapq.heapify(heap)
+    n_groups = n
+    while heap and n_groups > 1:
+        chi_value, i, v = heapq.heappop(heap)
+        if not alive[i] or v != version[i] or right[i] < 0:
+            continue
+        if n_groups <= max_bins and (chi_threshold is None or chi_value >= chi_threshold):
+            break
+        # absorb the right neighbour into group i
+        j = right[i]
+        group_counts[i] += group_counts[j]
+        group_bads[i] += group_bads[j]
+        alive[j] = False
+        right[i] = right[j]
+        if right[j] >= 0:
+            left[right[j]] = i
+        n_groups -= 1
+        for a in (left[i], i):
+            if a >= 0 and right[a] >= 0:
+                version[a] += 1
+                b = right[a]
+                heapq.heappush(heap, (
+                    float(_pair_chi2(group_counts[a], group_bads[a], group_counts[b], group_bads[b])),
+                    a,
+                    version[a],
+                ))
+    return starts[alive]
+
+
+def _monotonic_groups(starts: np.ndarray, counts: np.ndarray, bads: np.ndarray) -> np.ndarray:
+    """Pool-adjacent-violators merge making the bad rate monotonic.
+
+    The direction (increasing or decreasing) follows the sign of the
+    count-weighted covariance between bin position and bad rate.
+    """
+    if len(starts) < 2:
+        return starts
+    group_counts = np.add.reduceat(counts, starts).astype(np.float64)
+    group_bads = np.add.reduceat(bads, starts).astype(np.float64)
+    position = np.arange(len(starts), dtype=np.float64)
+    excess_bads = group_bads - group_counts * group_bads.sum() / group_counts.sum()
+    trend = np.sum((position - np.average(position, weights=group_counts)) * excess_bads)
+    direction = 1.0 if trend >= 0 else -1.0
+
+    # stack of blocks: (start, count, bads)
+    blocks: List[List[float]] = []
+    for start, c, b in zip(starts, group_counts, group_bads):
+        blocks.append([start, c, b])
+        # violation: previous block's bad rate is beyond this one's in the trend direction
+        while len(blocks) > 1 and direction * (blocks[-2][2] * blocks[-1][1] - blocks[-1][2] * blocks[-2][1]) > 0:
+            _, c_last, b_last = blocks.pop()
+            blocks[-1][1] += c_last
+            blocks[-1][2] += b_last
+    return np.array([int(block[0]) for block in blocks], dtype=np.int64)
+
+
+def merge_bin_counts(
+    binning_spec: BinningSpec,
+    feature_cols: List[str],
+    counts: np.ndarray,
+    bads: np.ndarray,
+    method: str = "chimerge",         # 'chimerge' | 'monotonic'
+    max_bins: int = 10,
+    chi_threshold: Optional[float] = CHI2_95,
+) -> Tuple[BinningSpec, np.ndarray, np.ndarray]:
+    """
+    Merge adjacent fine bins using only their good/bad counts.
+
+    Parameters
+    ----------
+    binning_spec : BinningSpec
+        Fine bins the counts were taken with.
+    feature_cols : list of str
+        Features laid out in ``counts`` / ``bads`` (flat (feature, code)
+        arrays as built by ``_bincount_codes``).
+    method : str
+        'chimerge'  -> merge the adjacent pair with the lowest chi-square
+                       until at most ``max_bins`` bins remain and all pairs
+                       exceed ``chi_threshold``;
+        'monotonic' -> pool adjacent violators so the bad rate (and WoE) is
+                       monotonic, then ChiMerge down to ``max_bins``.
+    max_bins : int
+        Maximum number of non-missing bins per feature.
+    chi_threshold : float, optional
+        Keep merging pairs below this chi-square (default: 95% with 1 dof);
+        ``None`` only enforces ``max_bins``.
+
+    Returns
+    -------
+    Tuple[BinningSpec, np.ndarray, np.ndarray]
+        Spec with the merged edges and the merged flat counts / bads. The
+        MISSING bin is never merged and categorical features are left as is.
+        Runtime depends only on the number of bins, not on the rows.
+    """
+    if method not in ("chimerge", "monotonic"):
+        raise ValueError(f"Unsupported merge method: {method}")
+
+    edges: Dict[str, np.ndarray] = {}
+    labels: Dict[str, List[str]] = {}
+    merged_counts, merged_bads = [], []
+    offset = 0
+    for feature in feature_cols:
+        size = len(binning_spec.labels[feature])
+        c = counts[offset:offset + size]
+        b = bads[offset:offset + size]
+        offset += size
+        if binning_spec.is_categorical(feature) or size <= 2:
+            edges[feature] = binning_spec.edges[feature]
+            labels[feature] = list(binning_spec.labels[feature])
+            merged_counts.append(c)
+            merged_bads.append(b)
+            continue
+
+        # valid bins only; empty bins join the preceding non-empty one
+        valid_counts, valid_bads = c[1:], b[1:]
+        starts = np.flatnonzero(valid_counts > 0)
+        starts = np.array([0], dtype=np.int64) if len(starts) == 0 else np.r_[0, starts[1:]]
+        if method == "monotonic":
+            starts = _monotonic_groups(starts, valid_counts, valid_bads)
+        starts = _chimerge_groups(starts, valid_counts, valid_bads, max_bins, chi_threshold)
+
+        fine_edges = binning_spec.edges[feature]
+        edges[feature], bin_labels = _edge_labels(
+            np.r_[fine_edges[starts], fine_edges[-1]],
+            include_lowest=(binning_spec.method == "quantile"),
+        )
+        labels[feature] = [MISSING_LABEL, *bin_labels]
+        merged_counts.append(np.r_[c[:1], np.add.reduceat(valid_counts, starts)])
+        merged_bads.append(np.r_[b[:1], np.add.reduceat(valid_bads, starts)])
+
+    spec = BinningSpec(edges, labels, method=binning_spec.method, n_bins=max_bins)
+    return spec, np.concatenate(merged_counts), np.concatenate(merged_bads)
+
+
+def _count_arrow_batches(
+    reader,
+    label_col: str,
+    feature_cols: List[str],
+    positive_label: Any,
+    binning_spec: BinningSpec,
+    weight_col: Optional[str] = None,
+) -> pd.DataFrame:
+    """(Feature, Bin) counts of a RecordBatchReader summed over its batches."""
+    import pyarrow as pa
+
+    counts = bads = None
+    for batch in reader:
+        frame = _ArrowFrame(pa.Table.from_batches([batch]))
+        y_arr = (frame[label_col] == positive_label).to_numpy(dtype=np.float64)
+        weights = None if weight_col is None else _weight_array(frame, weight_col)
+        binned = [binning_spec.transform_feature(f, frame[f]) for f in feature_cols]
+        batch_counts, batch_bads = _bincount_codes(binned, y_arr, weights)
+        if counts is None:
+            counts, bads = batch_counts, batch_bads
+        else:
+            counts += batch_counts
+            bads += batch_bads
+    if counts is None:
+        raise ValueError("RecordBatchReader yielded no rows.")
+    n_first = len(binning_spec.labels[feature_cols[0]])
+    _check_goods_and_bads(bads[:n_first].sum(), counts[:n_first].sum())
+    return _counts_to_table(feature_cols, [binning_spec.labels[f] for f in feature_cols], counts, bads)
+
+
+def _label_positives(labels: List[str], positive_label: Any) -> List[Any]:
+    """One positive value per label from a scalar, a list or a {label: value} mapping."""
+    if isinstance(positive_label, dict):
+        return [positive_label.get(label, 1) for label in labels]
+    if isinstance(positive_label, (list, tuple)):
+        if len(positive_label) != len(labels):
+            raise ValueError(
+                f"Got {len(positive_label)} positive labels for {len(labels)} label columns."
+            )
+        return list(positive_label)
+    return [positive_label] * len(labels)
+
+
+def _bincount_labels(
+    binned: List[BinResult],
+    Y: np.ndarray,
+    weights: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Flat (feature, bin) counts and (label x flat) bads of several labels.
+
+    Same layout as ``_bincount_codes``; row counts are label independent and
+    taken once, bads once per (label, feature) on the shared codes.
+    """
+    sizes = np.array([b.n_codes for b in binned], dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum(sizes)])
+    counts = np.zeros(offsets[-1], dtype=np.int64 if weights is None else np.float64)
+    bads = np.zeros((len(Y), offsets[-1]), dtype=np.float64)
+    bad_weights = Y if weights is None else Y * weights
+
+    for i, b in enumerate(binned):
+        lo, hi = offsets[i], offsets[i + 1]
+        counts[lo:hi] = np.bincount(b.codes, weights=weights, minlength=sizes[i])
+        for j in range(len(Y)):
+            bads[j, lo:hi] = np.bincount(b.codes, weights=bad_weights[j], minlength=sizes[i])
+    return counts, bads
+
+
+def _calculate_iv_multi_label(
+    df: pd.DataFrame,
+    labels: List[str],
+    positives: List[Any],
+    feature_cols: List[str],
+    bin_kwargs: Dict[str, Any],
+    binning_spec: Optional[BinningSpec],
+    weights: Optional[np.ndarray],
+    iv_kwargs: Dict[str, Any],
+) -> Dict[str, Any]:
+    """IV of several target definitions over bins shared by all of them."""
+    Y = np.vstack([
+        (df[label] == positive).to_numpy(dtype=np.float64)
+        for label, positive in zip(labels, positives)
+    ])
+    row_weights = np.ones(Y.shape[1]) if weights is None else weights
+    for y_row in Y:
+        _check_goods_and_bads(float(row_weights @ y_row), float(row_weights.sum()))
+
+    if binning_spec is not None:
+        binned = [binning_spec.transform_feature(f, df[f]) for f in feature_cols]
+    else:
+        # supervised (tree) bins follow the first label
+        y = pd.Series(Y[0]) if bin_kwargs["method"] == "tree" else None
+        binned = [bin_feature_codes(df[f], y, weights=weights, **bin_kwargs) for f in feature_cols]
+    counts, bads = _bincount_labels(binned, Y, weights)
+
+    bin_labels = [b.labels for b in binned]
+    per_label = {
+        label: iv_from_bin_counts(_counts_to_table(feature_cols, bin_labels, counts, bads[j]), **iv_kwargs)
+        for j, label in enumerate(labels)
+    }
+    return {
+        key: pd.concat({label: per_label[label][key] for label in labels}, names=["Label"])
+        for key in per_label[labels[0]]
+    }
+
+
+def calculate_iv(
+    df: pd.DataFrame,
+    label_col: Union[str, List[str]],
+    feature_cols: Optional[List[str]] = None,
+    binning_method: str = "quantile",   # 'quantile' | 'width' | 'tree'
+    n_bins: int = 10,
+    min_leaf_frac: float = 0.05,
+    positive_label: Any = 1,
+    return_type: str = "both",          # 'bin' | 'feature' | 'both'
+    engine: str = "groupby",            # 'groupby' | 'vectorized'
+    tree_engine: str = "histogram",     # 'histogram' | 'sklearn'
+    binning_spec: Optional[BinningSpec] = None,
+    quantile_engine: str = "exact",     # 'exact' | 'sketch'
+    n_jobs: Optional[int] = 1,
+    discrimination: bool = False,
+    max_categories: Optional[int] = MAX_CATEGORIES,
+    min_category_frac: float = 0.0,
+    merge_method: Optional[str] = None,  # 'chimerge' | 'monotonic'
+    merge_fine_bins: int = MERGE_FINE_BINS,
+    chi_threshold: Optional[float] = CHI2_95,
+    n_bootstrap: int = 0,
+    bootstrap_method: str = "multinomial",  # 'multinomial' | 'poisson'
+    ci_level: float = 0.95,
+    random_state: Optional[int] = None,
+    weight_col: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Calculate Information Value (IV) for multiple features.
+
+    Parameters
+    ----------
+    df : pd.DataFrame, pyarrow.Table or pyarrow.RecordBatchReader
+        Input data table that contains label and feature columns. Arrow
+        input is read column by column without a pandas conversion (numeric
+        columns without nulls are NumPy views of the Arrow buffers); a
+        RecordBatchReader with a ``binning_spec`` is counted batch by batch.
+    label_col : str or list of str
+        Name of the label column. A list evaluates several target
+        definitions in one pass: features are binned once (tree bins on the
+        first label) and bads are counted per label on the shared bin codes
+        with the vectorized kernel; every result table then carries a leading
+        ``Label`` index level. Not combinable with ``merge_method``.
+    feature_cols : list of str, optional
+        Feature columns to be evaluated. If None, all columns except the
+        label(s) and weight_col are used.
+    binning_method : str
+        'quantile' (equal frequency), 'width' (equal width),
+        or 'tree' (decision-tree-based optimal binning).
+    n_bins : int
+        Number of bins or max leaf nodes (for tree).
+    min_leaf_frac : float
+        Minimum fraction of samples per leaf for tree binning.
+    positive_label : Any
+        The value in label_col that represents the "bad" or "event" class.
+        With several labels: one value for all, a list aligned with
+        ``label_col`` or a {label: value} mapping.
+    return_type : str
+        'bin'      -> return only per-bin IV table;
+        'feature'  -> return only per-feature IV summary;
+        'both'     -> return both.
+    engine : str
+        'groupby'    -> per-feature pandas groupby (reference implementation);
+        'vectorized' -> integer bin codes aggregated with np.bincount over a
+                        flat (feature, bin) index.
+    tree_engine : str
+        Split search used when binning_method='tree': 'histogram' (default)
+        or 'sklearn' (full DecisionTreeClassifier per feature).
+    binning_spec : BinningSpec, optional
+        Prefit bins. When given, the binning stage is skipped: features are
+        coded with the spec's edges (binning_method, n_bins, min_leaf_frac and
+        tree_engine are ignored) and counted with the vectorized kernel.
+        feature_cols defaults to the spec's features.
+    quantile_engine : str
+        Edge search for binning_method='quantile': 'exact' (pd.qcut, the
+        reference) or 'sketch' (one-pass KLL quantile sketch).
+    n_jobs : int, optional
+        Number of worker processes (-1 = all cores). With n_jobs > 1 the
+        features are split into blocks binned and counted by a process pool
+        over shared-memory column buffers, always with the vectorized kernel.
+        Workers start via ``forkserver``, so a calling script needs an
+        ``if __name__ == "__main__":`` guard; without it the pool cannot
+        start and the counts fall back to serial with a RuntimeWarning.
+    discrimination : bool
+        Also return binned KS, AUC, Gini and divergence per feature, derived
+        from the same per-bin counts.
+    max_categories, min_category_frac :
+        Level folding for categorical features (detected per column from the
+        dtype): at most ``max_categories`` levels with a row share of at least
+        ``min_category_frac`` get their own bin, the rest form 'OTHER'.
+    merge_method : str, optional
+        Supervised merge stage (see ``merge_bin_counts``): features are first
+        binned into ``merge_fine_bins`` bins (or the bins of ``binning_spec``),
+        counted once with the vectorized kernel, and adjacent bins are merged
+        on the counts down to at most ``n_bins`` ('chimerge'), with a
+        monotonic bad rate first for 'monotonic'.
+    merge_fine_bins : int
+        Number of fine bins the merge starts from.
+    chi_threshold : float, optional
+        ChiMerge significance threshold for the merge stage.
+    n_bootstrap : int
+        If > 0, add bootstrap confidence intervals of each feature's IV,
+        resampled from the per-bin good/bad counts (see
+        ``bootstrap_iv_from_bin_counts``).
+    bootstrap_method, ci_level, random_state :
+        'multinomial' or 'poisson' replicates, interval coverage and seed.
+    weight_col : str, optional
+        Non-negative row weights (sampling weights, exposure). Binning uses
+        weighted quantiles / weighted tree histograms, counting is a weighted
+        ``np.bincount`` (always the vectorized kernel), and ``count`` /
+        ``bads`` in the result are weight sums, so distributions, WoE and IV
+        are those of the weighted population. Not combinable with
+        ``n_bootstrap``.
+
+    Returns
+    -------
+    Dict[str, Any]
+        keys (depending on return_type):
+            - 'per_bin' : pd.DataFrame with index (Feature, Bin) and columns:
+                ['count', 'bads', 'goods', 'pct_goods', 'pct_bads',
+                 'count_pct', 'bad_rate', 'woe', 'iv']
+            - 'per_feature' : pd.Series with overall IV per feature.
+            - 'discrimination' : pd.DataFrame indexed by Feature with
+                ['IV', 'KS', 'AUC', 'Gini', 'Divergence'] (if requested).
+            - 'binning_spec' : BinningSpec with the merged edges (only with
+                merge_method).
+            - 'iv_ci' : pd.DataFrame indexed by Feature with ['IV', 'iv_mean',
+                'iv_std', 'ci_lower', 'ci_upper'] (only with n_bootstrap).
+        With a list of labels each table is indexed by (Label, ...) instead,
+        e.g. 'per_feature' by (Label, Feature).
+    """
+    multi_label = isinstance(label_col, (list, tuple))
+    labels = list(label_col) if multi_label else [label_col]
+    if multi_label and merge_method is not None:
+        raise ValueError("merge_method is not supported with several label columns.")
+
+    batches = None
+    if (
+        _is_arrow(df) and hasattr(df, "read_next_batch") and binning_spec is not None
+        and merge_method is None and not multi_label
+    ):
+        # prefit bins: count record batch by record batch, never holding the table
+        batches, df = df, _ArrowFrame(df.schema.empty_table())
+    else:
+        df = _as_frame(df)
+
+    if feature_cols is None:
+        if binning_spec is not None:
+            feature_cols = binning_spec.features
+        else:
+            feature_cols = [c for c in df.columns if c not in (*labels, weight_col)]
+    feature_cols = list(feature_cols)
+
+    # ensure label exists
+    for label in labels:
+        if label not in df.columns:
+            raise ValueError(f"Label column '{label}' not found in DataFrame.")
+
+    for feature in feature_cols:
+        if feature not in df.columns:
+            raise ValueError(f"Feature column '{feature}' not found in DataFrame.")
+
+    if not feature_cols:
+        raise ValueError("No features to calculate IV.")
+
+    if engine == "groupby":
+        count_bins = _count_bins_groupby
+    elif engine == "vectorized":
+        count_bins = _count_bins_vectorized
+    else:
+        raise ValueError(f"Unsupported IV engine: {engine}")
+
+    if weight_col is not None and n_bootstrap:
+        raise ValueError("Bootstrap intervals are not supported with weight_col.")
+    weights = None if weight_col is None else _weight_array(df, weight_col)
+    iv_kwargs = dict(
+        return_type=return_type,
+        discrimination=discrimination,
+        n_bootstrap=n_bootstrap,
+        bootstrap_method=bootstrap_method,
+        ci_level=ci_level,
+        random_state=random_state,
+    )
+    bin_kwargs = dict(
+        method=binning_method,
+        n_bins=n_bins,
+        min_leaf_frac=min_leaf_frac,
+        tree_engine=tree_engine,
+        quantile_engine=quantile_engine,
+        max_categories=max_categories,
+        min_category_frac=min_category_frac,
+    )
+    if multi_label:
+        return _calculate_iv_multi_label(
+            df, labels, _label_positives(labels, positive_label), feature_cols,
+            bin_kwargs, binning_spec, weights, iv_kwargs,
+        )
+
+    # binary label: 1 for positive_label, 0 for others (one byte per row)
+    y = (df[label_col] == positive_label).astype(np.uint8)
+    if batches is None and weights is None:
+        _check_goods_and_bads(int(y.sum()), len(y))
+    elif batches is None:
+        _check_goods_and_bads(float(weights @ y.to_numpy(dtype=np.float64)), float(weights.sum()))
+
+    n_jobs = _resolve_n_jobs(n_jobs)
+
+    merged_spec = None
+    # index: (Feature, Bin)
+    if batches is not None:
+        summary_table = _count_arrow_batches(
+            batches, label_col, feature_cols, positive_label, binning_spec, weight_col
+        )
+    elif merge_method is not None:
+        fine_spec = binning_spec or BinningSpec.fit(
+            df, feature_cols, label_col,
+            method=binning_method,
+            n_bins=merge_fine_bins,
+            min_leaf_frac=min_leaf_frac,
+            positive_label=positive_label,
+            tree_engine=tree_engine,
+            quantile_engine=quantile_engine,
+            max_categories=max_categories,
+            min_category_frac=min_category_frac,
+            weight_col=weight_col,
+        )
+        binned = [fine_spec.transform_feature(f, df[f]) for f in feature_cols]
+        counts, bads = _bincount_codes(binned, y.to_numpy(dtype=np.float64), weights)
+        merged_spec, counts, bads = merge_bin_counts(
+            fine_spec, feature_cols, counts, bads,
+            method=merge_method, max_bins=n_bins, chi_threshold=chi_threshold,
+        )
+        labels = [merged_spec.labels[f] for f in feature_cols]
+        summary_table = _counts_to_table(feature_cols, labels, counts, bads)
+    elif n_jobs > 1 and len(feature_cols) > 1:
+        summary_table = _count_bins_parallel(df, y, feature_cols, bin_kwargs, binning_spec, n_jobs, weights)
+    elif binning_spec is not None:
+        binned = [binning_spec.transform_feature(f, df[f]) for f in feature_cols]
+        summary_table = _count_codes(feature_cols, binned, y.to_numpy(dtype=np.float64), weights)
+    elif weights is not None:
+        # weighted sums only exist in the bincount kernel
+        summary_table = _count_bins_vectorized(df, y, feature_cols, bin_kwargs, weights)
+    else:
+        summary_table = count_bins(df, y, feature_cols, bin_kwargs)
+
+    result = iv_from_bin_counts(summary_table, **iv_kwargs)
+    if merged_spec is not None:
+        result["binning_spec"] = merged_spec
+    return result
+
+
+def _check_goods_and_bads(total_bads: float, total_count: float) -> None:
+    if total_bads == 0 or total_count - total_bads == 0:
+        raise ValueError(
+            "Cannot compute IV because there are no bad or no good samples "
+            "in the dataset."
+        )
+
+
+def iv_from_bin_counts(
+    summary_table: pd.DataFrame,
+    return_type: str = "both",
+    discrimination: bool = False,
+    n_bootstrap: int = 0,
+    bootstrap_method: str = "multinomial",
+    ci_level: float = 0.95,
+    random_state: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Finish an IV result from a (Feature, Bin) table of ``count`` and ``bads``.
+
+    Shared by ``calculate_iv`` and callers that aggregate counts themselves
+    (e.g. chunked runs); returns the same ``per_bin`` / ``per_feature``
+    structure as ``calculate_iv``, plus a ``discrimination`` table (see
+    ``discrimination_from_bin_counts``) and an ``iv_ci`` table (see
+    ``bootstrap_iv_from_bin_counts``) when requested.
+    """
+    summary_table = _summarize_bin_counts(summary_table)
+
+    #  per-feature IV (overall)
+    iv_per_feature = (
+        summary_table
+        .groupby(level=0)["iv"]
+        .sum()
+        .sort_values(ascending=False)
+    )
+
+    result: Dict[str, Any] = {}
+
+    if return_type in ("bin", "both"):
+        result["per_bin"] = summary_table
+
+    if return_type in ("feature", "both"):
+        result["per_feature"] = iv_per_feature
+
+    if discrimination:
+        table = discrimination_from_bin_counts(summary_table)
+        table.insert(0, "IV", iv_per_feature)
+        result["discrimination"] = table.loc[iv_per_feature.index]
+
+    if n_bootstrap:
+        result["iv_ci"] = bootstrap_iv_from_bin_counts(
+            summary_table, n_bootstrap,
+            method=bootstrap_method, ci_level=ci_level, random_state=random_state,
+        ).loc[iv_per_feature.index]
+
+    return result
+
+
+# ---------- bootstrap IV confidence intervals ----------
+def _iv_of_counts(goods: np.ndarray, bads: np.ndarray) -> np.ndarray:
+    """IV per row of (replicates x bins) good / bad count matrices."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct_goods = np.clip(goods / goods.sum(axis=1, keepdims=True), IV_EPS, None)
+        pct_bads = np.clip(bads / bads.sum(axis=1, keepdims=True), IV_EPS, None)
+    return ((pct_goods - pct_bads) * np.log(pct_goods / pct_bads)).sum(axis=1)
+
+
+def bootstrap_iv_from_bin_counts(
+    summary_table: pd.DataFrame,
+    n_bootstrap: int = 1000,
+    method: str = "multinomial",     # 'multinomial' | 'poisson'
+    ci_level: float = 0.95,
+    random_state: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Bootstrap confidence intervals of each feature's IV from its bin counts.
+
+    Row resampling only changes a feature's (bin, good/bad) cell counts, so
+    replicates are drawn directly as a (replicates x cells) matrix:
+    'multinomial' redraws the feature's N rows over the observed cell
+    shares (the classical bootstrap), 'poisson' draws every cell as
+    Poisson(count) (Poisson bootstrap, total size varies). No raw rows are
+    touched; cost is O(n_bootstrap * bins) per feature.
 
     Parameters
     ----------
-    series : pd.Series
-        Raw feature values.
-    y : pd.Series, optional
-        Target labels (only needed when method='tree').
-    method : str
-        'quantile' (equal frequency), 'width' (equal width),
-        or 'tree' (decision-tree-based optimal binning).
-    n_bins : int
-        Number of bins or max leaf nodes (for tree).
-    min_leaf_frac : float
-        Minimum fraction of samples per leaf for tree binning.
+    summary_table : pd.DataFrame
+        (Feature, Bin) table with ``count`` and ``bads`` columns.
+    n_bootstrap : int
+        Number of replicates.
+    ci_level : float
+        Two-sided percentile interval coverage.
+    random_state : int, optional
+        Seed for reproducible intervals.
 
     Returns
     -------
-    pd.Series
-        Series of bin labels (string), same index as input series.
-        Missing values are grouped into 'MISSING'.
+    pd.DataFrame
+        Index Feature; columns ['IV', 'iv_mean', 'iv_std', 'ci_lower', 'ci_upper'].
     """
-    # convert to numeric, coerce invalid to NaN
-    s = pd.to_numeric(series, errors="coerce")
-    bins = pd.Series(index=s.index, dtype="object")
+    if method not in ("multinomial", "poisson"):
+        raise ValueError(f"Unsupported bootstrap method: {method}")
+    if not 0 < ci_level < 1:
+        raise ValueError(f"ci_level must be in (0, 1), got {ci_level}")
 
-    # handle missing values as a separate bin
-    missing_mask = s.isna()
+    rng = np.random.default_rng(random_state)
+    alpha = (1 - ci_level) / 2
+    rows = {}
+    for feature, bins in summary_table.groupby(level=0, sort=False):
+        bads = bins["bads"].to_numpy(dtype=np.int64)
+        # cells: goods of every bin, then bads of every bin
+        cells = np.concatenate([bins["count"].to_numpy(dtype=np.int64) - bads, bads])
+        if method == "multinomial":
+            draws = rng.multinomial(cells.sum(), cells / cells.sum(), size=n_bootstrap)
+        else:
+            draws = rng.poisson(cells, size=(n_bootstrap, len(cells)))
+        k = len(bads)
+        ivs = _iv_of_counts(draws[:, :k].astype(np.float64), draws[:, k:].astype(np.float64))
+        ivs = ivs[np.isfinite(ivs)]
+        rows[feature] = {
+            "IV": _iv_of_counts(cells[None, :k].astype(np.float64), cells[None, k:].astype(np.float64))[0],
+            "iv_mean": ivs.mean(),
+            "iv_std": ivs.std(ddof=1),
+            "ci_lower": np.quantile(ivs, alpha),
+            "ci_upper": np.quantile(ivs, 1 - alpha),
+        }
 
-    # ================== quantile / width ==================
-    if method in ("quantile", "width"):
-        valid_mask = ~missing_mask
-        if valid_mask.sum() == 0:
-            # all values are missing
-            bins[missing_mask] = "MISSING"
-            return bins
+    table = pd.DataFrame.from_dict(rows, orient="index")
+    table.index.name = "Feature"
+    return table
 
-        s_valid = s[valid_mask]
 
-        try:
-            if method == "quantile":
-                # equal frequency binning
-                binned = pd.qcut(s_valid, q=n_bins, duplicates="drop")
-            else:
-                # equal width binning
-                binned = pd.cut(s_valid, bins=n_bins, duplicates="drop")
-        except ValueError:
-            # e.g. all values are identical
-            binned = pd.Series(["ALL"] * valid_mask.sum(), index=s_valid.index)
+# ---------- discriminatory power (KS / AUC / Gini / divergence) ----------
+def _ordered_rank_statistics(
+    group: np.ndarray,
+    goods: np.ndarray,
+    bads: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """KS and AUC per group of count rows ordered from most to least risky.
 
-        bins[valid_mask] = binned.astype(str)
-        bins[missing_mask] = "MISSING"
-        return bins
+    ``group`` holds contiguous ids 0..n_groups-1. Ties inside a row count as
+    half (trapezoidal AUC), so bins give the AUC of the binned score.
+    """
+    n_groups = int(group[-1]) + 1
+    total_goods = np.bincount(group, weights=goods, minlength=n_groups)
+    total_bads = np.bincount(group, weights=bads, minlength=n_groups)
+    starts = np.flatnonzero(np.r_[True, group[1:] != group[:-1]])
+    sizes = np.diff(np.r_[starts, len(group)])
 
-    # ================== tree-based binning ==================
-    elif method == "tree":
-        if y is None:
-            raise ValueError("y must be provided when method='tree'.")
+    # cumulative sums restarted at every group
+    cum_goods = np.cumsum(goods)
+    cum_bads = np.cumsum(bads)
+    cum_goods -= np.repeat(cum_goods[starts] - goods[starts], sizes)
+    cum_bads -= np.repeat(cum_bads[starts] - bads[starts], sizes)
 
-        valid_mask = ~missing_mask
-        if valid_mask.sum() == 0:
-            bins[missing_mask] = "MISSING"
-            return bins
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gap = np.abs(cum_bads / total_bads[group] - cum_goods / total_goods[group])
+        ks = np.maximum.reduceat(gap, starts)
+        # a bad outranks the goods in less risky rows and half of its own row
+        wins = bads * (total_goods[group] - cum_goods + 0.5 * goods)
+        auc = np.bincount(group, weights=wins, minlength=n_groups) / (total_bads * total_goods)
+    return ks, auc
 
-        X = s[valid_mask].values.reshape(-1, 1)
-        y_vec = np.array(y)[valid_mask]
 
-        # ensure minimum samples per leaf
-        min_samples_leaf = max(int(len(X) * min_leaf_frac), 1)
+def discrimination_from_bin_counts(summary_table: pd.DataFrame) -> pd.DataFrame:
+    """
+    Binned KS, AUC, Gini and divergence per feature from a per-bin IV table.
 
-        clf = DecisionTreeClassifier(
-            max_leaf_nodes=n_bins,
-            min_samples_leaf=min_samples_leaf,
-        )
-        clf.fit(X, y_vec)
-        leaf_ids = clf.apply(X)
+    Bins are ranked by bad rate (highest first), i.e. the statistics are those
+    of the WoE-transformed characteristic, computed with grouped cumulative
+    sums over the small count arrays (no pass over the rows).
 
-        leaf_series = pd.Series(leaf_ids, index=s[valid_mask].index)
-        bins[valid_mask] = leaf_series.map(lambda v: f"leaf_{int(v)}")
-        bins[missing_mask] = "MISSING"
-        return bins
+    Parameters
+    ----------
+    summary_table : pd.DataFrame
+        ``per_bin`` output of ``calculate_iv`` (needs goods, bads, woe).
 
-    else:
-        raise ValueError(f"Unsupported binning method: {method}")
+    Returns
+    -------
+    pd.DataFrame
+        Index Feature; columns ['KS', 'AUC', 'Gini', 'Divergence'].
+    """
+    table = summary_table[["goods", "bads", "woe"]].copy()
+    table["bad_rate"] = table["bads"] / (table["goods"] + table["bads"])
+    table["_feature"], features = pd.factorize(table.index.get_level_values(0))
+    table = table.sort_values(["_feature", "bad_rate"], ascending=[True, False], kind="stable")
 
+    group = table["_feature"].to_numpy()
+    goods = table["goods"].to_numpy(dtype=np.float64)
+    bads = table["bads"].to_numpy(dtype=np.float64)
+    woe = table["woe"].to_numpy(dtype=np.float64)
+    ks, auc = _ordered_rank_statistics(group, goods, bads)
 
-# ============== 2. IV calculator (main) =================
-def calculate_iv(
+    # divergence of the WoE score between goods and bads
+    n_groups = len(features)
+    total_goods = np.bincount(group, weights=goods, minlength=n_groups)
+    total_bads = np.bincount(group, weights=bads, minlength=n_groups)
+    mean_g = np.bincount(group, weights=goods * woe, minlength=n_groups) / total_goods
+    mean_b = np.bincount(group, weights=bads * woe, minlength=n_groups) / total_bads
+    var_g = np.bincount(group, weights=goods * woe ** 2, minlength=n_groups) / total_goods - mean_g ** 2
+    var_b = np.bincount(group, weights=bads * woe ** 2, minlength=n_groups) / total_bads - mean_b ** 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        divergence = (mean_g - mean_b) ** 2 / (0.5 * (var_g + var_b))
+
+    return pd.DataFrame(
+        {"KS": ks, "AUC": auc, "Gini": 2 * auc - 1, "Divergence": divergence},
+        index=pd.Index(features, name="Feature"),
+    )
+
+
+def calculate_discrimination(
     df: pd.DataFrame,
     label_col: str,
     feature_cols: Optional[List[str]] = None,
-    binning_method: str = "quantile",   # 'quantile' | 'width' | 'tree'
-    n_bins: int = 10,
-    min_leaf_frac: float = 0.05,
     positive_label: Any = 1,
-    return_type: str = "both",          # 'bin' | 'feature' | 'both'
-) -> Dict[str, Any]:
+    mode: str = "binned",               # 'binned' | 'exact'
+    **iv_kwargs: Any,
+) -> pd.DataFrame:
     """
-    Calculate Information Value (IV) for multiple features.
+    Discriminatory-power table (IV, KS, AUC, Gini, divergence) per feature.
+
+    mode='binned' derives everything from the ``calculate_iv`` bin counts
+    (``iv_kwargs`` are passed to ``calculate_iv``). mode='exact' sorts each
+    raw feature once and computes KS / AUC / Gini over its distinct values
+    (missing values excluded, AUC oriented to be >= 0.5) and divergence on
+    the raw values; IV is still the binned IV. Categorical features are
+    ranked by level bad rate (no divergence), and features without valid
+    values get NaN statistics.
+    """
+    iv_result = calculate_iv(
+        df, label_col, feature_cols, positive_label=positive_label,
+        return_type="bin", discrimination=True, **iv_kwargs,
+    )
+    table = iv_result["discrimination"]
+    if mode == "binned":
+        return table
+    if mode != "exact":
+        raise ValueError(f"Unsupported discrimination mode: {mode}")
+
+    y = (df[label_col] == positive_label).to_numpy(dtype=np.float64)
+    exact = {}
+    for feature in table.index:
+        if _is_categorical(df[feature]):
+            # nominal levels have no order: rank them by bad rate, riskiest first
+            codes, _ = pd.factorize(df[feature])
+            valid = codes >= 0
+            level_bads = np.bincount(codes[valid], weights=y[valid])
+            level_counts = np.bincount(codes[valid])
+            order = np.argsort(-level_bads / np.maximum(level_counts, 1), kind="stable")
+            bads, goods = level_bads[order], (level_counts - level_bads)[order]
+            divergence = np.nan
+        else:
+            x = _to_float_array(df[feature])
+            valid = ~np.isnan(x)
+            x, y_valid = x[valid], y[valid]
+            order = np.argsort(x, kind="stable")
+            xs, ys = x[order], y_valid[order]
+
+            # one row per distinct value, ascending
+            starts = np.flatnonzero(np.r_[True, np.diff(xs) != 0])
+            bads = np.add.reduceat(ys, starts) if len(xs) else np.empty(0)
+            goods = np.diff(np.r_[starts, len(xs)]) - bads
+
+            x_g, x_b = xs[ys == 0], xs[ys == 1]
+            divergence = np.nan
+            if len(x_g) and len(x_b):
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    divergence = (x_g.mean() - x_b.mean()) ** 2 / (0.5 * (x_g.var() + x_b.var()))
+
+        if len(goods) == 0:
+            # no valid values: nothing to rank
+            exact[feature] = {"KS": np.nan, "AUC": np.nan, "Gini": np.nan, "Divergence": np.nan}
+            continue
+        ks, auc = _ordered_rank_statistics(np.zeros(len(goods), dtype=np.int64), goods, bads)
+        auc = max(auc[0], 1 - auc[0])
+        exact[feature] = {"KS": ks[0], "AUC": auc, "Gini": 2 * auc - 1, "Divergence": divergence}
+
+    exact_table = pd.DataFrame.from_dict(exact, orient="index")
+    exact_table.index.name = "Feature"
+    return pd.concat([table[["IV"]], exact_table], axis=1)
+
+
+# ---------- binning configuration sweep ----------
+GRID_CONFIG_KEYS = {"name", "method", "n_bins", "min_leaf_frac", "criterion"}
+
+
+def _grid_config_name(config: Dict[str, Any]) -> str:
+    return config.get("name") or f"{config.get('method', 'quantile')}_{config.get('n_bins', 10)}"
+
+
+def _grid_cuts(
+    config: Dict[str, Any],
+    xs: np.ndarray,
+    uniq: np.ndarray,
+    counts: np.ndarray,
+    bads: np.ndarray,
+) -> np.ndarray:
+    """Inner edges of one configuration from the sorted values / distinct-value histogram.
+
+    A value ``x`` falls below cut ``c`` iff ``x <= c``, as with the edges of
+    ``bin_feature_codes`` for every method.
+    """
+    method = config.get("method", "quantile")
+    n_bins = int(config.get("n_bins", 10))
+    if method == "quantile":
+        # same interpolation as pd.qcut, on the already sorted values
+        return np.unique(np.percentile(xs, np.linspace(0, 1, n_bins + 1) * 100))[1:-1]
+    if method == "width":
+        # pd.cut: interior edges only depend on min / max
+        lo, hi = xs[0], xs[-1]
+        if lo == hi:
+            return np.empty(0)
+        return np.linspace(lo, hi, n_bins + 1)[1:-1]
+    if method == "tree":
+        min_samples_leaf = max(int(len(xs) * config.get("min_leaf_frac", 0.05)), 1)
+        return _tree_thresholds_from_histogram(
+            uniq, counts, bads, n_bins, min_samples_leaf, config.get("criterion", "gini")
+        )
+    raise ValueError(f"Unsupported binning method: {method}")
+
+
+def calculate_iv_grid(
+    df: pd.DataFrame,
+    label_col: str,
+    configs: List[Dict[str, Any]],
+    feature_cols: Optional[List[str]] = None,
+    positive_label: Any = 1,
+    max_categories: Optional[int] = MAX_CATEGORIES,
+    min_category_frac: float = 0.0,
+) -> pd.DataFrame:
+    """
+    IV of every feature under several binning configurations from one sort.
 
     Parameters
     ----------
-    df : pd.DataFrame
-        Input data table that contains label and feature columns.
+    df : pd.DataFrame or pyarrow.Table
+        Input data with label and feature columns.
     label_col : str
         Name of the label column.
+    configs : list of dict
+        Binning configurations with keys 'method' ('quantile' | 'width' |
+        'tree'), 'n_bins', 'min_leaf_frac' and 'criterion' (tree) and an
+        optional 'name' (default ``'<method>_<n_bins>'``).
     feature_cols : list of str, optional
-        Feature columns to be evaluated. If None, all columns except label_col are used.
-    binning_method : str
-        'quantile' (equal frequency), 'width' (equal width),
-        or 'tree' (decision-tree-based optimal binning).
-    n_bins : int
-        Number of bins or max leaf nodes (for tree).
-    min_leaf_frac : float
-        Minimum fraction of samples per leaf for tree binning.
+        Features to evaluate (default: all columns except label_col).
     positive_label : Any
-        The value in label_col that represents the "bad" or "event" class.
-    return_type : str
-        'bin'      -> return only per-bin IV table;
-        'feature'  -> return only per-feature IV summary;
-        'both'     -> return both.
+        The value in label_col that represents the "bad" class.
+    max_categories, min_category_frac :
+        Level folding of categorical features, whose bins (and IV) are the
+        same under every configuration.
 
     Returns
     -------
-    Dict[str, Any]
-        keys (depending on return_type):
-            - 'per_bin' : pd.DataFrame with index (Feature, Bin) and columns:
-                ['count', 'bads', 'goods', 'pct_goods', 'pct_bads',
-                 'count_pct', 'bad_rate', 'woe', 'iv']
-            - 'per_feature' : pd.Series with overall IV per feature.
+    pd.DataFrame
+        Index (Config, Feature); columns ['IV', 'n_bins'] with the number of
+        non-empty, non-missing bins. Values match ``calculate_iv``
+        with the same binning_method / n_bins (exact quantile engine).
+
+    Each numeric feature is converted and sorted once and reduced to a
+    distinct-value histogram of rows and bads. Quantile edges are read off
+    the sorted values, width edges off its min / max, and tree splits are
+    grown on the histogram; bin counts of every configuration are then
+    differences of the cumulative histogram at the edges, so a sweep costs
+    about one ``calculate_iv`` run plus O(bins) per configuration.
     """
+    df = _as_frame(df)
+    if label_col not in df.columns:
+        raise ValueError(f"Label column '{label_col}' not found in DataFrame.")
     if feature_cols is None:
         feature_cols = [c for c in df.columns if c != label_col]
+    for feature in feature_cols:
+        if feature not in df.columns:
+            raise ValueError(f"Feature column '{feature}' not found in DataFrame.")
+    if not feature_cols:
+        raise ValueError("No features to calculate IV.")
+    if not configs:
+        raise ValueError("No binning configurations to evaluate.")
+    for config in configs:
+        unknown = set(config) - GRID_CONFIG_KEYS
+        if unknown:
+            raise ValueError(f"Unsupported binning configuration keys: {sorted(unknown)}")
+    names = [_grid_config_name(config) for config in configs]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Binning configuration names must be unique, got {names}")
 
-    # ensure label exists
-    if label_col not in df.columns:
-        raise ValueError(f"Label column '{label_col}' not found in DataFrame.")
+    y = (df[label_col] == positive_label).to_numpy(dtype=np.float64)
+    _check_goods_and_bads(int(y.sum()), len(y))
 
-    # binary label: 1 for positive_label, 0 for others
-    y = (df[label_col] == positive_label).astype(int)
+    iv = np.zeros((len(configs), len(feature_cols)))
+    n_valid_bins = np.zeros((len(configs), len(feature_cols)), dtype=np.int64)
+    for j, feature in enumerate(feature_cols):
+        if _is_categorical(df[feature]):
+            binned = bin_categorical_codes(df[feature], max_categories, min_category_frac)
+            counts, bads = _bincount_codes([binned], y)
+            iv[:, j] = _iv_of_counts((counts - bads)[None, :], bads[None, :])[0]
+            n_valid_bins[:, j] = int((counts[1:] > 0).sum())
+            continue
 
-    all_summary_tables = []
+        x = _to_float_array(df[feature])
+        valid = ~np.isnan(x)
+        missing_count, missing_bads = float((~valid).sum()), float(y[~valid].sum())
+        order = np.argsort(x[valid])
+        xs, ys = x[valid][order], y[valid][order]
 
-    #  loop over features and bin each one
+        # one row per distinct value, ascending
+        starts = np.flatnonzero(np.r_[True, np.diff(xs) != 0]) if len(xs) else np.empty(0, dtype=np.int64)
+        uniq = xs[starts]
+        counts = np.diff(np.r_[starts, len(xs)]).astype(np.float64)
+        bads = np.add.reduceat(ys, starts) if len(xs) else np.empty(0)
+        cum_counts = np.r_[0.0, np.cumsum(counts)]
+        cum_bads = np.r_[0.0, np.cumsum(bads)]
+
+        for i, config in enumerate(configs):
+            cuts = _grid_cuts(config, xs, uniq, counts, bads) if len(xs) else np.empty(0)
+            bounds = np.r_[0, np.searchsorted(uniq, cuts, side="right"), len(uniq)]
+            bin_counts = np.r_[missing_count, np.diff(cum_counts[bounds])]
+            bin_bads = np.r_[missing_bads, np.diff(cum_bads[bounds])]
+            iv[i, j] = _iv_of_counts((bin_counts - bin_bads)[None, :], bin_bads[None, :])[0]
+            n_valid_bins[i, j] = int((bin_counts[1:] > 0).sum())
+
+    index = pd.MultiIndex.from_product([names, list(feature_cols)], names=["Config", "Feature"])
+    return pd.DataFrame({"IV": iv.ravel(), "n_bins": n_valid_bins.ravel()}, index=index)
+
+
+def calculate_iv_by_segment(
+    df: pd.DataFrame,
+    label_col: str,
+    segment_col: str,
+    segments: Optional[List[Any]] = None,
+    feature_cols: Optional[List[str]] = None,
+    binning_method: str = "quantile",   # 'quantile' | 'width' | 'tree'
+    n_bins: int = 10,
+    min_leaf_frac: float = 0.05,
+    positive_label: Any = 1,
+    return_type: str = "both",          # 'bin' | 'feature' | 'both'
+    tree_engine: str = "histogram",     # 'histogram' | 'sklearn'
+    quantile_engine: str = "exact",     # 'exact' | 'sketch'
+    binning_spec: Optional[BinningSpec] = None,
+    include_all: bool = False,
+    all_label: str = ALL_SEGMENT,
+    discrimination: bool = False,
+    max_categories: Optional[int] = MAX_CATEGORIES,
+    min_category_frac: float = 0.0,
+) -> Dict[Any, Dict[str, Any]]:
+    """
+    Calculate IV for every segment of ``df`` in one aggregation pass.
+
+    The segment column is factorized once and the rows are ordered by
+    segment, so each segment is a contiguous slice (no per-segment copy of
+    the frame). For every feature, each segment's slice is binned on its own
+    (or coded with ``binning_spec``) and the codes are shifted into one flat
+    (segment, bin) index that a single ``np.bincount`` turns into the counts
+    of all segments at once.
+
+    Parameters
+    ----------
+    segment_col : str
+        Column holding the segment of each row.
+    segments : list, optional
+        Segments to evaluate, in output order. If None, every non-null value
+        of ``segment_col`` is used (sorted). Segments without rows are skipped.
+    include_all : bool
+        Also evaluate an ``all_label`` pseudo-segment made of all rows, with
+        bins fitted on the whole frame.
+    discrimination : bool
+        Add the per-feature KS / AUC / Gini / divergence table per segment.
+    Other parameters are as in ``calculate_iv``.
+
+    Returns
+    -------
+    Dict[Any, Dict[str, Any]]
+        Segment -> ``calculate_iv``-style result (``per_bin`` / ``per_feature``).
+    """
+    df = _as_frame(df)
+    if segment_col not in df.columns:
+        raise ValueError(f"Segment column '{segment_col}' not found in DataFrame.")
+    if label_col not in df.columns:
+        raise ValueError(f"Label column '{label_col}' not found in DataFrame.")
+    if feature_cols is None:
+        if binning_spec is not None:
+            feature_cols = binning_spec.features
+        else:
+            feature_cols = [c for c in df.columns if c not in (label_col, segment_col)]
+    feature_cols = list(feature_cols)
     for feature in feature_cols:
         if feature not in df.columns:
             raise ValueError(f"Feature column '{feature}' not found in DataFrame.")
+    if not feature_cols:
+        raise ValueError("No features to calculate IV.")
 
-        # tree method requires y, others ignore it
-        if binning_method == "tree":
-            bins = bin_single_feature(
-                series=df[feature],
-                y=y,
-                method=binning_method,
-                n_bins=n_bins,
-                min_leaf_frac=min_leaf_frac,
-            )
-        else:
-            bins = bin_single_feature(
-                series=df[feature],
-                method=binning_method,
-                n_bins=n_bins,
-                min_leaf_frac=min_leaf_frac,
-            )
+    seg_codes, seg_values = pd.factorize(df[segment_col], sort=True)
+    if segments is None:
+        # categorical segments factorize in category order, so sort by value
+        segments = sorted(seg_values)
+    lookup = {v: i for i, v in enumerate(seg_values)}
+    segments = [seg for seg in segments if seg in lookup]
 
-        temp_df = pd.DataFrame({
-            "Feature": feature,
-            "Bin": bins,
-            "Bad": y,
-        })
+    # rows ordered by segment: segment i is rows bounds[i]:bounds[i + 1] of `order`
+    order = np.argsort(seg_codes, kind="stable")
+    n_missing_seg = int((seg_codes < 0).sum())
+    seg_sizes = np.bincount(seg_codes[seg_codes >= 0], minlength=len(seg_values))
+    bounds = n_missing_seg + np.concatenate([[0], np.cumsum(seg_sizes)])
+    slices = [(bounds[lookup[seg]], bounds[lookup[seg] + 1]) for seg in segments]
 
-        # group by feature and bin
-        summary = temp_df.groupby(["Feature", "Bin"])["Bad"].agg(["count", "sum"])
-        summary.rename(columns={"sum": "bads"}, inplace=True)
-        all_summary_tables.append(summary)
+    y_full = (df[label_col] == positive_label).to_numpy(dtype=np.float64)
+    y_sorted = y_full[order]
+    for lo, hi in slices:
+        _check_goods_and_bads(int(y_sorted[lo:hi].sum()), hi - lo)
+    if include_all:
+        _check_goods_and_bads(int(y_full.sum()), len(y_full))
 
-    if not all_summary_tables:
-        raise ValueError("No features to calculate IV.")
+    bin_kwargs = dict(
+        method=binning_method,
+        n_bins=n_bins,
+        min_leaf_frac=min_leaf_frac,
+        tree_engine=tree_engine,
+        quantile_engine=quantile_engine,
+        max_categories=max_categories,
+        min_category_frac=min_category_frac,
+    )
 
-    #  concatenate all features' bin summaries
-    summary_table = pd.concat(all_summary_tables)
-    # index: (Feature, Bin)
+    in_segments = np.zeros(len(order), dtype=bool)
+    for lo, hi in slices:
+        in_segments[lo:hi] = True
+    y_in_segments = y_sorted[in_segments]
 
-    #  calculate global totals
-    total_bads = summary_table["bads"].sum()
-    total_goods = summary_table["count"].sum() - total_bads
+    seg_labels: List[List[np.ndarray]] = [[] for _ in segments]
+    seg_counts: List[List[np.ndarray]] = [[] for _ in segments]
+    seg_bads: List[List[np.ndarray]] = [[] for _ in segments]
+    all_binned: List[BinResult] = []
 
-    if total_bads == 0 or total_goods == 0:
-        raise ValueError(
-            "Cannot compute IV because there are no bad or no good samples "
-            "in the dataset."
+    for feature in feature_cols:
+        x_full = df[feature].reset_index(drop=True)
+        x_sorted = x_full.iloc[order].reset_index(drop=True)
+
+        # shift each segment's codes into its own block of one flat index
+        flat = np.zeros(len(order), dtype=np.int64)
+        offsets = [0]
+        for i, (lo, hi) in enumerate(slices):
+            x_seg = x_sorted.iloc[lo:hi]
+            if binning_spec is not None:
+                binned = binning_spec.transform_feature(feature, x_seg)
+            else:
+                y_seg = pd.Series(y_sorted[lo:hi]) if binning_method == "tree" else None
+                binned = bin_feature_codes(x_seg, y_seg, **bin_kwargs)
+            flat[lo:hi] = binned.codes.astype(np.int64) + offsets[-1]
+            seg_labels[i].append(binned.labels)
+            offsets.append(offsets[-1] + binned.n_codes)
+
+        counts = np.bincount(flat[in_segments], minlength=offsets[-1])
+        bads = np.bincount(flat[in_segments], weights=y_in_segments, minlength=offsets[-1])
+        for i in range(len(slices)):
+            seg_counts[i].append(counts[offsets[i]:offsets[i + 1]])
+            seg_bads[i].append(bads[offsets[i]:offsets[i + 1]])
+
+        if include_all:
+            if binning_spec is not None:
+                all_binned.append(binning_spec.transform_feature(feature, x_full))
+            else:
+                y_all = pd.Series(y_full) if binning_method == "tree" else None
+                all_binned.append(bin_feature_codes(x_full, y_all, **bin_kwargs))
+
+    results: Dict[Any, Dict[str, Any]] = {}
+    for i, seg in enumerate(segments):
+        table = _counts_to_table(
+            feature_cols,
+            seg_labels[i],
+            np.concatenate(seg_counts[i]),
+            np.concatenate(seg_bads[i]),
         )
+        results[seg] = iv_from_bin_counts(table, return_type=return_type, discrimination=discrimination)
+    if include_all:
+        table = _count_codes(feature_cols, all_binned, y_full)
+        results[all_label] = iv_from_bin_counts(table, return_type=return_type, discrimination=discrimination)
+    return results
 
-    #  add good counts
-    summary_table["goods"] = summary_table["count"] - summary_table["bads"]
 
-    #  percentage of total goods/bads per bin
-    summary_table["pct_goods"] = summary_table["goods"] / total_goods
-    summary_table["pct_bads"] = summary_table["bads"] / total_bads
+def _cell_bin_counts(
+    cell_codes: np.ndarray,
+    n_cells: int,
+    binned: List[BinResult],
+    y_arr: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """(cells x flat (feature, bin)) row and bad counts, one bincount per feature.
 
-    # avoid zero proportion for log
-    eps = 1e-6
-    summary_table["pct_goods"] = summary_table["pct_goods"].clip(lower=eps)
-    summary_table["pct_bads"] = summary_table["pct_bads"].clip(lower=eps)
+    ``cell_codes`` gives each row's cell in ``0..n_cells-1``; rows with a
+    negative code are ignored. Like ``_bincount_codes`` the result is
+    additive across chunks.
+    """
+    sizes = np.array([b.n_codes for b in binned], dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum(sizes)])
+    counts = np.zeros((n_cells, offsets[-1]), dtype=np.int64)
+    bads = np.zeros((n_cells, offsets[-1]), dtype=np.float64)
 
-    #  within-feature statistics
-    summary_table["count_pct"] = (
-        summary_table["count"] /
-        summary_table.groupby(level=0)["count"].transform("sum")
-    )
-    summary_table["bad_rate"] = summary_table["bads"] / summary_table["count"]
+    keep = cell_codes >= 0
+    cells = cell_codes[keep].astype(np.int64)
+    y_keep = y_arr[keep]
+    for i, b in enumerate(binned):
+        lo, hi, k = offsets[i], offsets[i + 1], sizes[i]
+        flat = cells * k + b.codes[keep]
+        counts[:, lo:hi] = np.bincount(flat, minlength=n_cells * k).reshape(n_cells, k)
+        bads[:, lo:hi] = np.bincount(flat, weights=y_keep, minlength=n_cells * k).reshape(n_cells, k)
+    return counts, bads
 
-    # WoE & IV
-    summary_table["woe"] = np.log(summary_table["pct_goods"] / summary_table["pct_bads"])
-    summary_table["iv"] = (
-        (summary_table["pct_goods"] - summary_table["pct_bads"])
-        * summary_table["woe"]
-    )
 
-    #  per-feature IV (overall)
-    iv_per_feature = (
-        summary_table
-        .groupby(level=0)["iv"]
-        .sum()
-        .sort_values(ascending=False)
-    )
+def period_iv_from_counts(
+    cells: pd.DataFrame,
+    feature_cols: List[str],
+    sizes: List[int],
+    counts: np.ndarray,
+    bads: np.ndarray,
+) -> pd.DataFrame:
+    """
+    Tidy IV table from (cells x flat (feature, bin)) count matrices.
 
-    result: Dict[str, Any] = {}
+    ``cells`` has one row per count row (e.g. Period / Segment columns);
+    the result repeats them per feature and adds count, bads, bad_rate and
+    IV. Rows follow the cell order, features in ``feature_cols`` order
+    within each cell; empty cells are dropped and cells without goods or
+    without bads get a NaN IV.
+    """
+    offsets = np.concatenate([[0], np.cumsum(sizes)])
+    cells = cells.reset_index(drop=True)
+    frames = []
+    for i, feature in enumerate(feature_cols):
+        c = counts[:, offsets[i]:offsets[i + 1]].astype(np.float64)
+        b = bads[:, offsets[i]:offsets[i + 1]]
+        total, total_bads = c.sum(axis=1), b.sum(axis=1)
+        iv = _iv_of_counts(c - b, b)
+        iv[(total_bads == 0) | (total_bads == total)] = np.nan
+        frame = cells.copy()
+        frame["Feature"] = feature
+        frame["count"] = total.astype(np.int64)
+        frame["bads"] = total_bads.astype(np.int64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            frame["bad_rate"] = total_bads / total
+        frame["IV"] = iv
+        frames.append(frame)
 
-    if return_type in ("bin", "both"):
-        result["per_bin"] = summary_table
+    # cell-major, feature-minor
+    table = pd.concat(frames, keys=range(len(feature_cols))).swaplevel().sort_index(level=0, sort_remaining=True)
+    table = table[table["count"] > 0]
+    return table.reset_index(drop=True)
 
-    if return_type in ("feature", "both"):
-        result["per_feature"] = iv_per_feature
 
-    return result
+def calculate_iv_by_period(
+    df: pd.DataFrame,
+    label_col: str,
+    time_col: str,
+    segment_col: Optional[str] = None,
+    segments: Optional[List[Any]] = None,
+    feature_cols: Optional[List[str]] = None,
+    binning_method: str = "quantile",   # 'quantile' | 'width' | 'tree'
+    n_bins: int = 10,
+    min_leaf_frac: float = 0.05,
+    positive_label: Any = 1,
+    binning_spec: Optional[BinningSpec] = None,
+    include_all: bool = False,
+    all_label: str = ALL_SEGMENT,
+    tree_engine: str = "histogram",     # 'histogram' | 'sklearn'
+    quantile_engine: str = "exact",     # 'exact' | 'sketch'
+    max_categories: Optional[int] = MAX_CATEGORIES,
+    min_category_frac: float = 0.0,
+) -> pd.DataFrame:
+    """
+    IV and bad rate per (period, segment, feature) in one aggregation pass.
+
+    Bins are fixed: ``binning_spec`` if given, otherwise fitted once on the
+    whole frame (development bins), so the IV trend is not blurred by
+    re-binning each vintage. Period and segment are factorized into one cell
+    code and every feature needs a single ``np.bincount`` over the flat
+    (cell, bin) index.
+
+    Parameters
+    ----------
+    time_col : str
+        Period column (e.g. observation month); rows with a missing period
+        are ignored.
+    segment_col : str, optional
+        Segment column; without it every row belongs to ``all_label``.
+    segments : list, optional
+        Segments to report (default: every non-null value, sorted).
+    include_all : bool
+        Also report an ``all_label`` segment over all rows of each period.
+    Other parameters are as in ``calculate_iv``.
+
+    Returns
+    -------
+    pd.DataFrame
+        Long table with columns ['Period', 'Segment', 'Feature', 'count',
+        'bads', 'bad_rate', 'IV'], sorted by period, segment and feature
+        order; cells without rows are omitted.
+    """
+    df = _as_frame(df)
+    for col in (label_col, time_col, segment_col):
+        if col is not None and col not in df.columns:
+            raise ValueError(f"Column '{col}' not found in DataFrame.")
+    if feature_cols is None:
+        if binning_spec is not None:
+            feature_cols = binning_spec.features
+        else:
+            feature_cols = [c for c in df.columns if c not in (label_col, time_col, segment_col)]
+    feature_cols = list(feature_cols)
+    if not feature_cols:
+        raise ValueError("No features to calculate IV.")
+
+    if binning_spec is None:
+        binning_spec = BinningSpec.fit(
+            df, feature_cols, label_col,
+            method=binning_method,
+            n_bins=n_bins,
+            min_leaf_frac=min_leaf_frac,
+            positive_label=positive_label,
+            tree_engine=tree_engine,
+            quantile_engine=quantile_engine,
+            max_categories=max_categories,
+            min_category_frac=min_category_frac,
+        )
+    binned = [binning_spec.transform_feature(f, df[f]) for f in feature_cols]
+    sizes = [b.n_codes for b in binned]
+    y_arr = (df[label_col] == positive_label).to_numpy(dtype=np.float64)
+    period_codes, periods = pd.factorize(df[time_col], sort=True)
+
+    count_blocks, bad_blocks, cell_blocks, cell_keys = [], [], [], []
+    n_seg = 0
+    if segment_col is not None:
+        seg_codes, seg_values = pd.factorize(df[segment_col], sort=True)
+        if segments is None:
+            segments = sorted(seg_values)
+        # map factorized codes onto the requested segments (others dropped)
+        lookup = {v: i for i, v in enumerate(segments)}
+        seg_map = np.array([lookup.get(v, -1) for v in seg_values] + [-1], dtype=np.int64)
+        seg_codes = seg_map[seg_codes]
+        n_seg = len(segments)
+        cell_codes = np.where((period_codes >= 0) & (seg_codes >= 0), period_codes * n_seg + seg_codes, -1)
+        counts, bads = _cell_bin_counts(cell_codes, len(periods) * n_seg, binned, y_arr)
+        count_blocks.append(counts)
+        bad_blocks.append(bads)
+        cell_blocks.append(pd.DataFrame({
+            "Period": np.repeat(np.asarray(periods, dtype=object), n_seg),
+            "Segment": np.tile(np.asarray(segments, dtype=object), len(periods)),
+        }))
+        cell_keys.append(np.add.outer(np.arange(len(periods)) * (n_seg + 1), np.arange(n_seg)).ravel())
+    if segment_col is None or include_all:
+        counts, bads = _cell_bin_counts(period_codes, len(periods), binned, y_arr)
+        count_blocks.append(counts)
+        bad_blocks.append(bads)
+        cell_blocks.append(pd.DataFrame({
+            "Period": np.asarray(periods, dtype=object),
+            "Segment": all_label,
+        }))
+        cell_keys.append(np.arange(len(periods)) * (n_seg + 1) + n_seg)
+
+    # period-major, with the ALL cell after the segments of its period
+    order = np.argsort(np.concatenate(cell_keys), kind="stable")
+    cells = pd.concat(cell_blocks, ignore_index=True).iloc[order]
+    return period_iv_from_counts(
+        cells, feature_cols, sizes, np.vstack(count_blocks)[order], np.vstack(bad_blocks)[order]
+    )
 
 
-# ============== 3. Glue: connect inputs -> outputs ==============
+# ============== 4. Glue: connect inputs -> outputs ==============
 # - inputs["data"] : list[dict] 形式的表格数据（每行一个 dict ）
-# - inputs["label_col"] : str
+# - inputs["label_col"] : str（或 list[str]：多个标签共用分箱）
 # - 可选：inputs["feature_cols"] : list[str]
 # - 可选：inputs["binning_method"], inputs["n_bins"], inputs["positive_label"], 
-#         inputs["return_type"]  
+#         inputs["return_type"], inputs["engine"], inputs["n_jobs"],
+#         inputs["discrimination"], inputs["merge_method"], inputs["n_bootstrap"],
+#         inputs["optimize_memory"], inputs["weight_col"]
 
 def process_inputs_and_calculate_iv(inputs: dict) -> dict:
     """
@@ -272,8 +2545,9 @@ def process_inputs_and_calculate_iv(inputs: dict) -> dict:
 
     # 1) build DataFrame from inputs["data"]
     data_obj = inputs.get("data")
-    if isinstance(data_obj, pd.DataFrame):
-        df = data_obj.copy()
+    if isinstance(data_obj, pd.DataFrame) or _is_arrow(data_obj):
+        # read-only below: no defensive copy (Arrow data stays in Arrow)
+        df = data_obj
     else:
         # assume list of dicts
         df = pd.DataFrame(data_obj)
@@ -285,6 +2559,19 @@ def process_inputs_and_calculate_iv(inputs: dict) -> dict:
     min_leaf_frac = float(inputs.get("min_leaf_frac", 0.05))
     positive_label = inputs.get("positive_label", 1)
     return_type = inputs.get("return_type", "both")  # 'bin' | 'feature' | 'both'
+    engine = inputs.get("engine", "groupby")  # 'groupby' | 'vectorized'
+    n_jobs = int(inputs.get("n_jobs", 1))
+    discrimination = bool(inputs.get("discrimination", False))
+    merge_method = inputs.get("merge_method")  # None | 'chimerge' | 'monotonic'
+    n_bootstrap = int(inputs.get("n_bootstrap", 0))
+    weight_col = inputs.get("weight_col")  # None | sampling / exposure weight column
+
+    if inputs.get("optimize_memory", False) and isinstance(df, pd.DataFrame):
+        # narrow dtypes; every label column becomes a 0/1 mask of its positive value
+        df, outputs["memory"] = optimize_dtypes(
+            df, label_col, positive_label, exclude=[weight_col] if weight_col else None
+        )
+        positive_label = 1
 
     iv_result = calculate_iv(
         df=df,
@@ -295,12 +2582,18 @@ def process_inputs_and_calculate_iv(inputs: dict) -> dict:
         min_leaf_frac=min_leaf_frac,
         positive_label=positive_label,
         return_type=return_type,
+        engine=engine,
+        n_jobs=n_jobs,
+        discrimination=discrimination,
+        merge_method=merge_method,
+        n_bootstrap=n_bootstrap,
+        weight_col=weight_col,
     )
 
     # 将结果转成 JSON 友好的格式（list[dict]）
     if "per_feature" in iv_result:
-        per_feature_iv = iv_result["per_feature"].reset_index()
-        per_feature_iv.columns = ["Feature", "IV"]
+        # index Feature (or Label, Feature for several labels)
+        per_feature_iv = iv_result["per_feature"].rename("IV").reset_index()
         outputs["per_feature_iv"] = per_feature_iv.to_dict(orient="records")
 
     if "per_bin" in iv_result:
@@ -308,6 +2601,15 @@ def process_inputs_and_calculate_iv(inputs: dict) -> dict:
         # index (Feature, Bin) -> columns Feature, Bin
         outputs["per_bin_iv"] = per_bin_iv.to_dict(orient="records")
 
+    if "discrimination" in iv_result:
+        outputs["discrimination"] = iv_result["discrimination"].reset_index().to_dict(orient="records")
+
+    if "iv_ci" in iv_result:
+        outputs["iv_ci"] = iv_result["iv_ci"].reset_index().to_dict(orient="records")
+
+    if "binning_spec" in iv_result:
+        outputs["binning_spec"] = iv_result["binning_spec"].to_dict()
+
     return outputs
 
 
@@ -371,6 +2673,34 @@ def calculate_iv_tool(
         "per_feature": iv_result["per_feature"].to_dict() if "per_feature" in iv_result else None
     }
 
+@tool
+def calculate_iv_grid_tool(
+    df: dict,
+    label_col: str,
+    configs: List[Dict[str, Any]],
+    feature_cols: Optional[List[str]] = None,
+    positive_label: Any = 1,
+) -> dict:
+    """
+    Compare IV under several binning configurations in one pass.
+
+    Args:
+        df (dict): The dataset containing features and labels, converted to a dictionary.
+        label_col (str): The name of the label column.
+        configs (List[dict]): Binning configurations, e.g.
+            [{"method": "quantile", "n_bins": 5}, {"method": "width", "n_bins": 10},
+             {"method": "tree", "n_bins": 6, "min_leaf_frac": 0.05}]
+            (optional "name"; default "<method>_<n_bins>").
+        feature_cols (Optional[List[str]]): List of feature columns to evaluate.
+        positive_label (Any): The label value considered as positive.
+
+    Returns:
+        dict: {"grid": list of {"Config", "Feature", "IV", "n_bins"} records}.
+    """
+    df = pd.DataFrame.from_dict(df)
+    grid = calculate_iv_grid(df, label_col, configs, feature_cols, positive_label)
+    return {"grid": grid.reset_index().to_dict(orient="records")}
+
 @tool
 def process_inputs_and_calculate_iv_tool(inputs: dict) -> dict:
     """
@@ -382,19 +2712,31 @@ def process_inputs_and_calculate_iv_tool(inputs: dict) -> dict:
 
     Args:
         inputs (dict):
-            - "data" (list[dict] or pd.DataFrame): The dataset containing features and labels.
-            - "label_col" (str): The name of the label column.
+            - "data" (list[dict], pd.DataFrame or pyarrow.Table): The dataset containing features and labels.
+            - "label_col" (str or list[str]): The label column, or several label columns evaluated on shared bins.
             - "feature_cols" (Optional[list[str]]): List of feature columns to calculate IV for.
             - "binning_method" (str): The binning method (e.g., "quantile", "tree").
             - "n_bins" (int): Number of bins to create.
             - "min_leaf_frac" (float): Minimum fraction of samples per bin.
             - "positive_label" (Any): The label value considered as positive.
             - "return_type" (str): The type of IV to return ("per_bin", "per_feature", or "both").
+            - "engine" (str): "groupby" (default) or "vectorized" bincount aggregation.
+            - "n_jobs" (int): Worker processes for feature-parallel IV (-1 = all cores). Scripts calling
+              this with n_jobs > 1 need an `if __name__ == "__main__":` guard, otherwise IV is counted serially.
+            - "discrimination" (bool): Also return KS / AUC / Gini / divergence per feature.
+            - "merge_method" (str): Optional "chimerge" or "monotonic" bin merging.
+            - "n_bootstrap" (int): Bootstrap replicates for IV confidence intervals (0 = off).
+            - "weight_col" (str): Optional sampling / exposure weight column (weighted IV).
+            - "optimize_memory" (bool): Downcast dtypes before binning (reports memory before/after).
 
     Returns:
         dict: A dictionary containing IV results in JSON-friendly format, with keys:
             - "per_feature_iv": List of dictionaries with overall IV per feature.
             - "per_bin_iv": List of dictionaries with IV details per bin.
+            - "discrimination": Per-feature discrimination statistics (if requested).
+            - "iv_ci": Per-feature IV confidence intervals (if n_bootstrap > 0).
+            - "memory": Frame memory in bytes before/after optimization (if optimize_memory).
+            - "binning_spec": Merged bin edges (if merge_method is set).
 
     Example:
         inputs = {
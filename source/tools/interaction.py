@@ -0,0 +1,233 @@
+"""Pairwise interaction IV (2-D binning).
+
+Every feature is binned once into small integer codes. The joint bin of a
+pair is the combined code ``code_i * stride + code_j``; joint row counts
+come from one ``np.bincount`` over all rows, and joint bad counts from one
+over the (pre-gathered) bad rows only. Pairs are spread over a process pool
+that reads the code matrix from shared memory.
+"""
+import multiprocessing
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .data_handling import (
+    MAX_CATEGORIES,
+    BinningSpec,
+    _as_frame,
+    _check_goods_and_bads,
+    _code_dtype,
+    _counts_to_table,
+    _bincount_codes,
+    _iv_of_counts,
+    _resolve_n_jobs,
+    bin_feature_codes,
+    iv_from_bin_counts,
+)
+
+
+def _pair_ivs(codes: np.ndarray, bad_codes: np.ndarray, sizes: np.ndarray, i: int) -> np.ndarray:
+    """Joint IV of feature ``i`` with every feature ``j > i``."""
+    stride = int(sizes.max())
+    n_cells = int(sizes[i]) * stride
+    base = codes[i].astype(np.int64) * stride
+    bad_base = bad_codes[i].astype(np.int64) * stride
+
+    ivs = np.empty(len(codes) - i - 1)
+    for k, j in enumerate(range(i + 1, len(codes))):
+        counts = np.bincount(base + codes[j], minlength=n_cells)
+        bads = np.bincount(bad_base + bad_codes[j], minlength=n_cells)
+        ivs[k] = _iv_of_counts((counts - bads)[None, :].astype(np.float64), bads[None, :].astype(np.float64))[0]
+    return ivs
+
+
+def _interaction_block(task: Dict[str, Any]) -> List[np.ndarray]:
+    """Worker: joint IVs of a block of rows ``i`` read from shared memory."""
+    codes_shm = shared_memory.SharedMemory(name=task["codes_name"])
+    bad_shm = shared_memory.SharedMemory(name=task["bad_name"])
+    try:
+        n_features, n_rows, n_bad = task["n_features"], task["n_rows"], task["n_bad"]
+        codes = np.ndarray((n_features, n_rows), dtype=task["dtype"], buffer=codes_shm.buf)
+        bad_codes = np.ndarray((n_features, n_bad), dtype=task["dtype"], buffer=bad_shm.buf)
+        out = [_pair_ivs(codes, bad_codes, task["sizes"], i) for i in task["rows"]]
+        # drop every view on the shared buffers before closing them
+        del codes, bad_codes
+        return out
+    finally:
+        codes_shm.close()
+        bad_shm.close()
+
+
+def _pair_ivs_parallel(
+    codes: np.ndarray,
+    bad_codes: np.ndarray,
+    sizes: np.ndarray,
+    n_jobs: int,
+) -> List[np.ndarray]:
+    """``_pair_ivs`` for every row ``i`` over a process pool (code matrices in shared memory).
+
+    Falls back to serial with a RuntimeWarning when the pool breaks (e.g. a
+    calling script without an ``if __name__ == "__main__":`` guard).
+    """
+    n_features = len(codes)
+    # round-robin rows so every block gets a similar number of pairs
+    n_blocks = min(n_features - 1, n_jobs * 4)
+    blocks = [list(range(b, n_features - 1, n_blocks)) for b in range(n_blocks)]
+
+    codes_shm = shared_memory.SharedMemory(create=True, size=max(codes.nbytes, 1))
+    bad_shm = shared_memory.SharedMemory(create=True, size=max(bad_codes.nbytes, 1))
+    try:
+        np.ndarray(codes.shape, dtype=codes.dtype, buffer=codes_shm.buf)[:] = codes
+        np.ndarray(bad_codes.shape, dtype=bad_codes.dtype, buffer=bad_shm.buf)[:] = bad_codes
+        task = {
+            "codes_name": codes_shm.name,
+            "bad_name": bad_shm.name,
+            "n_features": n_features,
+            "n_rows": codes.shape[1],
+            "n_bad": bad_codes.shape[1],
+            "dtype": codes.dtype,
+            "sizes": sizes,
+        }
+        # forkserver: forking a multi-threaded parent (BLAS, pyarrow) can deadlock
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload([__name__])
+        with ProcessPoolExecutor(max_workers=n_jobs, mp_context=context) as pool:
+            results = list(pool.map(_interaction_block, [dict(task, rows=rows) for rows in blocks]))
+    except BrokenProcessPool:
+        results = None
+    finally:
+        codes_shm.close()
+        codes_shm.unlink()
+        bad_shm.close()
+        bad_shm.unlink()
+
+    if results is None:
+        warnings.warn(
+            "Worker processes for n_jobs > 1 could not start (is the calling script "
+            "missing an `if __name__ == \"__main__\":` guard?); computing pairs serially.",
+            RuntimeWarning,
+        )
+        return [_pair_ivs(codes, bad_codes, sizes, i) for i in range(n_features - 1)]
+
+    rows: List[Optional[np.ndarray]] = [None] * (n_features - 1)
+    for block, block_ivs in zip(blocks, results):
+        for i, ivs in zip(block, block_ivs):
+            rows[i] = ivs
+    return rows
+
+
+def calculate_interaction_iv(
+    df: pd.DataFrame,
+    label_col: str,
+    feature_cols: Optional[List[str]] = None,
+    top_k: Optional[int] = 20,
+    positive_label: Any = 1,
+    binning_method: str = "quantile",
+    n_bins: int = 5,
+    binning_spec: Optional[BinningSpec] = None,
+    n_jobs: Optional[int] = 1,
+    max_categories: Optional[int] = MAX_CATEGORIES,
+    min_category_frac: float = 0.0,
+) -> pd.DataFrame:
+    """
+    Joint (2-D) IV of every pair among the ``top_k`` features by IV.
+
+    Parameters
+    ----------
+    df : pd.DataFrame or pyarrow.Table
+        Input data with label and feature columns.
+    label_col : str
+        Name of the label column.
+    feature_cols : list of str, optional
+        Candidate features (default: all columns except label_col, or the
+        spec's features).
+    top_k : int, optional
+        Number of features (highest univariate IV) whose pairs are evaluated;
+        None evaluates all pairs.
+    positive_label : Any
+        The value in label_col that represents the "bad" class.
+    binning_method, n_bins :
+        1-D binning of every feature (as in ``calculate_iv``); the joint bins
+        are the cross product, so a small ``n_bins`` keeps cells populated.
+    binning_spec : BinningSpec, optional
+        Prefit bins used instead of ``binning_method`` / ``n_bins``.
+    n_jobs : int, optional
+        Worker processes over pairs (-1 = all cores). Calling scripts need an
+        ``if __name__ == "__main__":`` guard, otherwise pairs run serially.
+    max_categories, min_category_frac :
+        Level folding of categorical features.
+
+    Returns
+    -------
+    pd.DataFrame
+        Index (Feature_1, Feature_2) with Feature_1 the higher-IV feature;
+        columns ['IV_1', 'IV_2', 'IV_joint', 'IV_gain'], where
+        IV_gain = IV_joint - max(IV_1, IV_2), sorted by IV_gain descending.
+    """
+    df = _as_frame(df)
+    if label_col not in df.columns:
+        raise ValueError(f"Label column '{label_col}' not found in DataFrame.")
+    if feature_cols is None:
+        feature_cols = binning_spec.features if binning_spec is not None else [c for c in df.columns if c != label_col]
+    for feature in feature_cols:
+        if feature not in df.columns:
+            raise ValueError(f"Feature column '{feature}' not found in DataFrame.")
+    if len(feature_cols) < 2:
+        raise ValueError("At least two features are needed for interaction IV.")
+
+    y = (df[label_col] == positive_label).to_numpy(dtype=np.float64)
+    _check_goods_and_bads(int(y.sum()), len(y))
+
+    if binning_spec is not None:
+        binned = [binning_spec.transform_feature(f, df[f]) for f in feature_cols]
+    else:
+        y_tree = pd.Series(y) if binning_method == "tree" else None
+        binned = [
+            bin_feature_codes(
+                df[f], y_tree, binning_method, n_bins,
+                max_categories=max_categories, min_category_frac=min_category_frac,
+            )
+            for f in feature_cols
+        ]
+
+    # univariate IV from the same codes picks the top-K features
+    counts, bads = _bincount_codes(binned, y)
+    iv = iv_from_bin_counts(
+        _counts_to_table(feature_cols, [b.labels for b in binned], counts, bads), return_type="feature"
+    )["per_feature"]
+    top = list(iv.index[:top_k]) if top_k is not None else list(iv.index)
+    position = {f: i for i, f in enumerate(feature_cols)}
+    sizes = np.array([binned[position[f]].n_codes for f in top], dtype=np.int64)
+
+    dtype = _code_dtype(int(sizes.max()))
+    codes = np.empty((len(top), len(y)), dtype=dtype)
+    for i, feature in enumerate(top):
+        codes[i] = binned[position[feature]].codes
+    bad_codes = codes[:, np.flatnonzero(y)]
+
+    n_jobs = _resolve_n_jobs(n_jobs)
+    if n_jobs > 1 and len(top) > 2:
+        rows = _pair_ivs_parallel(codes, bad_codes, sizes, n_jobs)
+    else:
+        rows = [_pair_ivs(codes, bad_codes, sizes, i) for i in range(len(top) - 1)]
+
+    first, second = np.triu_indices(len(top), k=1)
+    top_arr = np.asarray(top, dtype=object)
+    iv_1 = iv.loc[top_arr[first]].to_numpy()
+    iv_2 = iv.loc[top_arr[second]].to_numpy()
+    joint = np.concatenate(rows) if rows else np.empty(0)
+    table = pd.DataFrame(
+        {
+            "IV_1": iv_1,
+            "IV_2": iv_2,
+            "IV_joint": joint,
+            "IV_gain": joint - np.maximum(iv_1, iv_2),
+        },
+        index=pd.MultiIndex.from_arrays([top_arr[first], top_arr[second]], names=["Feature_1", "Feature_2"]),
+    )
+    return table.sort_values("IV_gain", ascending=False)
@@ -0,0 +1,177 @@
+"""Appendable IV state.
+
+An ``IVAccumulator`` keeps the raw good/bad counts per (segment, feature,
+bin) for one fixed ``BinningSpec``. New data is absorbed with ``update``,
+states built on disjoint data are combined with ``merge``, and IV, WoE and
+bad rate are derived on demand from the stored counts, so a monthly refresh
+only has to read the new month.
+"""
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .data_handling import (
+    ALL_SEGMENT,
+    BinningSpec,
+    _bincount_codes,
+    _cell_bin_counts,
+    _check_goods_and_bads,
+    _counts_to_table,
+    iv_from_bin_counts,
+)
+
+
+def _spec_key(binning_spec: BinningSpec) -> str:
+    """Stable fingerprint of a spec (states are only mergeable under the same bins)."""
+    payload = json.dumps(binning_spec.to_dict(), sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class IVAccumulator:
+    """
+    Mergeable per-bin good/bad counts under fixed bins.
+
+    Parameters
+    ----------
+    binning_spec : BinningSpec
+        Development bins every update is coded with.
+    feature_cols : list of str, optional
+        Features to track (default: all features of the spec).
+    positive_label : Any
+        Label value counted as bad.
+
+    Counts are stored per segment as flat (feature, bin) arrays laid out as
+    in ``_bincount_codes``; ``update`` costs one bincount per feature of the
+    new rows only.
+    """
+
+    def __init__(
+        self,
+        binning_spec: BinningSpec,
+        feature_cols: Optional[List[str]] = None,
+        positive_label: Any = 1,
+    ):
+        self.binning_spec = binning_spec
+        self.feature_cols = list(binning_spec.features if feature_cols is None else feature_cols)
+        for feature in self.feature_cols:
+            if feature not in binning_spec.edges:
+                raise ValueError(f"Feature '{feature}' is not part of the binning spec.")
+        self.positive_label = positive_label
+        self.spec_key = _spec_key(binning_spec)
+        self._state: Dict[Any, Tuple[np.ndarray, np.ndarray]] = {}
+
+    @property
+    def segments(self) -> List[Any]:
+        return list(self._state)
+
+    def _add(self, segment: Any, counts: np.ndarray, bads: np.ndarray) -> None:
+        counts, bads = counts.astype(np.int64), bads.astype(np.int64)
+        if segment in self._state:
+            self._state[segment][0][:] += counts
+            self._state[segment][1][:] += bads
+        else:
+            self._state[segment] = (counts, bads)
+
+    def update(
+        self,
+        df: pd.DataFrame,
+        label_col: str,
+        segment_col: Optional[str] = None,
+        segments: Optional[Sequence[Any]] = None,
+        include_all: bool = False,
+    ) -> "IVAccumulator":
+        """Add the counts of ``df`` (per ``segment_col`` value, or all rows as 'ALL')."""
+        if label_col not in df.columns:
+            raise ValueError(f"Label column '{label_col}' not found in DataFrame.")
+        y = (df[label_col] == self.positive_label).to_numpy(dtype=np.float64)
+
+        binned = [self.binning_spec.transform_feature(f, df[f]) for f in self.feature_cols]
+        if segment_col is None or include_all:
+            self._add(ALL_SEGMENT, *_bincount_codes(binned, y))
+        if segment_col is None:
+            return self
+
+        if segment_col not in df.columns:
+            raise ValueError(f"Segment column '{segment_col}' not found in DataFrame.")
+        seg_codes, values = pd.factorize(df[segment_col])
+        if segments is not None:
+            # rows of segments that are not requested get code -1
+            wanted = set(segments)
+            keep = np.array([v in wanted for v in values] + [False])
+            seg_codes = np.where(keep[seg_codes], seg_codes, -1)
+        # all segments of the update from one bincount per feature
+        counts, bads = _cell_bin_counts(seg_codes, len(values), binned, y)
+        for i, seg in enumerate(values):
+            if counts[i].any():
+                self._add(seg, counts[i], bads[i])
+        return self
+
+    def merge(self, other: "IVAccumulator") -> "IVAccumulator":
+        """Absorb ``other`` (same bins and features, disjoint data) into this state."""
+        if other.spec_key != self.spec_key or other.feature_cols != self.feature_cols:
+            raise ValueError("Cannot merge IV states built with different binning specs or features.")
+        for seg, (counts, bads) in other._state.items():
+            self._add(seg, counts, bads)
+        return self
+
+    def bin_counts(self, segment: Any = ALL_SEGMENT) -> pd.DataFrame:
+        """(Feature, Bin) table of ``count`` and ``bads`` for one segment."""
+        if segment not in self._state:
+            raise ValueError(f"Segment '{segment}' has no accumulated data.")
+        counts, bads = self._state[segment]
+        labels = [self.binning_spec.labels[f] for f in self.feature_cols]
+        return _counts_to_table(self.feature_cols, labels, counts, bads)
+
+    def result(self, segment: Any = ALL_SEGMENT, return_type: str = "both") -> Dict[str, Any]:
+        """``calculate_iv``-style result (IV, WoE, bad rate) from the stored counts."""
+        table = self.bin_counts(segment)
+        n_first = len(self.binning_spec.labels[self.feature_cols[0]])
+        counts, bads = self._state[segment]
+        _check_goods_and_bads(int(bads[:n_first].sum()), int(counts[:n_first].sum()))
+        return iv_from_bin_counts(table, return_type=return_type)
+
+    # ---------- persistence ----------
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "spec_key": self.spec_key,
+            "binning_spec": self.binning_spec.to_dict(),
+            "feature_cols": self.feature_cols,
+            "positive_label": self.positive_label,
+            "segments": [
+                {"segment": seg, "counts": counts.tolist(), "bads": bads.tolist()}
+                for seg, (counts, bads) in self._state.items()
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "IVAccumulator":
+        state = cls(
+            BinningSpec.from_dict(payload["binning_spec"]),
+            feature_cols=payload["feature_cols"],
+            positive_label=payload.get("positive_label", 1),
+        )
+        for entry in payload["segments"]:
+            state._state[entry["segment"]] = (
+                np.asarray(entry["counts"], dtype=np.int64),
+                np.asarray(entry["bads"], dtype=np.int64),
+            )
+        return state
+
+    def save(self, path: Path) -> Path:
+        """Write the state as JSON."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), default=str), encoding="utf-8")
+        return path
+
+    @classmethod
+    def load(cls, path: Path) -> "IVAccumulator":
+        """Read a state written by ``save``."""
+        path = Path(path)
+        if not path.exists():
+            raise FileNotFoundError(f"IV state not found: {path}")
+        return cls.from_dict(json.loads(path.read_text(encoding="utf-8")))
@@ -1,29 +1,263 @@
 """Information Value (IV) runner utilities.
 
 Provides helpers to:
-- load CSV/Parquet
+- load CSV/Parquet with column projection and segment filter pushdown
 - compute IV per segment using existing calculate_iv
+- compute IV per (period, segment) with fixed bins as a long table
+- append new data to a persisted IV state (see ``IVAccumulator``)
+- stream large Parquet files by record batch with mergeable bin counts
 - write per-feature IV tables to output directory
 - expose LangChain tools for agent use
 """
 import json
 from pathlib import Path
-from typing import Iterable, List, Optional, Sequence, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
+import numpy as np
 import pandas as pd
 from langchain.tools import tool
 
-from .data_handling import calculate_iv
+from .data_handling import (
+    ALL_SEGMENT,
+    MAX_CATEGORIES,
+    MISSING_LABEL,
+    OTHER_LABEL,
+    BinningSpec,
+    _bincount_codes,
+    _as_frame,
+    _check_goods_and_bads,
+    _counts_to_table,
+    _edge_labels,
+    _fold_levels,
+    _is_arrow,
+    _is_categorical,
+    _narrow_arrow_schema,
+    _to_float_array,
+    bin_feature_codes,
+    _cell_bin_counts,
+    calculate_iv,
+    calculate_iv_by_period,
+    calculate_iv_by_segment,
+    iv_from_bin_counts,
+    optimize_dtypes,
+    period_iv_from_counts,
+)
+from .iv_accumulator import IVAccumulator, _spec_key
+from .quantile_sketch import DEFAULT_RANK_EPS, KLLSketch
+
+STREAM_BATCH_SIZE = 262_144
+IV_STATE_FILE = "iv_state.json"
 
 
 def _load_dataframe(input_path: Path) -> pd.DataFrame:
     """Load CSV or Parquet into DataFrame."""
+    return load_input(input_path)[0]
+
+
+def _prune_row_groups(
+    parquet_file,
+    segment_col: Optional[str],
+    segments: Optional[Sequence[Any]],
+) -> List[int]:
+    """Row groups whose ``segment_col`` min/max statistics may hold one of ``segments``."""
+    meta = parquet_file.metadata
+    all_groups = list(range(meta.num_row_groups))
+    if segment_col is None or segments is None:
+        return all_groups
+    col_idx = meta.schema.names.index(segment_col)
+
+    keep = []
+    for i in all_groups:
+        stats = meta.row_group(i).column(col_idx).statistics
+        if stats is None or not stats.has_min_max:
+            keep.append(i)
+            continue
+        try:
+            hit = any(stats.min <= seg <= stats.max for seg in segments)
+        except TypeError:
+            # statistics not comparable with the requested values
+            hit = True
+        if hit:
+            keep.append(i)
+    return keep
+
+
+def _column_chunk_bytes(parquet_file, row_groups: Sequence[int], columns: Optional[Sequence[str]]) -> int:
+    """Compressed bytes of the given columns in the given row groups."""
+    meta = parquet_file.metadata
+    wanted = None if columns is None else set(columns)
+    total = 0
+    for i in row_groups:
+        rg = meta.row_group(i)
+        for j in range(rg.num_columns):
+            chunk = rg.column(j)
+            if wanted is None or chunk.path_in_schema in wanted:
+                total += chunk.total_compressed_size
+    return total
+
+
+def _load_arrow(
+    data,
+    columns: Optional[Sequence[str]],
+    segment_col: Optional[str],
+    segments: Optional[Sequence[Any]],
+):
+    """Arrow input for ``load_input``: projection and segment filter without pandas.
+
+    The result is a zero-copy column view (``_ArrowFrame``); only the segment
+    filter, when requested, materializes the kept rows.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    table = data.read_all() if hasattr(data, "read_next_batch") else data
+    bytes_total = table.nbytes
+    rows_total = table.num_rows
+    if columns is not None:
+        table = table.select([c for c in table.column_names if c in set(columns)])
+    bytes_read = table.nbytes
+    if segments is not None and segment_col in table.column_names:
+        column = table[segment_col]
+        if pa.types.is_dictionary(column.type):
+            column = column.cast(column.type.value_type)
+        table = table.filter(pc.is_in(column, value_set=pa.array(list(segments))))
+    stats = {
+        "rows_read": rows_total,
+        "rows_loaded": table.num_rows,
+        "rows_total": rows_total,
+        "bytes_read": bytes_read,
+        "bytes_total": bytes_total,
+        "columns": list(table.column_names),
+    }
+    return _as_frame(table), stats
+
+
+def load_input(
+    input_path: Path,
+    columns: Optional[Sequence[str]] = None,
+    segment_col: Optional[str] = None,
+    segments: Optional[Sequence[Any]] = None,
+    optimize_memory: bool = False,
+    label_col: Optional[str] = None,
+    positive_label=1,
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Load CSV or Parquet, reading only what the caller needs.
+
+    ``columns`` is pushed down as a column projection (unknown names are
+    ignored so callers can report them). ``segments`` keeps only rows whose
+    ``segment_col`` is in that list: for Parquet, row groups are skipped using
+    their min/max statistics and the remaining rows are filtered on the
+    dictionary-encoded segment column before conversion to pandas.
+
+    With ``optimize_memory=True`` the frame gets the dtypes of
+    ``optimize_dtypes``: float32 / narrow integer features, ``category``
+    strings and, if ``label_col`` is given, a uint8 label mask (1 for
+    ``positive_label``). For Parquet the narrowing is an Arrow cast before
+    the pandas conversion (strings are read dictionary-encoded), so the wide
+    frame is never built and ``memory_before`` is the Arrow size as read.
+    The stats hold ``memory_before`` and ``memory_after`` in bytes, and
+    ``label_recoded`` is True when the label column was replaced by that
+    mask (callers then use ``positive_label=1``).
+
+    ``input_path`` may also be a pyarrow Table or RecordBatchReader, which
+    is used in place (see ``_load_arrow``) and never dtype-optimized.
+
+    Returns the DataFrame and a dict of read statistics: rows/bytes read vs
+    total, row groups read vs total, and the projected columns.
+    """
+    if _is_arrow(input_path):
+        return _load_arrow(input_path, columns, segment_col, segments)
+    input_path = Path(input_path)
     if not input_path.exists():
         raise FileNotFoundError(f"Input file not found: {input_path}")
-    if input_path.suffix.lower() == ".csv":
-        return pd.read_csv(input_path)
-    if input_path.suffix.lower() in {".parquet", ".pq"}:
-        return pd.read_parquet(input_path)
+    suffix = input_path.suffix.lower()
+
+    if suffix == ".csv":
+        if columns is not None:
+            wanted = set(columns)
+            df = pd.read_csv(input_path, usecols=lambda c: c in wanted)
+        else:
+            df = pd.read_csv(input_path)
+        rows_read = len(df)
+        if segments is not None and segment_col in df.columns:
+            df = df[df[segment_col].isin(list(segments))]
+        file_size = input_path.stat().st_size
+        stats = {
+            "rows_read": rows_read,
+            "rows_loaded": len(df),
+            "rows_total": rows_read,
+            "bytes_read": file_size,
+            "bytes_total": file_size,
+            "columns": list(df.columns),
+        }
+        if optimize_memory:
+            df, memory = optimize_dtypes(df, label_col, positive_label)
+            stats.update(memory, label_recoded=label_col in df.columns)
+        return df, stats
+
+    if suffix in {".parquet", ".pq"}:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(input_path)
+        names = parquet_file.schema_arrow.names
+        if segment_col not in names:
+            segment_col, segments = None, None
+        dictionary_cols = [segment_col] if segment_col else []
+        if optimize_memory:
+            schema = parquet_file.schema_arrow
+            dictionary_cols += [
+                f.name for f in schema
+                if (pa.types.is_string(f.type) or pa.types.is_large_string(f.type))
+                and f.name not in (segment_col, label_col)
+            ]
+        parquet_file = pq.ParquetFile(input_path, read_dictionary=dictionary_cols or None)
+        if columns is not None:
+            columns = [c for c in names if c in set(columns)]
+
+        row_groups = _prune_row_groups(parquet_file, segment_col, segments)
+        table = parquet_file.read_row_groups(row_groups, columns=columns)
+        rows_read = table.num_rows
+        row_filter = None
+        if segments is not None and segment_col in table.column_names:
+            try:
+                mask = pc.is_in(table[segment_col], value_set=pa.array(list(segments)))
+                table = table.filter(mask)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+                row_filter = segments
+        if optimize_memory:
+            # narrow in Arrow so no float64 / int64 pandas frame is ever built
+            memory_before = table.nbytes
+            table = table.cast(_narrow_arrow_schema(table, exclude=[label_col]))
+            df = table.to_pandas(split_blocks=True, self_destruct=True)
+            del table
+        else:
+            df = table.to_pandas()
+        if row_filter is not None:
+            df = df[df[segment_col].isin(list(row_filter))]
+
+        meta = parquet_file.metadata
+        stats = {
+            "rows_read": rows_read,
+            "rows_loaded": len(df),
+            "rows_total": meta.num_rows,
+            "row_groups_read": len(row_groups),
+            "row_groups_total": meta.num_row_groups,
+            "bytes_read": _column_chunk_bytes(parquet_file, row_groups, columns),
+            "bytes_total": _column_chunk_bytes(parquet_file, range(meta.num_row_groups), None),
+            "columns": list(df.columns),
+        }
+        if optimize_memory:
+            if label_col in df.columns:
+                df[label_col] = (df[label_col] == positive_label).astype(np.uint8)
+            stats.update(
+                memory_before=memory_before,
+                memory_after=int(df.memory_usage(deep=True).sum()),
+                label_recoded=label_col in df.columns,
+            )
+        return df, stats
+
     raise ValueError(f"Unsupported file type: {input_path.suffix}")
 
 
@@ -31,47 +265,744 @@ def _ensure_output_dir(output_dir: Path) -> None:
     output_dir.mkdir(parents=True, exist_ok=True)
 
 
-def run_iv_by_segments(
+def _run_iv_in_memory(
     input_path: Path,
     label_col: str,
     segment_col: str,
+    segments: Optional[Sequence[str]],
+    include_all: bool,
+    feature_cols: Optional[List[str]],
+    binning_method: str,
+    n_bins: int,
+    min_leaf_frac: float,
+    positive_label,
+    binning_spec: Optional[BinningSpec],
+    quantile_engine: str,
+    n_jobs: Optional[int],
+    load_stats: Optional[Dict[str, Any]],
+    optimize_memory: bool = False,
+) -> Dict[str, pd.Series]:
+    """Per-segment IV on a DataFrame loaded with only the needed columns/rows."""
+    if feature_cols is None and binning_spec is not None:
+        feature_cols = binning_spec.features
+    columns = None if feature_cols is None else [label_col, segment_col, *feature_cols]
+    df, stats = load_input(
+        input_path,
+        columns=columns,
+        segment_col=segment_col,
+        # the ALL pseudo-segment needs every row
+        segments=None if include_all else segments,
+        optimize_memory=optimize_memory,
+        label_col=label_col,
+        positive_label=positive_label,
+    )
+    if stats.get("label_recoded"):
+        # the label column is now a 0/1 mask of positive_label
+        positive_label = 1
+    if load_stats is not None:
+        load_stats.update(stats)
+    if segment_col not in df.columns:
+        raise ValueError(f"Segment column '{segment_col}' not found in input data")
+    if feature_cols is None:
+        feature_cols = [c for c in df.columns if c not in (label_col, segment_col)]
+
+    iv_kwargs = dict(
+        label_col=label_col,
+        feature_cols=feature_cols,
+        binning_method=binning_method,
+        n_bins=n_bins,
+        min_leaf_frac=min_leaf_frac,
+        positive_label=positive_label,
+        return_type="feature",
+        binning_spec=binning_spec,
+        quantile_engine=quantile_engine,
+    )
+
+    if n_jobs in (None, 0, 1):
+        # all segments from one factorization and one bincount per feature
+        results = calculate_iv_by_segment(
+            df, segment_col=segment_col, segments=segments, include_all=include_all, **iv_kwargs
+        )
+        return {seg: result["per_feature"] for seg, result in results.items()}
+
+    # feature-parallel: one process-pool run per segment
+    if segments is None:
+        segments = sorted(df[segment_col].dropna().unique())
+    seg_frames = [(seg, df[df[segment_col] == seg]) for seg in segments]
+    if include_all:
+        seg_frames.append((ALL_SEGMENT, df))
+
+    per_segment: Dict[str, pd.Series] = {}
+    for seg, seg_df in seg_frames:
+        if seg_df.empty:
+            # skip empty segment but continue others
+            continue
+        iv_result = calculate_iv(df=seg_df, n_jobs=n_jobs, **iv_kwargs)
+        per_segment[seg] = iv_result["per_feature"]
+    return per_segment
+
+
+def _open_parquet(input_path: Path):
+    """Open a Parquet file for row-group / record-batch access."""
+    import pyarrow.parquet as pq
+
+    if not input_path.exists():
+        raise FileNotFoundError(f"Input file not found: {input_path}")
+    if input_path.suffix.lower() not in {".parquet", ".pq"}:
+        raise ValueError(f"Streaming mode requires a Parquet input, got: {input_path.suffix}")
+    return pq.ParquetFile(input_path)
+
+
+def _discover_segments(parquet_file, segment_col: str) -> List:
+    """Sorted non-null values of ``segment_col`` (reads that column only)."""
+    import pyarrow.compute as pc
+
+    values = pc.unique(parquet_file.read(columns=[segment_col]).column(0)).drop_null()
+    return sorted(values.to_pylist())
+
+
+def _segment_masks(
+    values: pd.Series,
+    segments: Sequence[str],
+    include_all: bool,
+) -> Dict[str, np.ndarray]:
+    """Row mask per present segment from one factorization of ``values``."""
+    codes, uniques = pd.factorize(values)
+    lookup = {v: i for i, v in enumerate(uniques)}
+    masks = {seg: codes == lookup[seg] for seg in segments if seg in lookup}
+    if include_all:
+        masks[ALL_SEGMENT] = np.ones(len(values), dtype=bool)
+    return masks
+
+
+def _fit_segment_specs(
+    parquet_file,
+    label_col: str,
+    segment_col: str,
+    segments: Sequence[str],
+    include_all: bool,
+    feature_cols: List[str],
+    binning_method: str,
+    n_bins: int,
+    min_leaf_frac: float,
+    positive_label,
+) -> Dict[str, BinningSpec]:
+    """Pass 1 of a streaming run: discover per-segment bin edges.
+
+    Exact edges (``pd.qcut`` / tree splits) need every value of a feature,
+    so this pass is not bounded by ``batch_size``: it holds the segment
+    masks, the label (tree binning only) and one full feature column at a
+    time. Segment and label are read once and reused for every feature; use
+    ``quantile_engine='sketch'`` to keep pass 1 within record batches.
+    """
+    edges: Dict[str, Dict[str, np.ndarray]] = {}
+    labels: Dict[str, Dict[str, List[str]]] = {}
+
+    row_groups = _prune_row_groups(parquet_file, segment_col, None if include_all else segments)
+    key_cols = [segment_col, label_col] if binning_method == "tree" else [segment_col]
+    keys = parquet_file.read_row_groups(row_groups, columns=key_cols).to_pandas()
+    masks = _segment_masks(keys[segment_col], segments, include_all)
+    y = (keys[label_col] == positive_label).astype(int) if binning_method == "tree" else None
+    del keys
+
+    for feature in feature_cols:
+        values = parquet_file.read_row_groups(row_groups, columns=[feature]).column(0).to_pandas()
+        for seg, mask in masks.items():
+            binned = bin_feature_codes(
+                values[mask],
+                y[mask] if y is not None else None,
+                binning_method,
+                n_bins,
+                min_leaf_frac,
+            )
+            seg_edges, seg_labels = binned.edges, list(binned.labels)
+            if seg_edges is None:
+                # no numeric edges for this segment: MISSING plus one empty bin
+                seg_edges, bin_labels = _edge_labels(np.empty(0), include_lowest=True)
+                seg_labels = [MISSING_LABEL, *bin_labels]
+            edges.setdefault(seg, {})[feature] = seg_edges
+            labels.setdefault(seg, {})[feature] = seg_labels
+
+    return {
+        seg: BinningSpec(edges[seg], labels[seg], method=binning_method, n_bins=n_bins)
+        for seg in edges
+    }
+
+
+def _sketch_segment_specs(
+    parquet_file,
+    segment_col: str,
     segments: Sequence[str],
+    include_all: bool,
+    feature_cols: List[str],
+    n_bins: int,
+    batch_size: int,
+    sketch_eps: float,
+) -> Dict[str, BinningSpec]:
+    """Pass 1 of a streaming quantile run: one batch pass feeding KLL sketches.
+
+    Non-numeric features get exact level counts instead of a sketch and the
+    same categorical spec as the in-memory path (``bin_categorical_codes``).
+    """
+    sketches: Dict[str, Dict[str, KLLSketch]] = {}
+    level_counts: Dict[str, Dict[str, Dict[str, float]]] = {}
+    row_groups = _prune_row_groups(parquet_file, segment_col, None if include_all else segments)
+
+    for batch in parquet_file.iter_batches(
+        batch_size=batch_size, row_groups=row_groups, columns=[segment_col, *feature_cols]
+    ):
+        chunk = batch.to_pandas()
+        masks = _segment_masks(chunk[segment_col], segments, include_all)
+        for f in feature_cols:
+            if _is_categorical(chunk[f]):
+                for seg, mask in masks.items():
+                    raw_codes, uniques = pd.factorize(chunk[f][mask], sort=False)
+                    freq = np.bincount(raw_codes[raw_codes >= 0], minlength=len(uniques))
+                    counts = level_counts.setdefault(seg, {}).setdefault(f, {})
+                    for level, n in zip(np.asarray(uniques).astype(str), freq):
+                        counts[level] = counts.get(level, 0) + n
+                continue
+            values = _to_float_array(chunk[f])
+            for seg, mask in masks.items():
+                seg_sketches = sketches.setdefault(
+                    seg, {g: KLLSketch(sketch_eps, seed=0) for g in feature_cols}
+                )
+                seg_sketches[f].update(values[mask])
+
+    specs: Dict[str, BinningSpec] = {}
+    for seg in {**sketches, **level_counts}:
+        seg_levels = level_counts.get(seg, {})
+        numeric = BinningSpec.from_sketches(
+            {
+                f: sketch
+                for f, sketch in sketches.get(seg, {}).items()
+                if f not in seg_levels
+            },
+            n_bins=n_bins,
+        )
+        edges: Dict[str, np.ndarray] = {}
+        labels: Dict[str, List[str]] = {}
+        for f in feature_cols:
+            if f in seg_levels:
+                counts = seg_levels[f]
+                levels = _fold_levels(
+                    np.asarray(list(counts), dtype=object),
+                    np.asarray(list(counts.values()), dtype=float),
+                    MAX_CATEGORIES,
+                    0.0,
+                )
+                edges[f] = np.empty(0)
+                labels[f] = [MISSING_LABEL, *levels, OTHER_LABEL]
+            elif f in numeric.edges:
+                edges[f], labels[f] = numeric.edges[f], numeric.labels[f]
+        specs[seg] = BinningSpec(edges, labels, method="quantile", n_bins=n_bins)
+    return specs
+
+
+def _accumulate_segment_counts(
+    parquet_file,
+    specs: Dict[str, BinningSpec],
+    label_col: str,
+    segment_col: str,
+    include_all: bool,
+    feature_cols: List[str],
+    positive_label,
+    batch_size: int,
+    row_groups: List[int],
+) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """Pass 2 of a streaming run: merge (segment, feature, bin) counts per batch."""
+    state: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+    columns = [segment_col, label_col, *feature_cols]
+    segments = [seg for seg in specs if seg != ALL_SEGMENT or not include_all]
+
+    for batch in parquet_file.iter_batches(batch_size=batch_size, row_groups=row_groups, columns=columns):
+        chunk = batch.to_pandas()
+        y = (chunk[label_col] == positive_label).to_numpy(dtype=np.float64)
+        for seg, mask in _segment_masks(chunk[segment_col], segments, include_all).items():
+            spec = specs[seg]
+            seg_chunk = chunk[mask]
+            binned = [spec.transform_feature(f, seg_chunk[f]) for f in feature_cols]
+            counts, bads = _bincount_codes(binned, y[mask])
+            if seg in state:
+                state[seg][0][:] += counts
+                state[seg][1][:] += bads
+            else:
+                state[seg] = (counts, bads)
+    return state
+
+
+def _run_iv_streaming(
+    input_path: Path,
+    label_col: str,
+    segment_col: str,
+    segments: Optional[Sequence[str]],
+    include_all: bool,
+    feature_cols: Optional[List[str]],
+    binning_method: str,
+    n_bins: int,
+    min_leaf_frac: float,
+    positive_label,
+    binning_spec: Optional[BinningSpec],
+    batch_size: int,
+    quantile_engine: str,
+    sketch_eps: float,
+    load_stats: Optional[Dict[str, Any]],
+) -> Dict[str, pd.Series]:
+    """Per-segment IV of a Parquet file without loading it whole."""
+    parquet_file = _open_parquet(input_path)
+    columns = parquet_file.schema_arrow.names
+    if segment_col not in columns:
+        raise ValueError(f"Segment column '{segment_col}' not found in input data")
+    if label_col not in columns:
+        raise ValueError(f"Label column '{label_col}' not found in DataFrame.")
+
+    if feature_cols is None:
+        if binning_spec is not None:
+            feature_cols = binning_spec.features
+        else:
+            feature_cols = [c for c in columns if c not in (label_col, segment_col)]
+    feature_cols = list(feature_cols)
+    for feature in feature_cols:
+        if feature not in columns:
+            raise ValueError(f"Feature column '{feature}' not found in DataFrame.")
+
+    if segments is None:
+        segments = _discover_segments(parquet_file, segment_col)
+    segments = list(segments)
+
+    if binning_spec is not None:
+        specs = {seg: binning_spec for seg in segments}
+        if include_all:
+            specs[ALL_SEGMENT] = binning_spec
+    elif binning_method == "quantile" and quantile_engine == "sketch":
+        specs = _sketch_segment_specs(
+            parquet_file, segment_col, segments, include_all, feature_cols,
+            n_bins, batch_size, sketch_eps,
+        )
+    else:
+        specs = _fit_segment_specs(
+            parquet_file, label_col, segment_col, segments, include_all, feature_cols,
+            binning_method, n_bins, min_leaf_frac, positive_label,
+        )
+
+    columns = [segment_col, label_col, *feature_cols]
+    row_groups = _prune_row_groups(parquet_file, segment_col, None if include_all else segments)
+    state = _accumulate_segment_counts(
+        parquet_file, specs, label_col, segment_col, include_all,
+        feature_cols, positive_label, batch_size, row_groups,
+    )
+    if load_stats is not None:
+        meta = parquet_file.metadata
+        load_stats.update({
+            "rows_read": sum(meta.row_group(i).num_rows for i in row_groups),
+            "rows_total": meta.num_rows,
+            "row_groups_read": len(row_groups),
+            "row_groups_total": meta.num_row_groups,
+            "bytes_read": _column_chunk_bytes(parquet_file, row_groups, columns),
+            "bytes_total": _column_chunk_bytes(parquet_file, range(meta.num_row_groups), None),
+            "columns": columns,
+        })
+    if include_all:
+        segments.append(ALL_SEGMENT)
+
+    per_segment: Dict[str, pd.Series] = {}
+    for seg in segments:
+        if seg not in state:
+            # skip empty segment but continue others
+            continue
+        counts, bads = state[seg]
+        spec = specs[seg]
+        n_first = len(spec.labels[feature_cols[0]])
+        _check_goods_and_bads(int(bads[:n_first].sum()), int(counts[:n_first].sum()))
+        table = _counts_to_table(
+            feature_cols, [spec.labels[f] for f in feature_cols], counts, bads
+        )
+        per_segment[seg] = iv_from_bin_counts(table, return_type="feature")["per_feature"]
+    return per_segment
+
+
+def _run_period_iv_in_memory(
+    input_path: Path,
+    label_col: str,
+    time_col: str,
+    segment_col: str,
+    segments: Optional[Sequence[str]],
+    include_all: bool,
+    feature_cols: Optional[List[str]],
+    binning_method: str,
+    n_bins: int,
+    min_leaf_frac: float,
+    positive_label,
+    binning_spec: Optional[BinningSpec],
+    quantile_engine: str,
+    load_stats: Optional[Dict[str, Any]],
+) -> pd.DataFrame:
+    """(Period, Segment, Feature) IV table on a DataFrame loaded with only the needed columns."""
+    if feature_cols is None and binning_spec is not None:
+        feature_cols = binning_spec.features
+    columns = None if feature_cols is None else [label_col, time_col, segment_col, *feature_cols]
+    df, stats = load_input(
+        input_path,
+        columns=columns,
+        segment_col=segment_col,
+        # without a prefit spec the development bins are fitted on every row
+        segments=None if include_all or binning_spec is None else segments,
+    )
+    if load_stats is not None:
+        load_stats.update(stats)
+    if time_col not in df.columns:
+        raise ValueError(f"Time column '{time_col}' not found in input data")
+    if segment_col not in df.columns:
+        raise ValueError(f"Segment column '{segment_col}' not found in input data")
+
+    return calculate_iv_by_period(
+        df,
+        label_col=label_col,
+        time_col=time_col,
+        segment_col=segment_col,
+        segments=None if segments is None else list(segments),
+        feature_cols=feature_cols,
+        binning_method=binning_method,
+        n_bins=n_bins,
+        min_leaf_frac=min_leaf_frac,
+        positive_label=positive_label,
+        binning_spec=binning_spec,
+        include_all=include_all,
+        quantile_engine=quantile_engine,
+    )
+
+
+def _accumulate_period_counts(
+    parquet_file,
+    spec: BinningSpec,
+    label_col: str,
+    time_col: str,
+    segment_col: str,
+    segments: Sequence[str],
+    include_all: bool,
+    feature_cols: List[str],
+    positive_label,
+    batch_size: int,
+) -> Tuple[pd.DataFrame, np.ndarray, np.ndarray]:
+    """Batch pass summing (period, segment) x (feature, bin) counts.
+
+    Periods are numbered in order of appearance across batches and each
+    batch adds its (local cells x bins) matrix to the rows of the global
+    cells; the ALL segment has its own cells per period.
+    """
+    seg_index = {seg: i for i, seg in enumerate(segments)}
+    n_seg = len(segments) + 1   # last slot: ALL
+    period_ids: Dict[Any, int] = {}
+    counts = bads = None
+    columns = [time_col, segment_col, label_col, *feature_cols]
+
+    for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+        chunk = batch.to_pandas()
+        y = (chunk[label_col] == positive_label).to_numpy(dtype=np.float64)
+        binned = [spec.transform_feature(f, chunk[f]) for f in feature_cols]
+
+        local_periods, periods = pd.factorize(chunk[time_col])
+        for p in periods:
+            period_ids.setdefault(p, len(period_ids))
+        period_map = np.array([period_ids[p] for p in periods] + [-1], dtype=np.int64)
+        global_periods = period_map[local_periods]
+
+        local_segs, seg_values = pd.factorize(chunk[segment_col])
+        seg_map = np.array([seg_index.get(v, -1) for v in seg_values] + [-1], dtype=np.int64)
+        seg_codes = seg_map[local_segs]
+
+        n_cells = len(period_ids) * n_seg
+        cell_codes = np.where((global_periods >= 0) & (seg_codes >= 0), global_periods * n_seg + seg_codes, -1)
+        batch_counts, batch_bads = _cell_bin_counts(cell_codes, n_cells, binned, y)
+        if include_all:
+            all_codes = np.where(global_periods >= 0, global_periods * n_seg + n_seg - 1, -1)
+            all_counts, all_bads = _cell_bin_counts(all_codes, n_cells, binned, y)
+            batch_counts += all_counts
+            batch_bads += all_bads
+
+        if counts is None:
+            counts, bads = batch_counts, batch_bads
+        else:
+            # new periods append cells at the end of the matrix
+            grow = n_cells - len(counts)
+            counts = np.vstack([counts, np.zeros((grow, counts.shape[1]), dtype=counts.dtype)]) + batch_counts
+            bads = np.vstack([bads, np.zeros((grow, bads.shape[1]), dtype=bads.dtype)]) + batch_bads
+
+    sizes = [len(spec.labels[f]) for f in feature_cols]
+    if counts is None:
+        counts = np.zeros((0, sum(sizes)), dtype=np.int64)
+        bads = np.zeros((0, sum(sizes)), dtype=np.float64)
+    # order cells by sorted period, then segment order with ALL last
+    periods = sorted(period_ids)
+    order = np.array([period_ids[p] * n_seg + j for p in periods for j in range(n_seg)], dtype=np.int64)
+    cells = pd.DataFrame({
+        "Period": np.repeat(np.asarray(periods, dtype=object), n_seg),
+        "Segment": np.tile(np.asarray([*segments, ALL_SEGMENT], dtype=object), len(periods)),
+    })
+    return cells, counts[order], bads[order]
+
+
+def _run_period_iv_streaming(
+    input_path: Path,
+    label_col: str,
+    time_col: str,
+    segment_col: str,
+    segments: Optional[Sequence[str]],
+    include_all: bool,
+    feature_cols: Optional[List[str]],
+    binning_method: str,
+    n_bins: int,
+    min_leaf_frac: float,
+    positive_label,
+    binning_spec: Optional[BinningSpec],
+    batch_size: int,
+    quantile_engine: str,
+    sketch_eps: float,
+) -> pd.DataFrame:
+    """(Period, Segment, Feature) IV table of a Parquet file in record batches."""
+    parquet_file = _open_parquet(input_path)
+    columns = parquet_file.schema_arrow.names
+    for col in (label_col, time_col, segment_col):
+        if col not in columns:
+            raise ValueError(f"Column '{col}' not found in input data")
+    if feature_cols is None:
+        if binning_spec is not None:
+            feature_cols = binning_spec.features
+        else:
+            feature_cols = [c for c in columns if c not in (label_col, time_col, segment_col)]
+    feature_cols = list(feature_cols)
+    if segments is None:
+        segments = _discover_segments(parquet_file, segment_col)
+    segments = list(segments)
+
+    if binning_spec is None:
+        # development bins over all rows: the ALL spec of pass 1
+        if binning_method == "quantile" and quantile_engine == "sketch":
+            specs = _sketch_segment_specs(
+                parquet_file, segment_col, [], True, feature_cols, n_bins, batch_size, sketch_eps,
+            )
+        else:
+            specs = _fit_segment_specs(
+                parquet_file, label_col, segment_col, [], True, feature_cols,
+                binning_method, n_bins, min_leaf_frac, positive_label,
+            )
+        binning_spec = specs[ALL_SEGMENT]
+
+    cells, counts, bads = _accumulate_period_counts(
+        parquet_file, binning_spec, label_col, time_col, segment_col, segments,
+        include_all, feature_cols, positive_label, batch_size,
+    )
+    sizes = [len(binning_spec.labels[f]) for f in feature_cols]
+    table = period_iv_from_counts(cells, feature_cols, sizes, counts, bads)
+    if not include_all:
+        table = table[table["Segment"] != ALL_SEGMENT]
+    return table.reset_index(drop=True)
+
+
+def _run_iv_append(
+    input_path: Path,
+    label_col: str,
+    segment_col: str,
+    segments: Optional[Sequence[str]],
+    include_all: bool,
+    feature_cols: Optional[List[str]],
+    binning_method: str,
+    n_bins: int,
+    min_leaf_frac: float,
+    positive_label,
+    binning_spec: Optional[BinningSpec],
+    streaming: bool,
+    batch_size: int,
+    state_path: Path,
+    load_stats: Optional[Dict[str, Any]],
+) -> Dict[str, pd.Series]:
+    """Add ``input_path`` to the IV state at ``state_path`` and report IV from the totals.
+
+    A new state is keyed by ``binning_spec``, or by bins fitted once on the
+    first input; later runs reuse the stored bins and positive label, so only
+    the new rows are read and counted.
+    """
+    state: Optional[IVAccumulator] = None
+    if state_path.exists():
+        state = IVAccumulator.load(state_path)
+        if binning_spec is not None and _spec_key(binning_spec) != state.spec_key:
+            raise ValueError(f"binning_spec differs from the bins of the IV state at {state_path}")
+        if feature_cols is not None and list(feature_cols) != state.feature_cols:
+            raise ValueError(f"feature_cols differ from the features of the IV state at {state_path}")
+        if positive_label != state.positive_label:
+            raise ValueError(
+                f"positive_label {positive_label!r} differs from the label of the IV state at "
+                f"{state_path} ({state.positive_label!r})"
+            )
+        feature_cols = state.feature_cols
+    elif binning_spec is not None:
+        state = IVAccumulator(binning_spec, feature_cols, positive_label=positive_label)
+        feature_cols = state.feature_cols
+
+    if streaming:
+        parquet_file = _open_parquet(input_path)
+        if state is None:
+            # first append: development bins from pass 1 over all rows
+            names = parquet_file.schema_arrow.names
+            if feature_cols is None:
+                feature_cols = [c for c in names if c not in (label_col, segment_col)]
+            spec = _fit_segment_specs(
+                parquet_file, label_col, segment_col, [], True, list(feature_cols),
+                binning_method, n_bins, min_leaf_frac, positive_label,
+            )[ALL_SEGMENT]
+            state = IVAccumulator(spec, feature_cols, positive_label=positive_label)
+        row_groups = _prune_row_groups(parquet_file, segment_col, None if include_all else segments)
+        columns = [segment_col, label_col, *state.feature_cols]
+        for batch in parquet_file.iter_batches(batch_size=batch_size, row_groups=row_groups, columns=columns):
+            state.update(batch.to_pandas(), label_col, segment_col, segments=segments, include_all=include_all)
+    else:
+        columns = None if feature_cols is None else [label_col, segment_col, *feature_cols]
+        df, stats = load_input(
+            input_path,
+            columns=columns,
+            segment_col=segment_col,
+            # a first append without a spec fits the bins on the whole input
+            segments=None if include_all or state is None else segments,
+        )
+        if load_stats is not None:
+            load_stats.update(stats)
+        if segment_col not in df.columns:
+            raise ValueError(f"Segment column '{segment_col}' not found in input data")
+        if state is None:
+            if feature_cols is None:
+                feature_cols = [c for c in df.columns if c not in (label_col, segment_col)]
+            spec = BinningSpec.fit(
+                df, feature_cols, label_col, method=binning_method, n_bins=n_bins,
+                min_leaf_frac=min_leaf_frac, positive_label=positive_label,
+            )
+            state = IVAccumulator(spec, feature_cols, positive_label=positive_label)
+        state.update(df, label_col, segment_col, segments=segments, include_all=include_all)
+
+    state.save(state_path)
+    reported = [s for s in state.segments if s != ALL_SEGMENT]
+    reported = sorted(reported) if segments is None else [s for s in segments if s in reported]
+    if include_all and ALL_SEGMENT in state.segments:
+        reported.append(ALL_SEGMENT)
+    return {seg: state.result(seg, return_type="feature")["per_feature"] for seg in reported}
+
+
+def run_iv_by_segments(
+    input_path: Path,
+    label_col: str,
+    segment_col: str,
+    segments: Optional[Sequence[str]] = None,
     feature_cols: Optional[List[str]] = None,
     binning_method: str = "quantile",
     n_bins: int = 10,
     min_leaf_frac: float = 0.05,
     positive_label=1,
     output_dir: Path = Path("output"),
+    binning_spec: Optional[BinningSpec] = None,
+    streaming: bool = False,
+    batch_size: int = STREAM_BATCH_SIZE,
+    quantile_engine: str = "exact",
+    sketch_eps: float = DEFAULT_RANK_EPS,
+    n_jobs: Optional[int] = 1,
+    include_all: bool = False,
+    load_stats: Optional[Dict[str, Any]] = None,
+    time_col: Optional[str] = None,
+    append: bool = False,
+    state_path: Optional[Path] = None,
+    optimize_memory: bool = False,
 ) -> List[Path]:
     """Compute IV per segment and write per-feature IV CSVs.
 
-    Returns list of written file paths (one per segment).
+    ``segments=None`` evaluates every value found in ``segment_col``;
+    ``include_all=True`` adds an ``ALL`` pseudo-segment over all rows. In
+    memory, all segments are counted in a single aggregation pass (see
+    ``calculate_iv_by_segment``) instead of re-filtering the frame per segment.
+
+    Only ``label_col``, ``segment_col`` and the feature columns are read, and
+    rows of segments that are not requested are filtered at load time (see
+    ``load_input``). Pass a dict as ``load_stats`` to receive the rows and
+    bytes actually read.
+
+    If ``binning_spec`` is given, every segment is coded with those prefit
+    bins instead of re-binning the segment.
+
+    With ``streaming=True`` (Parquet only) the file is never loaded whole:
+    a first pass discovers bin edges reading one feature column at a time,
+    and a second pass iterates record batches of ``batch_size`` rows,
+    summing per-(segment, feature, bin) good/bad counts across batches.
+    With a ``binning_spec`` the first pass is skipped. With
+    ``quantile_engine='sketch'`` (binning_method='quantile') the first pass
+    is itself a batch pass that builds one mergeable KLL sketch per
+    (segment, feature) with rank error ``sketch_eps``, so no column is ever
+    materialized or sorted.
+
+    ``n_jobs`` > 1 (in-memory mode) bins and counts each segment's features
+    in a process pool over shared-memory column buffers; calling scripts need
+    an ``if __name__ == "__main__":`` guard (see ``calculate_iv``).
+
+    With ``time_col`` (e.g. observation month) a period axis is added to the
+    aggregation: IV and bad rate per (period, segment, feature) come out of
+    one pass with fixed development bins (``binning_spec``, or bins fitted
+    once on all rows) and are written as a single long table
+    ``IV_by_period.csv`` (see ``calculate_iv_by_period``).
+
+    With ``append=True`` the input is added to a persisted ``IVAccumulator``
+    (``state_path``, default ``output_dir / "iv_state.json"``) holding the
+    per-bin good/bad counts of everything appended so far, and the CSVs are
+    written from those totals; each refresh only reads the new data. The
+    first append fixes the bins (``binning_spec`` or fitted on that input)
+    and ``positive_label``; later appends must pass the same label.
+
+    ``optimize_memory=True`` (in-memory mode) loads through the memory-lean
+    path of ``load_input`` (dictionary-encoded strings, float32 / narrow
+    integer features, uint8 label mask); ``load_stats`` then reports
+    ``memory_before`` / ``memory_after``.
+
+    ``input_path`` may be a pyarrow Table or RecordBatchReader instead of a
+    file; it is read in place without a pandas conversion (``streaming`` is
+    then ignored, the data is already in memory).
+
+    Returns list of written file paths (one per segment, or the period table).
     """
-    df = _load_dataframe(Path(input_path))
-    if segment_col not in df.columns:
-        raise ValueError(f"Segment column '{segment_col}' not found in input data")
+    if _is_arrow(input_path):
+        streaming = False
+    else:
+        input_path = Path(input_path)
+    if time_col is not None:
+        period_args = (
+            input_path, label_col, time_col, segment_col, segments, include_all, feature_cols,
+            binning_method, n_bins, min_leaf_frac, positive_label, binning_spec,
+        )
+        if streaming:
+            table = _run_period_iv_streaming(*period_args, batch_size, quantile_engine, sketch_eps)
+        else:
+            table = _run_period_iv_in_memory(*period_args, quantile_engine, load_stats)
+        _ensure_output_dir(output_dir)
+        out_path = output_dir / "IV_by_period.csv"
+        table.to_csv(out_path, index=False)
+        return [out_path]
+
+    if append:
+        per_segment = _run_iv_append(
+            input_path, label_col, segment_col, segments, include_all, feature_cols,
+            binning_method, n_bins, min_leaf_frac, positive_label, binning_spec,
+            streaming, batch_size, Path(state_path or output_dir / IV_STATE_FILE), load_stats,
+        )
+    elif streaming:
+        per_segment = _run_iv_streaming(
+            input_path, label_col, segment_col, segments, include_all, feature_cols,
+            binning_method, n_bins, min_leaf_frac, positive_label,
+            binning_spec, batch_size, quantile_engine, sketch_eps, load_stats,
+        )
+    else:
+        per_segment = _run_iv_in_memory(
+            input_path, label_col, segment_col, segments, include_all, feature_cols,
+            binning_method, n_bins, min_leaf_frac, positive_label, binning_spec,
+            quantile_engine, n_jobs, load_stats, optimize_memory,
+        )
 
     _ensure_output_dir(output_dir)
     written_paths: List[Path] = []
-
-    for seg in segments:
-        seg_df = df[df[segment_col] == seg]
-        if seg_df.empty:
-            # skip empty segment but continue others
-            continue
-        iv_result = calculate_iv(
-            df=seg_df,
-            label_col=label_col,
-            feature_cols=feature_cols,
-            binning_method=binning_method,
-            n_bins=n_bins,
-            min_leaf_frac=min_leaf_frac,
-            positive_label=positive_label,
-            return_type="feature",
-        )
-        per_feature = iv_result.get("per_feature")
-        if per_feature is None:
-            continue
+    for seg, per_feature in per_segment.items():
         out_path = output_dir / f"{seg}_features_IV.csv"
         per_feature.to_csv(out_path, header=["IV"])
         written_paths.append(out_path)
@@ -91,27 +1022,61 @@ def run_iv_from_file_tool(
     min_leaf_frac: float = 0.05,
     positive_label=1,
     output_dir: str = "output",
+    binning_spec_path: Optional[str] = None,
+    streaming: bool = False,
+    quantile_engine: str = "exact",
+    n_jobs: int = 1,
+    include_all: bool = False,
+    time_col: Optional[str] = None,
+    append: bool = False,
+    optimize_memory: bool = False,
 ) -> str:
     """Calculate IV per segment from a CSV/Parquet and write per-feature IV CSVs.
 
-    Returns a JSON string with written file paths.
-    """
-    segs: Sequence[str]
-    if segments is None:
-        segs = ["MTB", "YNTB"]
-    else:
-        segs = list(segments)
+    segments defaults to every value found in segment_col; include_all=True
+    also writes an ALL_features_IV.csv over all rows.
+
+    binning_spec_path optionally points to a saved BinningSpec (.json/.parquet)
+    whose development bins are applied instead of re-binning.
+    streaming=True processes a Parquet input in record batches so that
+    files larger than memory can be used.
+    quantile_engine="sketch" uses approximate one-pass quantile edges.
+    n_jobs > 1 spreads features over worker processes (-1 = all cores); a
+    script calling it needs an `if __name__ == "__main__":` guard, otherwise
+    IV is counted serially.
+    time_col (e.g. an observation-month column) writes one IV_by_period.csv
+    long table with IV and bad rate per (period, segment, feature) instead.
+    append=True adds the input to the IV state kept in output_dir
+    (iv_state.json) and reports IV over everything appended so far.
+    optimize_memory=True downcasts numerics, dictionary-encodes strings and
+    keeps the label as a uint8 mask to cut peak memory on large inputs.
 
+    Returns a JSON string with written file paths and, with
+    optimize_memory, the memory footprint before/after optimization.
+    """
+    load_stats: Dict[str, Any] = {}
     paths = run_iv_by_segments(
         input_path=Path(input_path),
         label_col=label_col,
         segment_col=segment_col,
-        segments=segs,
+        segments=list(segments) if segments is not None else None,
         feature_cols=feature_cols,
         binning_method=binning_method,
         n_bins=n_bins,
         min_leaf_frac=min_leaf_frac,
         positive_label=positive_label,
         output_dir=Path(output_dir),
+        binning_spec=BinningSpec.load(Path(binning_spec_path)) if binning_spec_path else None,
+        streaming=streaming,
+        quantile_engine=quantile_engine,
+        n_jobs=n_jobs,
+        include_all=include_all,
+        time_col=time_col,
+        append=append,
+        optimize_memory=optimize_memory,
+        load_stats=load_stats,
     )
-    return json.dumps({"written_files": [str(p) for p in paths]})
+    payload: Dict[str, Any] = {"written_files": [str(p) for p in paths]}
+    if optimize_memory:
+        payload["memory"] = {k: load_stats[k] for k in ("memory_before", "memory_after") if k in load_stats}
+    return json.dumps(payload)
@@ -0,0 +1,141 @@
+"""Mergeable approximate-quantile sketch (KLL).
+
+Used as the one-pass backend for equal-frequency binning: a sketch is
+updated chunk by chunk (or per segment / per worker), sketches are merged,
+and the bin edges are read off the merged sketch without ever sorting the
+full column.
+
+Reference: Karnin, Lang, Liberty, "Optimal Quantile Approximation in
+Streams" (2016).
+"""
+import math
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+DEFAULT_RANK_EPS = 0.01
+# values added per compaction in ``update``, in multiples of the compactor size
+UPDATE_CHUNK_FACTOR = 16
+
+
+def _k_for_eps(eps: float) -> int:
+    """Compactor size giving a normalized rank error of about ``eps`` (99% conf.)."""
+    if not 0 < eps < 1:
+        raise ValueError(f"Rank error bound must be in (0, 1), got {eps}")
+    # empirical KLL error curve (as used by Apache DataSketches)
+    return max(int(math.ceil((2.296 / eps) ** (1 / 0.9723))), 8)
+
+
+class KLLSketch:
+    """
+    KLL quantile sketch over float values.
+
+    Parameters
+    ----------
+    eps : float
+        Target normalized rank error: a returned q-quantile has true rank in
+        ``[q - eps, q + eps]`` with high probability.
+    seed : int, optional
+        Seed for the random compaction offsets (for reproducible edges).
+
+    ``update`` accepts whole arrays (NaN is ignored), ``merge`` combines two
+    sketches built on disjoint data, and ``quantiles`` answers many
+    quantile levels at once. Exact min and max are tracked separately.
+    """
+
+    def __init__(self, eps: float = DEFAULT_RANK_EPS, seed: Optional[int] = None):
+        self.eps = eps
+        self.k = _k_for_eps(eps)
+        self.n = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self._levels: List[np.ndarray] = [np.empty(0, dtype=np.float64)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self._levels) - level - 1
+        return max(int(math.ceil(self.k * (2.0 / 3.0) ** depth)), 2)
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self._levels):
+            items = self._levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self._levels):
+                    self._levels.append(np.empty(0, dtype=np.float64))
+                items = np.sort(items)
+                # keep an odd leftover at this level so the pairing is exact
+                keep = items[-1:] if len(items) % 2 else items[:0]
+                paired = items[: len(items) - len(keep)]
+                promoted = paired[int(self._rng.integers(2))::2]
+                self._levels[level] = keep
+                self._levels[level + 1] = np.concatenate([self._levels[level + 1], promoted])
+            level += 1
+
+    def update(self, values) -> "KLLSketch":
+        """Add an array of values (NaN ignored).
+
+        Values go in chunks of ``UPDATE_CHUNK_FACTOR * k``, so a compaction
+        never sorts more than O(k) items however large the array is.
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        chunk_size = UPDATE_CHUNK_FACTOR * self.k
+        for start in range(0, len(values), chunk_size):
+            chunk = values[start:start + chunk_size]
+            chunk = chunk[~np.isnan(chunk)]
+            if len(chunk):
+                self.n += len(chunk)
+                self.min = min(self.min, float(chunk.min()))
+                self.max = max(self.max, float(chunk.max()))
+                self._levels[0] = np.concatenate([self._levels[0], chunk])
+                self._compress()
+        return self
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        """Absorb ``other`` (built on disjoint data) into this sketch."""
+        if other.n == 0:
+            return self
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.empty(0, dtype=np.float64))
+        for level, items in enumerate(other._levels):
+            self._levels[level] = np.concatenate([self._levels[level], items])
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def quantiles(self, qs) -> np.ndarray:
+        """Approximate values at quantile levels ``qs`` (0 and 1 map to exact min/max)."""
+        qs = np.asarray(qs, dtype=np.float64)
+        if self.n == 0:
+            return np.full(qs.shape, np.nan)
+        items = np.concatenate(self._levels)
+        weights = np.concatenate(
+            [np.full(len(lv), 2.0 ** i) for i, lv in enumerate(self._levels)]
+        )
+        order = np.argsort(items, kind="stable")
+        items, cum = items[order], np.cumsum(weights[order])
+        idx = np.searchsorted(cum, qs * cum[-1], side="left")
+        out = items[np.clip(idx, 0, len(items) - 1)]
+        out = np.where(qs <= 0, self.min, out)
+        return np.where(qs >= 1, self.max, out)
+
+    # ---------- persistence ----------
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "eps": self.eps,
+            "n": self.n,
+            "min": self.min,
+            "max": self.max,
+            "levels": [lv.tolist() for lv in self._levels],
+        }
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "KLLSketch":
+        sketch = cls(eps=payload["eps"])
+        sketch.n = payload["n"]
+        sketch.min = payload["min"]
+        sketch.max = payload["max"]
+        sketch._levels = [np.asarray(lv, dtype=np.float64) for lv in payload["levels"]]
+        return sketch
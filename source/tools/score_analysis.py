@@ -0,0 +1,473 @@
+"""Gains / lift, score-band and cutoff tables of a model score.
+
+Every table is derived from a per-segment score histogram: ascending
+score cells with row and bad counts. In memory the histogram holds the
+distinct score values and comes from one sort of the score column (the
+per-segment order is a stable re-sort of that order on small segment
+codes). In streaming mode it holds fine quantile cells of a KLL sketch,
+filled by one ``np.bincount`` per record batch. Deciles, user score bands
+and all cutoffs are then grouped cumulative sums over the histogram cells.
+"""
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from langchain.tools import tool
+
+from .data_handling import ALL_SEGMENT, _as_frame, _interval_labels, _is_arrow, _sketch_edges, _to_float_array
+from .iv_engine import (
+    STREAM_BATCH_SIZE,
+    _discover_segments,
+    _ensure_output_dir,
+    _open_parquet,
+    _prune_row_groups,
+    load_input,
+)
+from .quantile_sketch import DEFAULT_RANK_EPS, KLLSketch
+
+SCORE_FINE_CELLS = 1000
+HISTOGRAM_COLUMNS = ["score_min", "score_max", "count", "bads"]
+
+
+def _histogram(score_min, score_max, counts, bads) -> pd.DataFrame:
+    return pd.DataFrame({"score_min": score_min, "score_max": score_max, "count": counts, "bads": bads})
+
+
+def score_histograms(
+    score: np.ndarray,
+    y: np.ndarray,
+    segment_codes: Optional[np.ndarray] = None,
+    n_segments: int = 0,
+    include_all: bool = True,
+) -> Dict[Any, pd.DataFrame]:
+    """
+    Distinct-value score histograms per segment from one sort.
+
+    ``segment_codes`` (0..n_segments-1, -1 = not requested) splits the rows;
+    the keys of the result are the segment codes plus ``ALL_SEGMENT`` over
+    every row with ``include_all``. Missing scores are left out.
+    """
+    valid = np.flatnonzero(~np.isnan(score))
+    order = valid[np.argsort(score[valid])]
+
+    def distinct_cells(rows: np.ndarray, groups: Optional[np.ndarray]):
+        s = score[rows]
+        change = np.diff(s) != 0
+        if groups is not None:
+            change |= np.diff(groups) != 0
+        starts = np.flatnonzero(np.r_[True, change]) if len(rows) else np.empty(0, dtype=np.int64)
+        counts = np.diff(np.r_[starts, len(rows)])
+        bads = np.add.reduceat(y[rows], starts) if len(rows) else np.empty(0)
+        return starts, s[starts], counts, bads
+
+    result: Dict[Any, pd.DataFrame] = {}
+    if segment_codes is not None:
+        # stable re-sort on the segment codes keeps every segment score-ordered
+        rows = order[segment_codes[order] >= 0]
+        rows = rows[np.argsort(segment_codes[rows], kind="stable")]
+        groups = segment_codes[rows]
+        starts, values, counts, bads = distinct_cells(rows, groups)
+        cell_segment = groups[starts]
+        bounds = np.searchsorted(cell_segment, np.arange(n_segments + 1))
+        for k in range(n_segments):
+            lo, hi = bounds[k], bounds[k + 1]
+            if hi > lo:
+                result[k] = _histogram(values[lo:hi], values[lo:hi], counts[lo:hi], bads[lo:hi])
+    if segment_codes is None or include_all:
+        _, values, counts, bads = distinct_cells(order, None)
+        result[ALL_SEGMENT] = _histogram(values, values, counts, bads)
+    return result
+
+
+def _risk_ordered(histogram: pd.DataFrame, higher_is_riskier: bool) -> Dict[str, np.ndarray]:
+    """Histogram columns ordered from the riskiest cell to the safest."""
+    step = -1 if higher_is_riskier else 1
+    return {c: histogram[c].to_numpy()[::step] for c in HISTOGRAM_COLUMNS}
+
+
+def _rank_table(cells: Dict[str, np.ndarray], starts: np.ndarray) -> pd.DataFrame:
+    """Rank-ordering columns for groups of consecutive risk-ordered cells."""
+    count = np.add.reduceat(cells["count"], starts).astype(np.float64)
+    bads = np.add.reduceat(cells["bads"], starts).astype(np.float64)
+    goods = count - bads
+    total_count, total_bads = count.sum(), bads.sum()
+    total_goods = total_count - total_bads
+    cum_count, cum_bads, cum_goods = np.cumsum(count), np.cumsum(bads), np.cumsum(goods)
+    overall_bad_rate = total_bads / total_count
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        table = pd.DataFrame({
+            "score_min": np.minimum.reduceat(cells["score_min"], starts),
+            "score_max": np.maximum.reduceat(cells["score_max"], starts),
+            "count": count,
+            "bads": bads,
+            "goods": goods,
+            "bad_rate": bads / count,
+            "count_pct": count / total_count,
+            "cum_count_pct": cum_count / total_count,
+            "cum_bads": cum_bads,
+            "cum_bad_capture": cum_bads / total_bads,
+            "cum_good_capture": cum_goods / total_goods,
+            "cum_bad_rate": cum_bads / cum_count,
+            "lift": bads / count / overall_bad_rate,
+            "cum_lift": cum_bads / cum_count / overall_bad_rate,
+        })
+    table["ks"] = (table["cum_bad_capture"] - table["cum_good_capture"]).abs()
+    return table
+
+
+def gains_table(histogram: pd.DataFrame, n_groups: int = 10, higher_is_riskier: bool = True) -> pd.DataFrame:
+    """
+    Equal-population gains / lift table (deciles by default), riskiest group first.
+
+    Cells of one score value are never split, so a heavy tie can leave a
+    group empty (it is then left out) or make a group larger than 1 / n_groups.
+    """
+    cells = _risk_ordered(histogram, higher_is_riskier)
+    total = cells["count"].sum()
+    cum_before = np.cumsum(cells["count"]) - cells["count"]
+    group = np.minimum(cum_before * n_groups // max(total, 1), n_groups - 1).astype(np.int64)
+    starts = np.flatnonzero(np.r_[True, np.diff(group) != 0])
+    table = _rank_table(cells, starts)
+    table.insert(0, "group", group[starts] + 1)
+    return table
+
+
+def score_band_table(
+    histogram: pd.DataFrame,
+    score_bands: Sequence[float],
+    higher_is_riskier: bool = True,
+) -> pd.DataFrame:
+    """
+    Rank-ordering table over fixed score bands, riskiest band first.
+
+    ``score_bands`` are the inner band edges; bands are right-closed
+    intervals as with ``pd.cut``, open-ended at both sides. Empty bands are
+    left out.
+    """
+    edges = np.unique(np.r_[-np.inf, np.asarray(score_bands, dtype=np.float64), np.inf])
+    labels = np.asarray(_interval_labels(edges, include_lowest=False), dtype=object)
+    cells = _risk_ordered(histogram, higher_is_riskier)
+    band = np.searchsorted(edges[1:-1], cells["score_max"], side="left")
+    starts = np.flatnonzero(np.r_[True, np.diff(band) != 0])
+    table = _rank_table(cells, starts)
+    table.insert(0, "band", labels[band[starts]])
+    return table
+
+
+def cutoff_table(
+    histogram: pd.DataFrame,
+    n_cutoffs: Optional[int] = 100,
+    higher_is_riskier: bool = True,
+) -> pd.DataFrame:
+    """
+    Approval-rate vs bad-rate trade-off at every cutoff.
+
+    Row ``cutoff`` rejects every score at least as risky as ``cutoff``
+    (``score >= cutoff`` when higher_is_riskier) and approves the rest.
+    All cutoffs come from one cumulative sum over the cells; ``n_cutoffs``
+    keeps about that many, evenly spaced in reject rate (None keeps every
+    cell boundary).
+    """
+    cells = _risk_ordered(histogram, higher_is_riskier)
+    count = cells["count"].astype(np.float64)
+    bads = cells["bads"].astype(np.float64)
+    total_count, total_bads = count.sum(), bads.sum()
+    rejected, rejected_bads = np.cumsum(count), np.cumsum(bads)
+    cutoff = cells["score_min"] if higher_is_riskier else cells["score_max"]
+
+    rows = np.arange(len(count))
+    if n_cutoffs is not None and len(count) > n_cutoffs:
+        targets = np.linspace(0, total_count, n_cutoffs + 1)[1:]
+        rows = np.unique(np.searchsorted(rejected, targets, side="left"))
+
+    approved = total_count - rejected[rows]
+    approved_bads = total_bads - rejected_bads[rows]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return pd.DataFrame({
+            "cutoff": cutoff[rows],
+            "reject_rate": rejected[rows] / total_count,
+            "approval_rate": approved / total_count,
+            "approved_bad_rate": approved_bads / approved,
+            "rejected_bad_rate": rejected_bads[rows] / rejected[rows],
+            "bad_capture": rejected_bads[rows] / total_bads,
+            "good_reject_rate": (rejected[rows] - rejected_bads[rows]) / (total_count - total_bads),
+        })
+
+
+def score_tables_from_histograms(
+    histograms: Dict[Any, pd.DataFrame],
+    n_groups: int = 10,
+    score_bands: Optional[Sequence[float]] = None,
+    n_cutoffs: Optional[int] = 100,
+    higher_is_riskier: bool = True,
+) -> Dict[str, pd.DataFrame]:
+    """Long 'gains', 'bands' (with score_bands) and 'cutoffs' tables with a leading Segment column.
+
+    Segments without scored rows are left out; with none at all the tables are empty.
+    """
+    kinds = {
+        "gains": lambda h: gains_table(h, n_groups, higher_is_riskier),
+        "cutoffs": lambda h: cutoff_table(h, n_cutoffs, higher_is_riskier),
+    }
+    if score_bands is not None:
+        kinds["bands"] = lambda h: score_band_table(h, score_bands, higher_is_riskier)
+
+    tables: Dict[str, pd.DataFrame] = {}
+    for kind, build in kinds.items():
+        frames = [build(h).assign(Segment=seg) for seg, h in histograms.items() if h["count"].sum() > 0]
+        if not frames:
+            # no scored rows: an empty table that still has this kind's columns
+            frames = [build(_histogram([0.0], [0.0], [1], [0])).iloc[:0].assign(Segment=None)]
+        table = pd.concat(frames, ignore_index=True)
+        tables[kind] = table[["Segment", *[c for c in table.columns if c != "Segment"]]]
+    return tables
+
+
+def analyze_score(
+    df: pd.DataFrame,
+    label_col: str,
+    score_col: str,
+    segment_col: Optional[str] = None,
+    segments: Optional[Sequence[Any]] = None,
+    include_all: bool = False,
+    n_groups: int = 10,
+    score_bands: Optional[Sequence[float]] = None,
+    n_cutoffs: Optional[int] = 100,
+    higher_is_riskier: bool = True,
+    positive_label: Any = 1,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Gains / lift, score-band and cutoff tables of ``score_col`` per segment.
+
+    Parameters
+    ----------
+    df : pd.DataFrame or pyarrow.Table
+        Input data with label, score and (optionally) segment columns.
+    label_col, score_col : str
+        Label and model score columns.
+    segment_col : str, optional
+        Segment column; without it a single ALL table is built.
+    segments : sequence, optional
+        Segments to report (default: every value of ``segment_col``).
+    include_all : bool
+        Also report an ALL pseudo-segment over every row.
+    n_groups : int
+        Number of equal-population groups of the gains table.
+    score_bands : sequence of float, optional
+        Inner edges of fixed score bands for the band table.
+    n_cutoffs : int, optional
+        Approximate number of cutoffs in the trade-off table.
+    higher_is_riskier : bool
+        True for PD-like scores (high = risky), False for credit scores.
+    positive_label : Any
+        The value in label_col that represents the "bad" class.
+
+    Returns
+    -------
+    Dict[str, pd.DataFrame]
+        'gains', 'cutoffs' and (with score_bands) 'bands' long tables with a
+        leading Segment column; rows with a missing score are left out.
+    """
+    df = _as_frame(df)
+    for col in (label_col, score_col, segment_col):
+        if col is not None and col not in df.columns:
+            raise ValueError(f"Column '{col}' not found in DataFrame.")
+    score = _to_float_array(df[score_col])
+    y = (df[label_col] == positive_label).to_numpy(dtype=np.float64)
+
+    if segment_col is None:
+        histograms = score_histograms(score, y)
+    else:
+        codes, values = pd.factorize(df[segment_col], sort=True)
+        if segments is None:
+            segments = list(values)
+        segments = list(segments)
+        # map factorized values onto the requested segments (-1 = dropped)
+        lookup = np.append(pd.Index(segments).get_indexer(values), -1)
+        by_code = score_histograms(score, y, lookup[codes], len(segments), include_all)
+        histograms = {(k if k == ALL_SEGMENT else segments[k]): h for k, h in by_code.items()}
+    return score_tables_from_histograms(histograms, n_groups, score_bands, n_cutoffs, higher_is_riskier)
+
+
+def _score_histograms_streaming(
+    input_path: Path,
+    label_col: str,
+    score_col: str,
+    segment_col: Optional[str],
+    segments: Optional[Sequence[Any]],
+    include_all: bool,
+    positive_label: Any,
+    batch_size: int,
+    n_fine: int,
+    sketch_eps: float,
+) -> Dict[Any, pd.DataFrame]:
+    """Fine-cell score histograms of a Parquet file in two record-batch passes.
+
+    Pass 1 feeds one KLL sketch with the score and reads ``n_fine``
+    equal-frequency cell edges off it; pass 2 adds one bincount per batch
+    over the flat (segment, cell) index.
+    """
+    parquet_file = _open_parquet(input_path)
+    columns = parquet_file.schema_arrow.names
+    for col in (label_col, score_col, segment_col):
+        if col is not None and col not in columns:
+            raise ValueError(f"Column '{col}' not found in input data")
+    if segment_col is not None and segments is None:
+        segments = _discover_segments(parquet_file, segment_col)
+    segments = list(segments or [])
+    row_groups = _prune_row_groups(parquet_file, segment_col, None if include_all else segments)
+
+    sketch = KLLSketch(sketch_eps, seed=0)
+    for batch in parquet_file.iter_batches(batch_size=batch_size, row_groups=row_groups, columns=[score_col]):
+        sketch.update(_to_float_array(batch.column(0).to_pandas()))
+    edges = _sketch_edges(sketch, n_fine)
+    n_cells = max(len(edges) - 1, 1)
+
+    # flat (segment, cell) counts; the last segment slot is ALL
+    n_slots = len(segments) + 1
+    counts = np.zeros(n_slots * n_cells, dtype=np.int64)
+    bads = np.zeros(n_slots * n_cells, dtype=np.float64)
+    read_cols = [c for c in (segment_col, label_col, score_col) if c is not None]
+    for batch in parquet_file.iter_batches(batch_size=batch_size, row_groups=row_groups, columns=read_cols):
+        chunk = batch.to_pandas()
+        score = _to_float_array(chunk[score_col])
+        valid = ~np.isnan(score)
+        cell = np.searchsorted(edges[1:-1], score[valid], side="left")
+        y = (chunk[label_col] == positive_label).to_numpy(dtype=np.float64)[valid]
+        slots = [np.full(len(cell), len(segments), dtype=np.int64)]
+        if segment_col is not None:
+            seg = pd.Index(segments).get_indexer(chunk[segment_col])[valid]
+            slots = [seg] + (slots if include_all else [])
+        for slot in slots:
+            keep = slot >= 0
+            flat = slot[keep] * n_cells + cell[keep]
+            counts += np.bincount(flat, minlength=len(counts))
+            bads += np.bincount(flat, weights=y[keep], minlength=len(bads))
+
+    counts = counts.reshape(n_slots, n_cells)
+    bads = bads.reshape(n_slots, n_cells)
+    names = segments + [ALL_SEGMENT]
+    if segment_col is None:
+        wanted = [len(segments)]
+    elif include_all:
+        wanted = range(n_slots)
+    else:
+        wanted = range(len(segments))
+    histograms = {}
+    for k in wanted:
+        observed = counts[k] > 0
+        histograms[names[k]] = _histogram(
+            edges[:-1][observed], edges[1:][observed], counts[k][observed], bads[k][observed]
+        )
+    return histograms
+
+
+def run_score_analysis(
+    input_path: Path,
+    label_col: str,
+    score_col: str,
+    segment_col: Optional[str] = None,
+    segments: Optional[Sequence[Any]] = None,
+    include_all: bool = False,
+    output_dir: Path = Path("output"),
+    n_groups: int = 10,
+    score_bands: Optional[Sequence[float]] = None,
+    n_cutoffs: Optional[int] = 100,
+    higher_is_riskier: bool = True,
+    positive_label=1,
+    streaming: bool = False,
+    batch_size: int = STREAM_BATCH_SIZE,
+    n_fine: int = SCORE_FINE_CELLS,
+    sketch_eps: float = DEFAULT_RANK_EPS,
+    load_stats: Optional[Dict[str, Any]] = None,
+) -> List[Path]:
+    """Score tables per segment from a CSV/Parquet file (or Arrow data), written as CSVs.
+
+    Reads only the label, score and segment columns (segment filter pushed
+    down as in ``run_iv_by_segments``) and writes ``score_gains.csv``,
+    ``score_cutoffs.csv`` and, with ``score_bands``, ``score_bands.csv``
+    long tables to ``output_dir``. With ``streaming=True`` (Parquet only)
+    the tables come from ``n_fine`` sketch-based score cells filled batch by
+    batch, so group and band boundaries are resolved to those cells.
+    """
+    if _is_arrow(input_path):
+        streaming = False
+    else:
+        input_path = Path(input_path)
+
+    if streaming:
+        histograms = _score_histograms_streaming(
+            input_path, label_col, score_col, segment_col, segments, include_all,
+            positive_label, batch_size, n_fine, sketch_eps,
+        )
+        tables = score_tables_from_histograms(histograms, n_groups, score_bands, n_cutoffs, higher_is_riskier)
+    else:
+        columns = [c for c in (label_col, score_col, segment_col) if c is not None]
+        df, stats = load_input(
+            input_path,
+            columns=columns,
+            segment_col=segment_col,
+            segments=None if include_all else segments,
+        )
+        if load_stats is not None:
+            load_stats.update(stats)
+        tables = analyze_score(
+            df, label_col, score_col, segment_col, segments, include_all,
+            n_groups, score_bands, n_cutoffs, higher_is_riskier, positive_label,
+        )
+
+    _ensure_output_dir(output_dir)
+    written_paths: List[Path] = []
+    for kind, table in tables.items():
+        out_path = output_dir / f"score_{kind}.csv"
+        table.to_csv(out_path, index=False)
+        written_paths.append(out_path)
+    return written_paths
+
+
+@tool
+def run_score_analysis_tool(
+    input_path: str,
+    label_col: str,
+    score_col: str,
+    segment_col: Optional[str] = None,
+    segments: Optional[List[str]] = None,
+    include_all: bool = False,
+    n_groups: int = 10,
+    score_bands: Optional[List[float]] = None,
+    n_cutoffs: int = 100,
+    higher_is_riskier: bool = True,
+    positive_label=1,
+    output_dir: str = "output",
+    streaming: bool = False,
+) -> str:
+    """Gains/lift, score-band and cutoff tables of a model score per segment.
+
+    Writes score_gains.csv (equal-population groups, riskiest first, with
+    bad rate, cumulative bad capture, lift and KS), score_cutoffs.csv
+    (approval rate vs bad rate at each cutoff) and, if score_bands (inner
+    band edges) is given, score_bands.csv to output_dir.
+    higher_is_riskier=False for credit scores where a high score is good.
+    streaming=True processes a Parquet input in record batches.
+
+    Returns a JSON string with the written file paths.
+    """
+    paths = run_score_analysis(
+        input_path=Path(input_path),
+        label_col=label_col,
+        score_col=score_col,
+        segment_col=segment_col,
+        segments=segments,
+        include_all=include_all,
+        output_dir=Path(output_dir),
+        n_groups=n_groups,
+        score_bands=score_bands,
+        n_cutoffs=n_cutoffs,
+        higher_is_riskier=higher_is_riskier,
+        positive_label=positive_label,
+        streaming=streaming,
+    )
+    return json.dumps({"written_files": [str(p) for p in paths]})
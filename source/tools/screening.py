@@ -0,0 +1,268 @@
+"""Correlation / VIF screening of candidate features.
+
+The correlation matrix is built from row chunks: each column is converted
+to NumPy once, each chunk is copied into reused float32 buffers and its
+Gram products are taken tile by tile over column blocks, then added to
+float64 running totals. Missing values are handled
+pairwise (each pair uses the rows where both features are present). VIF
+comes from the diagonal of the inverse correlation matrix, and the
+shortlist is de-duplicated greedily in IV order.
+"""
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from langchain.tools import tool
+
+from .data_handling import _as_frame, _is_categorical, _to_float_array, calculate_iv
+from .iv_engine import load_input
+
+SCREEN_MEMORY_BYTES = 256 * 1024 * 1024
+CORR_BLOCK_SIZE = 256
+# bytes per (row, feature) of the chunk buffers: X, X^2 and presence (float32) + NaN mask
+CHUNK_BYTES_PER_VALUE = 3 * 4 + 1
+
+
+def _numeric_features(df, feature_cols: Optional[List[str]], exclude: List[Optional[str]]) -> List[str]:
+    if feature_cols is None:
+        feature_cols = [c for c in df.columns if c not in exclude]
+    for feature in feature_cols:
+        if feature not in df.columns:
+            raise ValueError(f"Feature column '{feature}' not found in DataFrame.")
+    # correlation is only defined for numeric features
+    return [f for f in feature_cols if not _is_categorical(df[f])]
+
+
+def _column_values(series: pd.Series) -> np.ndarray:
+    """Numeric values of a column as NumPy (no copy for plain numeric dtypes)."""
+    values = series.to_numpy()
+    if values.dtype.kind in "fiub":
+        return values
+    # nullable / Arrow columns with missing values come back as objects
+    return _to_float_array(series)
+
+
+def correlation_matrix(
+    df: pd.DataFrame,
+    feature_cols: Optional[List[str]] = None,
+    chunk_rows: Optional[int] = None,
+    block_size: int = CORR_BLOCK_SIZE,
+) -> pd.DataFrame:
+    """
+    Pairwise-complete Pearson correlation of numeric features in bounded memory.
+
+    Parameters
+    ----------
+    df : pd.DataFrame or pyarrow.Table
+        Input data (Arrow input is read one row chunk at a time through
+        zero-copy slices).
+    feature_cols : list of str, optional
+        Features to correlate (default: every numeric column).
+    chunk_rows : int, optional
+        Rows per chunk; by default sized so all per-chunk buffers (values,
+        squares and presence mask in float32, plus a boolean NaN mask)
+        together stay within ``SCREEN_MEMORY_BYTES``.
+    block_size : int
+        Features per column block of the Gram tiles.
+
+    Returns
+    -------
+    pd.DataFrame
+        Symmetric feature x feature correlation matrix (NaN for pairs
+        without variance).
+    """
+    df = _as_frame(df)
+    features = _numeric_features(df, feature_cols, [])
+    k = len(features)
+    if k == 0:
+        raise ValueError("No numeric features to correlate.")
+    n_rows = len(df)
+    if chunk_rows is None:
+        chunk_rows = max(SCREEN_MEMORY_BYTES // (CHUNK_BYTES_PER_VALUE * k), 1)
+    chunk_rows = max(min(chunk_rows, n_rows), 1)
+
+    # pairwise sums over rows where both i and j are present
+    n = np.zeros((k, k))        # count
+    s = np.zeros((k, k))        # sum of x_i
+    ss = np.zeros((k, k))       # sum of x_i^2
+    p = np.zeros((k, k))        # sum of x_i * x_j
+    blocks = [slice(lo, min(lo + block_size, k)) for lo in range(0, k, block_size)]
+    shift: Optional[np.ndarray] = None
+
+    # chunk buffers are allocated once and reused (the last chunk uses a prefix)
+    X_buf = np.empty((chunk_rows, k), dtype=np.float32)
+    X2_buf = np.empty((chunk_rows, k), dtype=np.float32)
+    Mf_buf = np.empty((chunk_rows, k), dtype=np.float32)
+    nan_buf = np.empty((chunk_rows, k), dtype=bool)
+
+    for lo in range(0, n_rows, chunk_rows):
+        hi = min(lo + chunk_rows, n_rows)
+        X, X2, Mf, missing = X_buf[:hi - lo], X2_buf[:hi - lo], Mf_buf[:hi - lo], nan_buf[:hi - lo]
+        # only this chunk's rows are converted (a view where the dtype allows)
+        rows = df.iloc[lo:hi] if isinstance(df, pd.DataFrame) else df.slice(lo, hi)
+        for j, feature in enumerate(features):
+            X[:, j] = _column_values(rows[feature])
+        if shift is None:
+            # shifted moments keep float32 products away from cancellation
+            with np.errstate(invalid="ignore"):
+                shift = np.nan_to_num(np.nanmean(X, axis=0)).astype(np.float32)
+        X -= shift
+        np.isnan(X, out=missing)
+        X[missing] = 0
+        np.logical_not(missing, out=Mf, casting="unsafe")
+        np.multiply(X, X, out=X2)
+
+        for bi in blocks:
+            for bj in blocks:
+                if bj.start < bi.start:
+                    continue
+                n[bi, bj] += Mf[:, bi].T @ Mf[:, bj]
+                s[bi, bj] += X[:, bi].T @ Mf[:, bj]
+                ss[bi, bj] += X2[:, bi].T @ Mf[:, bj]
+                p[bi, bj] += X[:, bi].T @ X[:, bj]
+                if bj.start != bi.start:
+                    s[bj, bi] += X[:, bj].T @ Mf[:, bi]
+                    ss[bj, bi] += X2[:, bj].T @ Mf[:, bi]
+
+    # only the upper tiles of the symmetric products were accumulated
+    upper = np.triu(np.ones((k, k), dtype=bool))
+    n = np.where(upper, n, n.T)
+    p = np.where(upper, p, p.T)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = n * p - s * s.T
+        var_i = n * ss - s * s
+        corr = cov / np.sqrt(var_i * var_i.T)
+    corr = np.clip(corr, -1.0, 1.0)
+    np.fill_diagonal(corr, np.where(np.isnan(np.diag(corr)), np.nan, 1.0))
+    return pd.DataFrame(corr, index=pd.Index(features, name="Feature"), columns=features)
+
+
+def vif_from_correlation(corr: pd.DataFrame) -> pd.Series:
+    """Variance inflation factors: diagonal of the inverse correlation matrix.
+
+    Pairs without a defined correlation count as uncorrelated; a singular
+    matrix falls back to the pseudo-inverse.
+    """
+    values = np.nan_to_num(corr.to_numpy(), nan=0.0)
+    np.fill_diagonal(values, 1.0)
+    try:
+        inverse = np.linalg.inv(values)
+    except np.linalg.LinAlgError:
+        inverse = np.linalg.pinv(values)
+    return pd.Series(np.diag(inverse), index=corr.index, name="VIF")
+
+
+def screen_features(
+    df: pd.DataFrame,
+    label_col: Optional[str] = None,
+    feature_cols: Optional[List[str]] = None,
+    iv: Optional[pd.Series] = None,
+    corr_threshold: float = 0.7,
+    vif_threshold: Optional[float] = 10.0,
+    chunk_rows: Optional[int] = None,
+    block_size: int = CORR_BLOCK_SIZE,
+    positive_label: Any = 1,
+) -> Dict[str, Any]:
+    """
+    Shortlist features by correlation and VIF, keeping the higher-IV feature.
+
+    Features are visited in descending IV (``iv``, or ``calculate_iv`` on
+    ``label_col`` if not given, else input order). A feature is dropped when
+    its absolute correlation with an already kept feature exceeds
+    ``corr_threshold``. The survivors' VIFs are then taken from their
+    correlation submatrix and, while the largest exceeds ``vif_threshold``,
+    that feature is dropped and the VIFs recomputed (no data pass).
+
+    Returns
+    -------
+    Dict[str, Any]
+        - 'corr' : correlation matrix of all numeric candidates.
+        - 'vif' : pd.Series of VIF of the selected features.
+        - 'selected' : list of kept features, in IV order.
+        - 'dropped' : pd.DataFrame with ['Feature', 'reason', 'related_to',
+          'value'] for every dropped feature.
+    """
+    df = _as_frame(df)
+    features = _numeric_features(df, feature_cols, [label_col])
+    corr = correlation_matrix(df, features, chunk_rows=chunk_rows, block_size=block_size)
+
+    if iv is None and label_col is not None:
+        iv = calculate_iv(
+            df, label_col, features, positive_label=positive_label,
+            return_type="feature", engine="vectorized",
+        )["per_feature"]
+    if iv is not None:
+        features = sorted(features, key=lambda f: -iv.get(f, -np.inf))
+
+    abs_corr = corr.abs().fillna(0.0)
+    selected: List[str] = []
+    dropped = []
+    for feature in features:
+        if selected:
+            partner = abs_corr.loc[feature, selected].idxmax()
+            value = abs_corr.loc[feature, partner]
+            if value > corr_threshold:
+                dropped.append({"Feature": feature, "reason": "correlation", "related_to": partner, "value": value})
+                continue
+        selected.append(feature)
+
+    vif = vif_from_correlation(corr.loc[selected, selected])
+    while vif_threshold is not None and len(vif) > 1 and vif.max() > vif_threshold:
+        worst = vif.idxmax()
+        dropped.append({"Feature": worst, "reason": "vif", "related_to": None, "value": vif[worst]})
+        selected.remove(worst)
+        vif = vif_from_correlation(corr.loc[selected, selected])
+
+    return {
+        "corr": corr,
+        "vif": vif,
+        "selected": selected,
+        "dropped": pd.DataFrame(dropped, columns=["Feature", "reason", "related_to", "value"]),
+    }
+
+
+@tool
+def screen_features_tool(
+    input_path: str,
+    label_col: str,
+    feature_cols: Optional[List[str]] = None,
+    corr_threshold: float = 0.7,
+    vif_threshold: float = 10.0,
+    positive_label=1,
+    output_dir: str = "output",
+) -> str:
+    """Correlation / VIF screening of candidate features from a CSV/Parquet file.
+
+    Features are de-duplicated in descending IV order: a feature whose
+    absolute correlation with a kept feature exceeds corr_threshold is
+    dropped, then features are removed while the largest VIF exceeds
+    vif_threshold. Writes feature_correlation.csv and feature_screening.csv
+    to output_dir.
+
+    Returns a JSON string with the selected features, the dropped features
+    and the written file paths.
+    """
+    columns = None if feature_cols is None else [label_col, *feature_cols]
+    df, _ = load_input(Path(input_path), columns=columns)
+    result = screen_features(
+        df, label_col, feature_cols,
+        corr_threshold=corr_threshold, vif_threshold=vif_threshold, positive_label=positive_label,
+    )
+
+    out_dir = Path(output_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    corr_path = out_dir / "feature_correlation.csv"
+    screening_path = out_dir / "feature_screening.csv"
+    result["corr"].to_csv(corr_path)
+    screening = pd.DataFrame({"Feature": result["selected"], "VIF": result["vif"].loc[result["selected"]].to_numpy()})
+    screening["status"] = "selected"
+    dropped = result["dropped"].assign(status="dropped")
+    pd.concat([screening, dropped], ignore_index=True).to_csv(screening_path, index=False)
+
+    return json.dumps({
+        "selected": result["selected"],
+        "dropped": result["dropped"].to_dict(orient="records"),
+        "written_files": [str(corr_path), str(screening_path)],
+    }, default=str)
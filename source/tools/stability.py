@@ -0,0 +1,143 @@
+"""Population / characteristic stability (PSI / CSI).
+
+Bins are fitted once on a reference (development) frame with ``BinningSpec``
+and reused for every comparison period, so monitoring runs never re-bin the
+reference. Each comparison frame costs one ``np.bincount`` per feature over
+a flat (period, bin) index; the PSI terms are computed on the resulting
+(period x bin) matrices.
+"""
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .data_handling import BinningSpec
+
+PSI_EPS = 1e-6
+
+
+def _psi_terms(expected: np.ndarray, actual: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Per-bin PSI terms for (periods x bins) actual counts against one expected row.
+
+    A period without rows has no distribution: its shares and terms are NaN.
+    """
+    expected_pct = expected / max(expected.sum(), 1)
+    totals = actual.sum(axis=1, keepdims=True)
+    actual_pct = np.where(totals > 0, actual / np.where(totals > 0, totals, 1), np.nan)
+    e = np.clip(expected_pct, PSI_EPS, None)
+    a = np.clip(actual_pct, PSI_EPS, None)
+    return expected_pct, actual_pct, (a - e) * np.log(a / e)
+
+
+def _comparison_frames(
+    test_df: Union[pd.DataFrame, Mapping[Any, pd.DataFrame]],
+    period_col: Optional[str],
+) -> List[Tuple[pd.DataFrame, np.ndarray, List[Any]]]:
+    """Normalize comparison input into (frame, period codes, period names)."""
+    if isinstance(test_df, pd.DataFrame):
+        if period_col is None:
+            return [(test_df, np.zeros(len(test_df), dtype=np.int64), ["test"])]
+        if period_col not in test_df.columns:
+            raise ValueError(f"Period column '{period_col}' not found in DataFrame.")
+        codes, periods = pd.factorize(test_df[period_col], sort=True)
+        keep = codes >= 0
+        return [(test_df[keep], codes[keep], list(periods))]
+    return [
+        (frame, np.zeros(len(frame), dtype=np.int64), [name])
+        for name, frame in test_df.items()
+    ]
+
+
+def analyze_feature_stability(
+    train_df: pd.DataFrame,
+    test_df: Union[pd.DataFrame, Mapping[Any, pd.DataFrame]],
+    feature_cols: Optional[List[str]] = None,
+    score_col: Optional[str] = None,
+    period_col: Optional[str] = None,
+    binning_method: str = "quantile",
+    n_bins: int = 10,
+    binning_spec: Optional[BinningSpec] = None,
+) -> Dict[str, Any]:
+    """Compute CSI per feature (and PSI of the score) against comparison periods.
+
+    Parameters
+    ----------
+    train_df : pd.DataFrame
+        Reference sample the bins are fitted on.
+    test_df : pd.DataFrame or mapping of name -> DataFrame
+        Comparison data: one frame (split by ``period_col`` if given) or
+        several frames keyed by period name.
+    feature_cols : list of str, optional
+        Characteristics to monitor. Defaults to the spec's features, or to
+        every column of ``train_df`` except ``score_col`` / ``period_col``.
+    score_col : str, optional
+        Model score column; its index is reported as PSI.
+    binning_method, n_bins :
+        Binning fitted on ``train_df`` ('quantile' or 'width') when no
+        ``binning_spec`` is given.
+    binning_spec : BinningSpec, optional
+        Prefit development bins (must cover the score column if given).
+
+    Returns
+    -------
+    Dict[str, Any]
+        - 'csi' : pd.DataFrame, feature x period stability index (NaN for
+          a period without rows).
+        - 'psi' : pd.Series of the score's PSI per period (if score_col).
+        - 'per_bin' : pd.DataFrame indexed by (Period, Feature, Bin) with
+          expected/actual counts and shares and the per-bin PSI term.
+    """
+    if feature_cols is None:
+        if binning_spec is not None:
+            feature_cols = [f for f in binning_spec.features if f != score_col]
+        else:
+            feature_cols = [c for c in train_df.columns if c not in (score_col, period_col)]
+    columns = list(feature_cols)
+    if score_col is not None and score_col not in columns:
+        columns.append(score_col)
+    if not columns:
+        raise ValueError("No features to analyze stability.")
+
+    if binning_spec is None:
+        binning_spec = BinningSpec.fit(train_df, columns, method=binning_method, n_bins=n_bins)
+
+    frames = _comparison_frames(test_df, period_col)
+    periods = [p for _, _, names in frames for p in names]
+
+    csi = np.zeros((len(columns), len(periods)))
+    per_bin_frames = []
+    for j, feature in enumerate(columns):
+        labels = binning_spec.labels[feature]
+        k = len(labels)
+        expected = np.bincount(binning_spec.transform_feature(feature, train_df[feature]).codes, minlength=k)
+
+        # one bincount per frame over the flat (period, bin) index
+        actual = np.vstack([
+            np.bincount(
+                period_codes * k + binning_spec.transform_feature(feature, frame[feature]).codes,
+                minlength=len(names) * k,
+            ).reshape(len(names), k)
+            for frame, period_codes, names in frames
+        ])
+        expected_pct, actual_pct, terms = _psi_terms(expected, actual)
+        csi[j] = terms.sum(axis=1)
+
+        per_bin_frames.append(pd.DataFrame({
+            "Period": np.repeat(np.asarray(periods, dtype=object), k),
+            "Feature": feature,
+            "Bin": np.tile(labels, len(periods)),
+            "expected_count": np.tile(expected, len(periods)),
+            "actual_count": actual.ravel(),
+            "expected_pct": np.tile(expected_pct, len(periods)),
+            "actual_pct": actual_pct.ravel(),
+            "psi": terms.ravel(),
+        }))
+
+    csi_table = pd.DataFrame(csi, index=pd.Index(columns, name="Feature"), columns=periods)
+    result: Dict[str, Any] = {
+        "csi": csi_table.loc[list(feature_cols)],
+        "per_bin": pd.concat(per_bin_frames, ignore_index=True).set_index(["Period", "Feature", "Bin"]),
+    }
+    if score_col is not None:
+        result["psi"] = csi_table.loc[score_col].rename("PSI")
+    return result